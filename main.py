@@ -2,27 +2,32 @@ import os
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-import speech_recognition as sr
 import pyttsx3
-import sounddevice as sd
-import numpy as np
-from scipy.io import wavfile
 import json
 from dotenv import load_dotenv
-import wave
-import io
-import torch
-import torchaudio
-import torchaudio.transforms as T
-from PIL import Image, ImageTk
-import requests
-from io import BytesIO
 import queue
 import time
 import traceback
 import tempfile
 import sys
-from pathlib import Path
+
+from speakswap.asr import WHISPER_TIERS
+from speakswap.audio import WHISPER_SAMPLE_RATE, audio_data_to_whisper_input, int16_to_whisper_array
+from speakswap.enhance import StreamingEnhancer, normalize_peak, spectral_gate
+from speakswap.engine import APP_DATA_DIR, GTTS_AVAILABLE, LANGUAGE_CODES, \
+    WHISPER_AVAILABLE, SpeakSwapEngine, load_settings
+from speakswap.lazy import lazy_import, module_available
+from speakswap.pipeline import Stage, StagedPipeline
+from speakswap.sessions import CaptureSession, CaptureSource
+from speakswap.streaming_asr import StreamingTranscriber
+from speakswap.capture import SOUNDDEVICE_AVAILABLE, MicrophoneCapture
+from speakswap.transcript import Transcript
+from speakswap.tts import SpeechPlayer, SpeechQueue, UndecodableSpeech, gtts_mp3
+from speakswap.ui_bus import UIEventBus
+from speakswap.vad import VAD_FRAME_MS, SpeechSegment, VoiceActivitySegmenter
+
+# Only needed once live mode starts
+sr = lazy_import("speech_recognition")
 
 # Try importing optional dependencies
 try:
@@ -31,29 +36,7 @@ try:
 except ImportError:
     PLAYSOUND_AVAILABLE = False
 
-try:
-    from gtts import gTTS
-    GTTS_AVAILABLE = True
-except ImportError:
-    GTTS_AVAILABLE = False
-
-try:
-    from deep_translator import GoogleTranslator
-    TRANSLATOR_AVAILABLE = True
-except ImportError:
-    TRANSLATOR_AVAILABLE = False
-
-try:
-    from google.transliteration import transliterate_text
-    TRANSLITERATION_AVAILABLE = True
-except ImportError:
-    TRANSLITERATION_AVAILABLE = False
-
-try:
-    from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
+TRANSLITERATION_AVAILABLE = module_available("google.transliteration")
 
 # Load environment variables
 load_dotenv()
@@ -105,10 +88,14 @@ class SpeakSwapApp:
         self.keep_running = False
         self.translation_thread = None
         self.translation_queue = queue.Queue()
-        self.whisper_model = None
-        self.whisper_processor = None
-        self.whisper_pipe = None
+        self.pipeline = None
         self.engine = None
+        self.core = None
+        self.ui_bus = None
+        self.input_transcript = None
+        self.output_transcript = None
+        self.speech = None
+        self.segmenter = None
         
         # Initialize UI and other components
         self.init_app()
@@ -122,6 +109,9 @@ class SpeakSwapApp:
         self.win.configure(bg="#ffffff")
         self.win.protocol("WM_DELETE_WINDOW", self.on_close)
         
+        # Worker threads hand all widget updates to the main loop through this
+        self.ui_bus = UIEventBus(self.win, status_handler=self.show_status).start()
+        
         # Initialize TTS engine
         try:
             self.engine = pyttsx3.init()
@@ -132,6 +122,12 @@ class SpeakSwapApp:
         # Load settings
         self.voice_settings = self.load_voice_settings()
         
+        # Initialize the UI-independent recognition/translation engine
+        self.core = SpeakSwapEngine(self.voice_settings, status_callback=self.update_status)
+        
+        # Speech is rendered ahead and played back to back from one output stream
+        self.speech = self.create_speech_queue()
+        
         # Set window icon
         self.set_window_icon()
         
@@ -141,50 +137,48 @@ class SpeakSwapApp:
         # Setup UI components
         self.setup_ui()
         
+        # Live phrases are appended to bounded transcripts; older ones go to disk
+        self.input_transcript = self.create_transcript(self.input_text, "input")
+        self.output_transcript = self.create_transcript(self.output_text, "output")
+        
         # Setup keyboard shortcuts
         self.setup_keyboard_shortcuts()
         
-        # Initialize Whisper model if available
-        if WHISPER_AVAILABLE and self.voice_settings.get("use_whisper", True):
-            threading.Thread(target=self.setup_whisper_model, daemon=True).start()
+        # Whisper (and torch with it) is loaded when live mode first needs it
+    
+    def create_transcript(self, widget, name):
+        """Create the transcript model for one of the text panes"""
+        spill_dir = None
+        if self.voice_settings.get("save_transcript_history", True):
+            spill_dir = os.path.join(APP_DATA_DIR, "transcripts")
+        return Transcript(
+            widget,
+            self.ui_bus,
+            name,
+            max_segments=self.voice_settings.get("transcript_max_segments", 500),
+            spill_dir=spill_dir,
+            show_timestamps=self.voice_settings.get("show_timestamps", False)
+        )
     
     def get_language_codes(self):
         """Return a dictionary of supported languages and their codes"""
-        return {
-            "English": "en",
-            "Hindi": "hi",
-            "Bengali": "bn",
-            "Spanish": "es",
-            "Chinese (Simplified)": "zh-CN",
-            "Russian": "ru",
-            "Japanese": "ja",
-            "Korean": "ko",
-            "German": "de",
-            "French": "fr",
-            "Tamil": "ta",
-            "Telugu": "te",
-            "Kannada": "kn",
-            "Gujarati": "gu",
-            "Punjabi": "pa",
-            "Malayalam": "ml",
-            "Italian": "it",
-            "Portuguese": "pt",
-            "Arabic": "ar",
-            "Dutch": "nl",
-            "Greek": "el",
-            "Hebrew": "he",
-            "Swedish": "sv",
-            "Turkish": "tr",
-            "Vietnamese": "vi",
-            "Thai": "th",
-            "Ukrainian": "uk",
-            "Polish": "pl",
-            "Auto Detect": "auto"
-        }
+        return dict(LANGUAGE_CODES)
     
     @property
     def language_codes(self):
         return self._language_codes
+
+    @property
+    def whisper_model(self):
+        return self.core.whisper_model
+
+    @property
+    def whisper_processor(self):
+        return self.core.whisper_processor
+
+    @property
+    def whisper_pipe(self):
+        return self.core.whisper_pipe
             
     def set_window_icon(self):
         """Set the window icon if the file exists"""
@@ -202,67 +196,15 @@ class SpeakSwapApp:
             print(f"Failed to set window icon: {str(e)}")
     
     def setup_whisper_model(self):
-        """Initialize the Whisper model for speech recognition"""
-        try:
-            self.update_status("Loading Whisper model...")
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            
-            # Use a smaller model by default to save memory
-            model_id = "openai/whisper-base"
-            if torch.cuda.is_available() and torch.cuda.get_device_properties(0).total_memory >= 8e9:
-                # Use larger model if GPU has 8+ GB memory
-                model_id = "openai/whisper-large-v3"
-            
-            self.whisper_model = AutoModelForSpeechSeq2Seq.from_pretrained(
-                model_id, 
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                low_cpu_mem_usage=True
-            ).to(device)
-            
-            self.whisper_processor = AutoProcessor.from_pretrained(model_id)
-            
-            self.whisper_pipe = pipeline(
-                "automatic-speech-recognition",
-                model=self.whisper_model,
-                tokenizer=self.whisper_processor.tokenizer,
-                feature_extractor=self.whisper_processor.feature_extractor,
-                max_new_tokens=128,
-                chunk_length_s=30,
-                batch_size=16
-            )
-            
-            self.update_status("Whisper model loaded successfully")
-        except Exception as e:
-            error_msg = f"Failed to initialize Whisper model: {str(e)}"
-            print(error_msg)
-            self.update_status(error_msg, is_error=True)
-            self.whisper_pipe = None
+        """Initialize the Whisper model for speech recognition (once)"""
+        return self.core.ensure_whisper_model()
     
     def load_voice_settings(self):
         """Load voice settings from file or use defaults"""
-        try:
-            settings_paths = ["voice_settings.json", 
-                            os.path.join(os.path.dirname(__file__), "voice_settings.json")]
-            
-            for path in settings_paths:
-                if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        return json.load(f)
-        except Exception as e:
-            print(f"Failed to load voice settings: {str(e)}")
-            
-        # Default settings
-        return {
-            "rate": 150,
-            "volume": 1.0,
-            "pitch": 1.0,
-            "voice_id": None,
-            "use_whisper": WHISPER_AVAILABLE,
-            "enhance_audio": True,
-            "auto_scroll": True,
-            "use_gtts": GTTS_AVAILABLE,
-            "fallback_to_gtts": True
-        }
+        return load_settings([
+            "voice_settings.json",
+            os.path.join(os.path.dirname(__file__), "voice_settings.json")
+        ])
 
     def save_voice_settings(self):
         """Save voice settings to file"""
@@ -314,6 +256,7 @@ class SpeakSwapApp:
             
             for path in icon_paths:
                 if os.path.exists(path):
+                    from PIL import Image, ImageTk
                     logo_image = Image.open(path)
                     logo_image = logo_image.resize((40, 40))
                     logo_photo = ImageTk.PhotoImage(logo_image)
@@ -444,6 +387,8 @@ class SpeakSwapApp:
         )
         self.input_text.pack(fill=tk.BOTH, expand=True)
         self.input_scrollbar.config(command=self.input_text.yview)
+        self.input_text.tag_configure("partial_tentative", foreground="#95a5a6", font=("Helvetica", 11, "italic"))
+        self.input_text.tag_configure("timestamp", foreground="#95a5a6", font=("Helvetica", 9))
 
         # Output text area with scrollbar
         self.output_frame = tk.Frame(self.text_frame, bg="#ffffff")
@@ -459,6 +404,7 @@ class SpeakSwapApp:
         )
         self.output_text.pack(fill=tk.BOTH, expand=True)
         self.output_scrollbar.config(command=self.output_text.yview)
+        self.output_text.tag_configure("timestamp", foreground="#95a5a6", font=("Helvetica", 9))
 
     def setup_control_buttons(self):
         """Setup control buttons for the application"""
@@ -523,6 +469,17 @@ class SpeakSwapApp:
         )
         self.status_label.pack(side=tk.LEFT, padx=10)
 
+        # Live noise floor and speech threshold while the microphone is open
+        self.vad_label = tk.Label(
+            self.status_frame,
+            text="",
+            font=("Helvetica", 9),
+            bg="#f8f9fa",
+            fg="#95a5a6"
+        )
+        self.vad_label.pack(side=tk.LEFT, padx=10)
+        self.win.after(500, self.refresh_capture_metrics)
+
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(
@@ -537,8 +494,8 @@ class SpeakSwapApp:
         """Check for required dependencies and show warnings if needed"""
         missing_deps = []
         
-        if not TRANSLATOR_AVAILABLE:
-            missing_deps.append("deep-translator")
+        if not self.core.translation_available:
+            missing_deps.append("deep-translator (or a local translation provider)")
         
         if not WHISPER_AVAILABLE and self.voice_settings.get("use_whisper", True):
             missing_deps.append("transformers")
@@ -604,6 +561,10 @@ class SpeakSwapApp:
         
         if input_text:
             self.output_text.insert(tk.END, input_text)
+        
+        # The swapped text is plain text now, not live segments
+        self.input_transcript.reset(clear_widget=False)
+        self.output_transcript.reset(clear_widget=False)
 
     def open_settings(self):
         """Open settings dialog"""
@@ -783,6 +744,26 @@ class SpeakSwapApp:
             state=tk.NORMAL if WHISPER_AVAILABLE else tk.DISABLED
         )
         use_whisper_check.pack(anchor=tk.W, pady=5)
+
+        # Whisper model size; smaller tiers are faster on CPU-only machines
+        model_frame = tk.Frame(advanced_frame, bg="#ffffff")
+        model_frame.pack(fill=tk.X, pady=5)
+        model_label = tk.Label(
+            model_frame,
+            text="Whisper model (applies after restart)",
+            bg="#ffffff",
+            fg="#2c3e50"
+        )
+        model_label.pack(side=tk.LEFT)
+        self.whisper_model_var = tk.StringVar(value=self.voice_settings.get("whisper_model", "auto"))
+        model_combo = ttk.Combobox(
+            model_frame,
+            textvariable=self.whisper_model_var,
+            values=["auto"] + list(WHISPER_TIERS),
+            state="readonly" if WHISPER_AVAILABLE else tk.DISABLED,
+            width=10
+        )
+        model_combo.pack(side=tk.RIGHT)
         
         # Use gTTS checkbox - only if available
         self.use_gtts_var = tk.BooleanVar(value=self.voice_settings.get("use_gtts", GTTS_AVAILABLE))
@@ -801,7 +782,10 @@ class SpeakSwapApp:
             text="Fallback to Google TTS if local TTS fails",
             variable=self.fallback_gtts_var,
             state=tk.NORMAL if GTTS_AVAILABLE else tk.DISABLED
-# Auto-scroll checkbox
+        )
+        fallback_gtts_check.pack(anchor=tk.W, pady=5)
+
+        # Auto-scroll checkbox
         self.auto_scroll_var = tk.BooleanVar(value=self.voice_settings.get("auto_scroll", True))
         auto_scroll_check = ttk.Checkbutton(
             advanced_frame,
@@ -850,6 +834,7 @@ class SpeakSwapApp:
             self.voice_settings["volume"] = self.volume_var.get()
             self.voice_settings["pitch"] = self.pitch_var.get()
             self.voice_settings["use_whisper"] = self.use_whisper_var.get()
+            self.voice_settings["whisper_model"] = self.whisper_model_var.get()
             self.voice_settings["use_gtts"] = self.use_gtts_var.get()
             self.voice_settings["fallback_to_gtts"] = self.fallback_gtts_var.get()
             self.voice_settings["auto_scroll"] = self.auto_scroll_var.get()
@@ -986,10 +971,17 @@ class SpeakSwapApp:
         """Clear all text areas"""
         self.input_text.delete("1.0", tk.END)
         self.output_text.delete("1.0", tk.END)
+        self.input_transcript.reset(clear_widget=False)
+        self.output_transcript.reset(clear_widget=False)
         self.update_status("Text cleared")
 
     def update_status(self, message, is_error=False):
-        """Update status bar message and color"""
+        """Update status bar message and color (safe from any thread)"""
+        if self.ui_bus:
+            self.ui_bus.status(message, is_error)
+
+    def show_status(self, message, is_error=False):
+        """Draw a status message; runs on the Tk thread"""
         if not hasattr(self, 'status_label') or not self.status_label:
             return
             
@@ -997,7 +989,6 @@ class SpeakSwapApp:
             text=message,
             fg="#e74c3c" if is_error else "#7f8c8d"
         )
-        self.win.update_idletasks()
 
     def run_translator(self):
         """Start the translation process"""
@@ -1011,13 +1002,21 @@ class SpeakSwapApp:
             return
             
         # Check translator availability
-        if not TRANSLATOR_AVAILABLE:
+        if not self.core.translation_available:
             messagebox.showerror("Error", "Translation library is not available. Please install deep-translator.")
             return
             
+        # Widgets are read here; the worker thread only gets the codes
+        source_lang = self.language_codes[self.input_lang.get()]
+        target_lang = self.language_codes[self.output_lang.get()]
+        
         # Start translation thread
         self.keep_running = True
-        self.translation_thread = threading.Thread(target=self.translation_worker, daemon=True)
+        self.translation_thread = threading.Thread(
+            target=self.translation_worker,
+            args=(source_lang, target_lang),
+            daemon=True
+        )
         self.translation_thread.start()
         
         # Update UI
@@ -1034,6 +1033,10 @@ class SpeakSwapApp:
         self.keep_running = False
         self.update_status("Stopping translation...")
         
+        # Silence speech that is playing or still queued
+        if self.speech:
+            self.speech.cancel()
+        
         # Wait for thread to finish with timeout
         if self.translation_thread and self.translation_thread.is_alive():
             self.translation_thread.join(timeout=2.0)
@@ -1046,7 +1049,7 @@ class SpeakSwapApp:
 
     def translate_text_input(self):
         """Translate the text in the input field"""
-        if not TRANSLATOR_AVAILABLE:
+        if not self.core.translation_available:
             messagebox.showerror("Error", "Translation library is not available. Please install deep-translator.")
             return
             
@@ -1059,9 +1062,12 @@ class SpeakSwapApp:
         source_lang = self.language_codes[self.input_lang.get()]
         target_lang = self.language_codes[self.output_lang.get()]
         
-        if source_lang == "auto" and not self.detect_language(input_text):
-            messagebox.showerror("Error", "Cannot detect language. Please select a specific input language.")
-            return
+        # Detect once here; the worker thread receives the resolved language
+        if source_lang == "auto":
+            detected_lang = self.detect_language(input_text)
+            if detected_lang:
+                source_lang = detected_lang
+                self.update_status(f"Detected language: {detected_lang}")
             
         # Start translation in a separate thread
         threading.Thread(
@@ -1073,33 +1079,18 @@ class SpeakSwapApp:
     def process_text_translation(self, input_text, source_lang, target_lang):
         """Process text translation in a separate thread"""
         self.update_status("Translating text...")
-        self.progress_bar.start(10)
+        self.ui_bus.post(self.progress_bar.start, 10)
         
         try:
-            # Detect language if auto is selected
-            if source_lang == "auto":
-                detected_lang = self.detect_language(input_text)
-                if detected_lang:
-                    source_lang = detected_lang
-                    self.update_status(f"Detected language: {detected_lang}")
-                else:
-                    # Fallback to English
-                    source_lang = "en"
-                    self.update_status("Could not detect language, using English as source")
-            
-            # Translate text
+            # Translate text; a source still "auto" is detected by the translation service
             translated_text = self.translate_text(input_text, source_lang, target_lang)
             
             if translated_text:
                 # Update output text
-                self.output_text.delete("1.0", tk.END)
-                self.output_text.insert(tk.END, translated_text)
+                self.ui_bus.post(self.show_text_translation, translated_text)
                 
-                # Auto-scroll to top
-                if self.voice_settings.get("auto_scroll", True):
-                    self.output_text.see("1.0")
-                
-                # Speak translated text if requested
+                # Speak on its own thread: a full speech queue makes speak_text
+                # wait for a slot instead of dropping the phrase
                 threading.Thread(
                     target=self.speak_text,
                     args=(translated_text, target_lang),
@@ -1114,59 +1105,69 @@ class SpeakSwapApp:
             print(error_msg)
             self.update_status(error_msg, is_error=True)
         finally:
-            self.progress_bar.stop()
+            self.ui_bus.post(self.progress_bar.stop)
+
+    def show_text_translation(self, translated_text):
+        """Replace the output pane with a text translation; runs on the Tk thread"""
+        self.output_transcript.reset(clear_widget=False)
+        self.output_text.delete("1.0", tk.END)
+        self.output_text.insert(tk.END, translated_text)
+        
+        # Auto-scroll to top
+        if self.voice_settings.get("auto_scroll", True):
+            self.output_text.see("1.0")
 
     def detect_language(self, text):
         """Detect language of the given text"""
-        if not TRANSLATOR_AVAILABLE:
-            return None
-            
-        try:
-            from deep_translator import GoogleTranslator
-            # Use the first few words for detection
-            sample = " ".join(text.split()[:20])
-            detected = GoogleTranslator().detect(sample)
-            return detected
-        except Exception as e:
-            print(f"Language detection error: {str(e)}")
-            return None
+        return self.core.detect_language(text)
 
     def translate_text(self, text, source_lang, target_lang):
         """Translate text from source language to target language"""
-        if not TRANSLATOR_AVAILABLE:
+        return self.core.translate_text(text, source_lang, target_lang)
+
+    def create_speech_queue(self):
+        """Start prefetched speech output, or return None to speak phrase by phrase"""
+        if not SOUNDDEVICE_AVAILABLE or self.core.tts_backend() is None:
             return None
-            
         try:
-            from deep_translator import GoogleTranslator
-            # Handle long texts by splitting into chunks
-            chunk_size = 4000  # Google API limit is around 5000 chars
-            chunks = [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-            
-            translated_chunks = []
-            for chunk in chunks:
-                # Replace source_lang with 'auto' if it equals 'auto'
-                actual_source = 'auto' if source_lang == 'auto' else source_lang
-                translator = GoogleTranslator(source=actual_source, target=target_lang)
-                translated = translator.translate(chunk)
-                translated_chunks.append(translated)
-            
-            return " ".join(translated_chunks)
+            player = SpeechPlayer().start()
         except Exception as e:
-            print(f"Translation error: {str(e)}")
-            # Try with fallback service if Google fails
-            try:
-                from deep_translator import MyMemoryTranslator
-                translator = MyMemoryTranslator(source=source_lang, target=target_lang)
-                return translator.translate(text[:9999])  # MyMemory has a 10k char limit
-            except Exception as e2:
-                print(f"Fallback translation error: {str(e2)}")
-                return None
+            print(f"Failed to open audio output: {str(e)}")
+            return None
+        return SpeechQueue(
+            self.synthesize_for_queue,
+            player,
+            prefetch=self.voice_settings.get("tts_prefetch", 2),
+            max_pending=self.voice_settings.get("tts_max_pending", 4),
+            on_status=self.update_status
+        )
+
+    def can_queue_speech(self):
+        """True if speech can be rendered into memory and played by self.speech"""
+        if not self.speech:
+            return False
+        return self.core.tts_backend() != "gtts" or self.core.mp3_decodable
+
+    def synthesize_for_queue(self, text, language_code):
+        """Render a clip for the speech queue, playing undecodable MP3 from a file instead"""
+        try:
+            return self.core.synthesize(text, language_code)
+        except UndecodableSpeech as e:
+            # Later phrases skip the queue (can_queue_speech() is now False)
+            print(f"Google TTS error: {str(e)}")
+            self.play_mp3(e.mp3)
+            return None
 
     def speak_text(self, text, language_code):
         """Speak the translated text in the target language"""
         if not text:
             return
             
+        # Render ahead and play gaplessly from memory
+        if self.can_queue_speech():
+            self.speech.speak(text, language_code)
+            return
+            
         # Try using local TTS engine first
         if self.engine and not self.voice_settings.get("use_gtts", False):
             try:
@@ -1193,152 +1194,241 @@ class SpeakSwapApp:
             try:
                 self.update_status("Using Google TTS...")
                 
-                from gtts import gTTS
-                tts = gTTS(text=text, lang=language_code)
-                
-                # Save to temporary file
-                temp_file = os.path.join(TEMP_DIR, "speakswap_tts.mp3")
-                tts.save(temp_file)
-                
-                # Play using playsound if available
-                if PLAYSOUND_AVAILABLE:
-                    playsound(temp_file)
-                    self.update_status("Speaking complete")
-                else:
-                    self.update_status("Cannot play speech (playsound not installed)", is_error=True)
-                
-                # Clean up temp file
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-                    
+                self.play_mp3(gtts_mp3(text, language_code))
             except Exception as e:
                 print(f"Google TTS error: {str(e)}")
                 self.update_status("Text-to-speech failed", is_error=True)
 
-    def translation_worker(self):
-        """Worker thread for continuous speech recognition and translation"""
+    def play_mp3(self, mp3):
+        """Play MP3 bytes with playsound through a temporary file"""
+        if not PLAYSOUND_AVAILABLE:
+            self.update_status("Cannot play speech (playsound not installed)", is_error=True)
+            return
+        
+        # playsound needs a file; give each request its own so
+        # concurrent phrases never overwrite each other
+        fd, temp_file = tempfile.mkstemp(prefix="speakswap-tts-", suffix=".mp3")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(mp3)
+            playsound(temp_file)
+            self.update_status("Speaking complete")
+        finally:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+    def translation_worker(self, source_lang, target_lang):
+        """Worker thread for continuous speech recognition and translation
+
+        Recognition, translation and speech run as separate pipeline stages
+        connected by small bounded queues, so phrase N+1 is recognized and
+        translated while phrase N is still being spoken.
+        """
+        # Load Whisper on first use of live mode
+        if WHISPER_AVAILABLE and self.voice_settings.get("use_whisper", True):
+            self.setup_whisper_model()
+
+        # Several speakers at once: one capture path per configured source
+        if self.voice_settings.get("capture_sources"):
+            self.multi_source_worker(source_lang, target_lang)
+            return
+        
         # Initialize recognizer
         recognizer = sr.Recognizer()
         
-        # Get language codes
-        source_lang = self.language_codes[self.input_lang.get()]
-        target_lang = self.language_codes[self.output_lang.get()]
+        queue_size = self.voice_settings.get("pipeline_queue_size", 2)
+        pipeline = StagedPipeline(
+            [
+                Stage("recognize", lambda audio: self.recognize_phrase(recognizer, audio, source_lang), queue_size),
+                Stage("translate", lambda phrase: self.translate_phrase(phrase, source_lang, target_lang), queue_size),
+                Stage("speak", lambda text: self.speak_phrase(text, target_lang), queue_size)
+            ],
+            on_error=self.on_pipeline_error
+        ).start()
+        self.pipeline = pipeline
         
-        # Setup audio stream
-        audio_buffer = queue.Queue()
+        # Setup audio stream feeding the first stage
         stop_audio_event = threading.Event()
         audio_thread = threading.Thread(
             target=self.audio_stream_worker,
-            args=(audio_buffer, stop_audio_event),
+            args=(pipeline, stop_audio_event, source_lang),
             daemon=True
         )
         audio_thread.start()
         
         while self.keep_running:
-            try:
-                # Check if we have audio data
-                try:
-                    audio_data = audio_buffer.get(timeout=1.0)
-                except queue.Empty:
-                    continue
-                
-                self.update_status("Recognizing speech...")
-                
-                # Use Whisper if available and enabled
-                if self.whisper_pipe and self.voice_settings.get("use_whisper", False):
-                    # Convert audio data to numpy array
-                    temp_file = os.path.join(TEMP_DIR, "speech_input.wav")
-                    with wave.open(temp_file, 'wb') as wf:
-                        wf.setnchannels(1)
-                        wf.setsampwidth(2)
-                        wf.setframerate(44100)
-                        wf.writeframes(audio_data.get_wav_data())
-                    
-                    # Process with Whisper
-                    result = self.whisper_pipe(temp_file)
-                    recognized_text = result["text"]
-                    
-                    # Clean up temp file
-                    try:
-                        os.remove(temp_file)
-                    except:
-                        pass
-                else:
-                    # Fallback to standard recognizer
-                    if source_lang == "auto":
-                        # Let Google detect the language
-                        recognized_text = recognizer.recognize_google(audio_data)
-                    else:
-                        # Use specified language
-                        recognized_text = recognizer.recognize_google(audio_data, language=source_lang)
-                
-                if recognized_text:
-                    # Update input text
-                    current_text = self.input_text.get("1.0", tk.END).strip()
-                    
-                    self.input_text.delete("1.0", tk.END)
-                    if current_text:
-                        new_text = f"{current_text}\n{recognized_text}"
-                    else:
-                        new_text = recognized_text
-                    
-                    self.input_text.insert(tk.END, new_text)
-                    
-                    # Auto-scroll if enabled
-                    if self.voice_settings.get("auto_scroll", True):
-                        self.input_text.see(tk.END)
-                    
-                    # Translate the recognized text
-                    self.update_status("Translating...")
-                    translated_text = self.translate_text(recognized_text, source_lang, target_lang)
-                    
-                    if translated_text:
-                        # Update output text
-                        current_output = self.output_text.get("1.0", tk.END).strip()
-                        
-                        self.output_text.delete("1.0", tk.END)
-                        if current_output:
-                            new_output = f"{current_output}\n{translated_text}"
-                        else:
-                            new_output = translated_text
-                        
-                        self.output_text.insert(tk.END, new_output)
-                        
-                        # Auto-scroll if enabled
-                        if self.voice_settings.get("auto_scroll", True):
-                            self.output_text.see(tk.END)
-                        
-                        # Speak the translated text
-                        self.speak_text(translated_text, target_lang)
-                    else:
-                        self.update_status("Translation failed", is_error=True)
-                
-                # Short pause between recognition attempts
-                time.sleep(0.5)
-                
-            except sr.UnknownValueError:
-                self.update_status("Speech not recognized, listening...")
-            except sr.RequestError as e:
-                error_msg = f"Recognition service error: {str(e)}"
-                print(error_msg)
-                self.update_status(error_msg, is_error=True)
-                time.sleep(2)  # Pause before retry
-            except Exception as e:
-                error_msg = f"Error in translation worker: {str(e)}"
-                print(error_msg)
-                traceback.print_exc()
-                self.update_status(error_msg, is_error=True)
-                time.sleep(2)  # Pause before retry
+            time.sleep(0.2)
         
         # Cleanup
         stop_audio_event.set()
+        pipeline.stop()
         if audio_thread.is_alive():
             audio_thread.join(timeout=2.0)
+        print(f"Pipeline wait times: {pipeline.format_stats()}")
+
+    def multi_source_worker(self, source_lang, target_lang):
+        """Translate every source in capture_sources concurrently
+
+        Each entry is a dict with label, device, channel and optionally
+        language; sources without a language use the one selected in the UI.
+        Phrases are shown labelled with their source and are not spoken, as
+        several voices would talk over each other.
+        """
+        if not self.whisper_pipe:
+            self.update_status("Multi-source capture needs the Whisper model", is_error=True)
+            return
+        
+        sources = []
+        for index, entry in enumerate(self.voice_settings["capture_sources"]):
+            source = CaptureSource.from_dict(entry, index)
+            if "language" not in entry:
+                source.language = source_lang
+            sources.append(source)
+        
+        session = CaptureSession(
+            self.core,
+            sources,
+            target_lang,
+            on_result=self.show_source_result,
+            on_error=lambda source, error: self.update_status(
+                f"Capture error ({source.label}): {str(error)}", is_error=True
+            ),
+            settings=self.voice_settings
+        )
+        try:
+            session.start()
+        except Exception as e:
+            self.update_status(f"Failed to start multi-source capture: {str(e)}", is_error=True)
+            return
+        
+        self.update_status(f"Listening to {len(sources)} sources...")
+        while self.keep_running:
+            time.sleep(0.2)
+        
+        session.stop()
+        print(f"Multi-source session stats: {session.stats()}")
+
+    def show_source_result(self, result):
+        """Show a phrase from one source of a multi-source session"""
+        see_end = self.voice_settings.get("auto_scroll", True)
+        self.input_transcript.add(f"{result.label}: {result.text}", language=result.language, see_end=see_end)
+        if result.translation:
+            self.output_transcript.add(f"{result.label}: {result.translation}", see_end=see_end)
+
+    def recognize_phrase(self, recognizer, audio_data, source_lang):
+        """Pipeline stage: convert captured audio into text
+
+        Returns (text, spoken language, probability); the language is only
+        known when Whisper transcribed the phrase.
+        """
+        self.update_status("Recognizing speech...")
+        spoken_lang = None
+        probability = 0.0
+        
+        try:
+            # Use Whisper if available and enabled
+            if self.whisper_pipe and self.voice_settings.get("use_whisper", False):
+                # Convert captured frames to a 16 kHz float32 array in memory
+                whisper_input = audio_data_to_whisper_input(audio_data)
+                whisper_input["raw"] = self.enhance_audio(whisper_input["raw"], whisper_input["sampling_rate"])
+                
+                # Process with Whisper, which predicts the spoken language while decoding
+                result = self.core.transcribe(whisper_input, language=source_lang)
+                spoken_lang = result["language"]
+                probability = result["language_probability"]
+                recognized_text = result["text"]
+            else:
+                # Fallback to standard recognizer
+                if isinstance(audio_data, SpeechSegment):
+                    audio_data = sr.AudioData(
+                        audio_data.get_raw_data(),
+                        audio_data.sample_rate,
+                        audio_data.sample_width
+                    )
+                if source_lang == "auto":
+                    # Let Google detect the language
+                    recognized_text = recognizer.recognize_google(audio_data)
+                else:
+                    # Use specified language
+                    recognized_text = recognizer.recognize_google(audio_data, language=source_lang)
+        except sr.UnknownValueError:
+            self.clear_partial_transcript(getattr(audio_data, "utterance_id", None))
+            self.update_status("Speech not recognized, listening...")
+            return None
+        except sr.RequestError as e:
+            error_msg = f"Recognition service error: {str(e)}"
+            print(error_msg)
+            self.update_status(error_msg, is_error=True)
+            time.sleep(2)  # Pause before retry
+            return None
+        
+        recognized_text = recognized_text.strip() if recognized_text else ""
+        if not recognized_text:
+            self.clear_partial_transcript(getattr(audio_data, "utterance_id", None))
+            return None
+        
+        # The final text replaces any partial hypothesis on screen
+        self.clear_partial_transcript(getattr(audio_data, "utterance_id", None))
+        
+        # Update input text
+        self.input_transcript.add(
+            recognized_text,
+            language=spoken_lang or (source_lang if source_lang != "auto" else None),
+            see_end=self.voice_settings.get("auto_scroll", True)
+        )
+        
+        return recognized_text, spoken_lang, probability
 
-    def audio_stream_worker(self, audio_queue, stop_event):
-        """Worker thread for continuous audio streaming"""
+    def translate_phrase(self, phrase, source_lang, target_lang):
+        """Pipeline stage: translate a recognized phrase and show it"""
+        recognized_text, spoken_lang, probability = phrase
+        
+        # Reuse Whisper's language prediction instead of detecting again
+        if source_lang == "auto" and spoken_lang and \
+                probability >= self.voice_settings.get("whisper_language_min_probability", 0.5):
+            source_lang = spoken_lang
+        
+        self.update_status("Translating...")
+        translated_text = self.translate_text(recognized_text, source_lang, target_lang)
+        
+        if not translated_text:
+            self.update_status("Translation failed", is_error=True)
+            return None
+        
+        # Update output text
+        self.output_transcript.add(
+            translated_text,
+            language=target_lang,
+            see_end=self.voice_settings.get("auto_scroll", True)
+        )
+        
+        return translated_text
+
+    def speak_phrase(self, translated_text, target_lang):
+        """Pipeline stage: speak a translated phrase"""
+        self.speak_text(translated_text, target_lang)
+        return translated_text
+
+    def on_pipeline_error(self, stage_name, error):
+        """Report an unexpected error raised inside a pipeline stage"""
+        error_msg = f"Error in {stage_name} stage: {str(error)}"
+        print(error_msg)
+        traceback.print_exc()
+        self.update_status(error_msg, is_error=True)
+
+    def audio_stream_worker(self, pipeline, stop_event, source_lang="auto"):
+        """Worker thread for continuous audio streaming into the pipeline"""
+        if self.voice_settings.get("use_vad", True):
+            try:
+                self.vad_stream_worker(pipeline, stop_event, source_lang)
+                return
+            except Exception as e:
+                error_msg = f"Voice activity capture failed, using basic listener: {str(e)}"
+                print(error_msg)
+                self.update_status(error_msg, is_error=True)
+        
         # Setup audio stream with error handling
         microphone = None
         audio_stream = None
@@ -1348,7 +1438,7 @@ class SpeakSwapApp:
             
             # Apply audio settings
             recognizer.dynamic_energy_threshold = True
-            recognizer.energy_threshold = 300  # Adjust based on testing
+            recognizer.energy_threshold = self.voice_settings.get("vad_energy_threshold", 300)
             recognizer.pause_threshold = 0.8   # Shorter pause for more responsive recognition
             
             # Get default microphone
@@ -1364,7 +1454,9 @@ class SpeakSwapApp:
                     try:
                         # Listen for audio with timeout
                         audio_data = recognizer.listen(source, timeout=10.0, phrase_time_limit=5.0)
-                        audio_queue.put(audio_data)
+                        # Blocks while recognition is behind (backpressure)
+                        if not pipeline.submit(audio_data):
+                            break
                     except sr.WaitTimeoutError:
                         # No speech detected within timeout
                         continue
@@ -1384,64 +1476,174 @@ class SpeakSwapApp:
             if audio_stream and hasattr(audio_stream, 'close'):
                 audio_stream.close()
 
-    def enhance_audio(self, audio_data):
-        """Apply audio enhancement to improve speech recognition quality"""
+    def vad_stream_worker(self, pipeline, stop_event, source_lang="auto"):
+        """Capture with sounddevice and emit phrases as soon as speech ends
+
+        The audio callback writes into a preallocated ring buffer and the
+        segmenter reads frames from it in place; audio is only copied once a
+        whole phrase has been detected. With Whisper, the phrase in progress
+        is also re-decoded periodically to show partial text.
+        """
+        sample_rate = self.voice_settings.get("capture_sample_rate", WHISPER_SAMPLE_RATE)
+        max_segment_s = self.voice_settings.get("vad_max_segment_s", 15.0)
+        capture = MicrophoneCapture(
+            sample_rate=sample_rate,
+            seconds=max_segment_s + 15.0,
+            frame_length=int(sample_rate * VAD_FRAME_MS / 1000),
+            process=self.create_enhancer(sample_rate)
+        )
+        segmenter = VoiceActivitySegmenter(
+            sample_rate=sample_rate,
+            energy_threshold=self.voice_settings.get("vad_energy_threshold", 300),
+            hangover_ms=self.voice_settings.get("vad_hangover_ms", 300),
+            max_segment_s=max_segment_s,
+            ring=capture.ring,
+            adaptive=self.voice_settings.get("vad_adaptive_threshold", True),
+            noise_window_s=self.voice_settings.get("vad_noise_window_s", 3.0),
+            noise_percentile=self.voice_settings.get("vad_noise_percentile", 20),
+            noise_ratio=self.voice_settings.get("vad_noise_ratio", 3.0)
+        )
+        self.segmenter = segmenter
+        
+        streamer = None
+        if self.whisper_pipe and self.voice_settings.get("use_whisper", False) and \
+                self.voice_settings.get("streaming_asr", True):
+            streamer = StreamingTranscriber(
+                decode=lambda audio: self.decode_partial(audio, source_lang),
+                on_partial=self.show_partial_transcript,
+                interval_s=self.voice_settings.get("partial_interval_ms", 400) / 1000,
+                window_s=max_segment_s
+            ).start()
+        
+        try:
+            with capture:
+                self.update_status("Microphone ready, listening...")
+                
+                while not stop_event.is_set():
+                    if not capture.wait(timeout=0.2):
+                        continue
+                    
+                    for segment in segmenter.process():
+                        if streamer:
+                            streamer.finish(segment.utterance_id)
+                        # Blocks while recognition is behind (backpressure)
+                        if not pipeline.submit(segment):
+                            return
+                    
+                    # Offer the phrase in progress for a partial decode
+                    if streamer and segmenter.in_speech and streamer.due():
+                        audio = segmenter.current_audio()
+                        if audio is not None and len(audio) >= sample_rate // 2:
+                            streamer.submit(
+                                segmenter.utterance_id,
+                                int16_to_whisper_array(audio, sample_rate)
+                            )
+        finally:
+            self.segmenter = None
+            if streamer:
+                streamer.stop()
+                self.clear_partial_transcript()
+        
+        if capture.overflows or segmenter.overruns:
+            print(f"Audio capture dropped data: {capture.overflows} device overflows, "
+                  f"{segmenter.overruns} ring overruns")
+        print(f"Voice activity metrics: {segmenter.metrics()}")
+
+    def capture_metrics(self):
+        """Live speech/silence thresholds of the running segmenter, or None"""
+        return self.segmenter.metrics() if self.segmenter else None
+
+    def refresh_capture_metrics(self):
+        """Show the segmenter's noise floor and threshold in the status bar"""
+        if not hasattr(self, 'win') or not self.win:
+            return
+
+        metrics = self.capture_metrics()
+        text = ""
+        if metrics:
+            text = f"Speech threshold {metrics['energy_threshold']:.0f}"
+            if metrics["noise_floor"] is not None:
+                text = f"Noise floor {metrics['noise_floor']:.0f} · {text}"
+        self.vad_label.config(text=text)
+        self.win.after(500, self.refresh_capture_metrics)
+
+    def decode_partial(self, audio, source_lang):
+        """Quick Whisper decode of the phrase in progress"""
+        return self.core.transcribe(audio, language=source_lang, max_new_tokens=64)["text"]
+
+    def show_partial_transcript(self, utterance_id, committed, tentative):
+        """Show the live hypothesis for the phrase being spoken"""
+        self.input_transcript.show_partial(
+            utterance_id,
+            committed,
+            tentative,
+            see_end=self.voice_settings.get("auto_scroll", True)
+        )
+
+    def clear_partial_transcript(self, utterance_id=None):
+        """Remove the partial hypothesis (optionally only for one utterance)"""
+        self.input_transcript.clear_partial(utterance_id)
+
+    def create_enhancer(self, sample_rate):
+        """Per-block filter applied in the capture callback, or None when disabled"""
         if not self.voice_settings.get("enhance_audio", True):
-            return audio_data
+            return None
+        enhancer = StreamingEnhancer(
+            sample_rate,
+            cutoff_hz=self.voice_settings.get("highpass_hz", 100),
+            agc=self.voice_settings.get("capture_agc", False)
+        )
+        return enhancer.process
+
+    def enhance_audio(self, samples, sample_rate):
+        """Apply whole-phrase enhancement to a float32 phrase before recognition"""
+        if not self.voice_settings.get("enhance_audio", True):
+            return samples
             
         try:
-            # Get audio as numpy array
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            # Apply simple noise reduction (high-pass filter)
-            from scipy import signal
-            b, a = signal.butter(4, 100/(44100/2), 'highpass')
-            filtered_audio = signal.filtfilt(b, a, audio_array)
-            
-            # Normalize audio
-            normalized_audio = filtered_audio * (32767 / max(abs(filtered_audio)))
-            
-            # Convert back to bytes
-            enhanced_audio = normalized_audio.astype(np.int16).tobytes()
-            return enhanced_audio
+            enhanced = samples
+            if self.voice_settings.get("spectral_gate", False):
+                enhanced = spectral_gate(enhanced, sample_rate)
+            target_peak = self.voice_settings.get("normalize_peak", 0.9)
+            if target_peak:
+                enhanced = normalize_peak(enhanced, target_peak)
+            return enhanced
         except Exception as e:
             print(f"Audio enhancement error: {str(e)}")
-            return audio_data  # Return original if enhancement fails
+            return samples  # Return original if enhancement fails
 
     def on_close(self):
         """Handle application cleanup and exit"""
         # Stop any running threads
         self.keep_running = False
+        if self.ui_bus:
+            self.ui_bus.stop()
         
         # Wait for threads to finish
         if self.translation_thread and self.translation_thread.is_alive():
             self.translation_thread.join(timeout=2.0)
         
         # Clean up TTS engine
+        if self.speech:
+            self.speech.close()
         if self.engine:
             try:
                 self.engine.stop()
             except:
                 pass
         
-        # Clean up Whisper model
-        if self.whisper_model:
-            try:
-                # Force cleanup
-                import gc
-                self.whisper_model = None
-                self.whisper_processor = None
-                self.whisper_pipe = None
-                gc.collect()
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-            except:
-                pass
+        # Flush the transcript history files
+        for transcript in (self.input_transcript, self.output_transcript):
+            if transcript:
+                transcript.close()
+        
+        # Release the Whisper model, translation pools and cache
+        if self.core:
+            self.core.close()
         
         # Delete any temporary files
         try:
             temp_files = [
-                os.path.join(TEMP_DIR, "speakswap_tts.mp3"),
                 os.path.join(TEMP_DIR, "speech_input.wav")
             ]
             for file in temp_files:
@@ -1460,6 +1662,11 @@ class SpeakSwapApp:
 
 def main():
     """Main entry point for the application"""
+    # Headless batch jobs: python main.py batch ...
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from speakswap.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     try:
         app = SpeakSwapApp()
         app.run()
@@ -10,7 +10,7 @@ build_exe_options = {
         "tkinter", "gtts", "speech_recognition", "playsound", "deep_translator",
         "google.transliteration", "queue", "time", "pyttsx3", "sounddevice",
         "numpy", "scipy", "json", "dotenv", "wave", "io", "torch", "transformers",
-        "torchaudio", "PIL", "requests"
+        "torchaudio", "PIL", "requests", "speakswap"
     ],
     "include_files": [
         "icon.png",
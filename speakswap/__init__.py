@@ -0,0 +1 @@
+"""Reusable building blocks for the SpeakSwap voice translator"""
@@ -0,0 +1,5 @@
+import sys
+
+from speakswap.cli import main
+
+sys.exit(main())
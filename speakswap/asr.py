@@ -0,0 +1,175 @@
+import numpy as np
+
+from speakswap.audio import WHISPER_SAMPLE_RATE
+from speakswap.lazy import lazy_import
+
+torch = lazy_import("torch")
+
+# SpeakSwap language codes that Whisper spells differently
+_TO_WHISPER = {"zh-CN": "zh"}
+_FROM_WHISPER = {whisper: code for code, whisper in _TO_WHISPER.items()}
+
+# Whisper only sees 30 s of audio per forward pass
+MAX_SINGLE_PASS_SECONDS = 30
+
+# Selectable model sizes, fastest first
+WHISPER_TIERS = {
+    "tiny": "openai/whisper-tiny",
+    "base": "openai/whisper-base",
+    "small": "openai/whisper-small",
+    # Distilled large-v3: close to large accuracy with a 2-layer decoder,
+    # but trained mostly on English speech
+    "distil": "distil-whisper/distil-large-v3"
+}
+DEFAULT_TIER = "base"
+
+
+def select_model_id(tier="auto", cuda=False, cuda_memory=0):
+    """Return the Hugging Face model id for a tier name
+
+    "auto" keeps the previous behaviour: large-v3 on GPUs with 8+ GB,
+    base everywhere else. Unknown names are treated as model ids.
+    """
+    if not tier or tier == "auto":
+        if cuda and cuda_memory >= 8e9:
+            return "openai/whisper-large-v3"
+        return WHISPER_TIERS[DEFAULT_TIER]
+    return WHISPER_TIERS.get(tier, tier)
+
+
+def configure_cpu_threads(threads):
+    """Set the intra-op thread count used by CPU inference (0 keeps the default)"""
+    if threads and threads > 0:
+        torch.set_num_threads(int(threads))
+    return torch.get_num_threads()
+
+
+def quantize_for_cpu(model):
+    """Apply dynamic int8 quantization to the model's linear layers
+
+    Weights are stored as int8 and activations quantized on the fly, which
+    roughly halves CPU inference time of the encoder and decoder with a
+    small accuracy cost. Only valid for float32 models on the CPU.
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def to_whisper_language(code):
+    """Convert a SpeakSwap language code to Whisper's code"""
+    return _TO_WHISPER.get(code, code)
+
+
+def from_whisper_language(code):
+    """Convert a Whisper language code to SpeakSwap's code"""
+    return _FROM_WHISPER.get(code, code)
+
+
+def _language_token_ids(model, languages=None):
+    """Return {whisper code: token id} for the candidate languages"""
+    lang_to_id = getattr(model.generation_config, "lang_to_id", None) or {}
+    candidates = {}
+    for token, token_id in lang_to_id.items():
+        code = token.strip("<|>")
+        if languages is None or code in languages:
+            candidates[code] = token_id
+    return candidates
+
+
+def detect_languages_from_encoder(model, encoder_outputs, languages=None):
+    """Return a (whisper language code, probability) pair per batch item
+
+    This is the same prediction Whisper makes for its language token while
+    decoding; restricting it to the supported languages avoids guesses that
+    the translator could not use anyway.
+    """
+    batch_size = encoder_outputs[0].shape[0]
+    if not getattr(model.generation_config, "is_multilingual", True):
+        return [("en", 1.0)] * batch_size
+    candidates = _language_token_ids(model, languages)
+    if not candidates:
+        return [(None, 0.0)] * batch_size
+
+    decoder_input_ids = torch.full(
+        (batch_size, 1),
+        model.generation_config.decoder_start_token_id,
+        dtype=torch.long,
+        device=model.device
+    )
+    logits = model(encoder_outputs=encoder_outputs, decoder_input_ids=decoder_input_ids).logits[:, -1]
+    codes = list(candidates)
+    token_ids = torch.tensor([candidates[code] for code in codes], device=logits.device)
+    probabilities = torch.softmax(logits[:, token_ids].float(), dim=-1)
+    best = probabilities.argmax(dim=-1)
+    return [(codes[int(index)], float(probabilities[row, index])) for row, index in enumerate(best)]
+
+
+def detect_language_from_encoder(model, encoder_outputs, languages=None):
+    """Return (whisper language code, probability) for the first batch item"""
+    return detect_languages_from_encoder(model, encoder_outputs, languages)[0]
+
+
+def transcribe(model, processor, audio, language=None, supported_languages=None, max_new_tokens=128):
+    """Transcribe 16 kHz float32 audio and report the spoken language
+
+    When language is None Whisper's own language prediction is used and
+    returned with its probability, so callers do not need a separate
+    text-based detection step. The encoder runs once for both detection and
+    decoding. Returns a dict with text, language and language_probability
+    (language uses SpeakSwap codes).
+    """
+    return transcribe_batch(
+        model, processor, [audio], [language], supported_languages, max_new_tokens
+    )[0]
+
+
+def transcribe_batch(model, processor, audios, languages=None, supported_languages=None, max_new_tokens=128):
+    """Transcribe several utterances (each at most 30 s) in one forward pass
+
+    languages gives a SpeakSwap code or None (detect) per utterance. Returns
+    one transcribe() result dict per utterance, in order.
+    """
+    audios = [np.asarray(audio["raw"] if isinstance(audio, dict) else audio, dtype=np.float32)
+              for audio in audios]
+    if languages is None:
+        languages = [None] * len(audios)
+
+    # Whisper pads every utterance to 30 s, so a batch is one dense tensor
+    features = processor.feature_extractor(
+        audios,
+        sampling_rate=WHISPER_SAMPLE_RATE,
+        return_tensors="pt"
+    ).input_features.to(model.device, dtype=model.dtype)
+
+    whisper_languages = None
+    if supported_languages:
+        whisper_languages = {to_whisper_language(code) for code in supported_languages}
+
+    with torch.inference_mode():
+        encoder_outputs = model.get_encoder()(features)
+
+        resolved = [(to_whisper_language(code), 1.0) if code else None for code in languages]
+        if None in resolved:
+            detected = detect_languages_from_encoder(model, encoder_outputs, whisper_languages)
+            resolved = [given or found for given, found in zip(resolved, detected)]
+
+        generate_kwargs = {"max_new_tokens": max_new_tokens}
+        batch_languages = [code for code, _ in resolved]
+        if all(batch_languages) and getattr(model.generation_config, "is_multilingual", True):
+            generate_kwargs["language"] = batch_languages
+            generate_kwargs["task"] = "transcribe"
+        generated = model.generate(
+            input_features=features,
+            encoder_outputs=encoder_outputs,
+            **generate_kwargs
+        )
+
+    sequences = generated.sequences if hasattr(generated, "sequences") else generated
+    texts = processor.batch_decode(sequences, skip_special_tokens=True)
+    return [
+        {
+            "text": text.strip(),
+            "language": from_whisper_language(code) if code else None,
+            "language_probability": probability
+        }
+        for text, (code, probability) in zip(texts, resolved)
+    ]
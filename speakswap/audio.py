@@ -0,0 +1,106 @@
+from math import gcd
+
+import numpy as np
+
+from speakswap.lazy import lazy_import, module_available
+
+signal = lazy_import("scipy.signal")
+
+# Whisper's feature extractor expects 16 kHz mono audio
+WHISPER_SAMPLE_RATE = 16000
+
+_PCM_DTYPES = {
+    1: np.uint8,
+    2: np.int16,
+    4: np.int32
+}
+
+
+def pcm_to_float32(raw_data, sample_width=2):
+    """Convert raw little-endian PCM bytes to a float32 array in [-1, 1]"""
+    dtype = _PCM_DTYPES.get(sample_width)
+    if dtype is None:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+
+    samples = np.frombuffer(raw_data, dtype=dtype)
+    if sample_width == 1:
+        # 8-bit PCM is unsigned and centred on 128
+        return (samples.astype(np.float32) - 128.0) / 128.0
+    return samples.astype(np.float32) / float(np.iinfo(dtype).max + 1)
+
+
+def resample(samples, orig_rate, target_rate=WHISPER_SAMPLE_RATE):
+    """Resample a float32 signal with a single polyphase filter pass"""
+    if orig_rate == target_rate or samples.size == 0:
+        return samples
+    divisor = gcd(int(orig_rate), int(target_rate))
+    up = int(target_rate) // divisor
+    down = int(orig_rate) // divisor
+    return signal.resample_poly(samples, up, down).astype(np.float32, copy=False)
+
+
+def int16_to_whisper_array(samples, sample_rate):
+    """Convert int16 samples to the 16 kHz float32 array Whisper expects"""
+    return resample(samples.astype(np.float32) / 32768.0, sample_rate)
+
+
+def audio_data_to_whisper_input(audio_data):
+    """Build an in-memory Whisper pipeline input from captured audio
+
+    Accepts a speech_recognition AudioData or a SpeechSegment. The frames are
+    used as captured (no WAV encode/decode) and resampled once to 16 kHz, so
+    the pipeline does not need to touch the disk or resample.
+    """
+    if hasattr(audio_data, "samples"):
+        raw = int16_to_whisper_array(audio_data.samples, audio_data.sample_rate)
+    else:
+        samples = pcm_to_float32(audio_data.get_raw_data(), audio_data.sample_width)
+        raw = resample(samples, audio_data.sample_rate)
+    return {
+        "raw": raw,
+        "sampling_rate": WHISPER_SAMPLE_RATE
+    }
+
+
+def _is_wav(source):
+    """True for a .wav path or a file object holding RIFF/WAVE data"""
+    if isinstance(source, str):
+        return source.lower().endswith(".wav")
+    position = source.tell()
+    header = source.read(12)
+    source.seek(position)
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def decode_audio(source):
+    """Decode a path or binary file object to (mono float32 samples, sample rate)
+
+    WAV is read with scipy; other formats (FLAC, MP3, AIFF) use soundfile
+    when it is installed and torchaudio otherwise.
+    """
+    if _is_wav(source):
+        from scipy.io import wavfile
+        sample_rate, samples = wavfile.read(source)
+        if samples.dtype.kind in "iu":
+            samples = pcm_to_float32(
+                np.ascontiguousarray(samples).tobytes(),
+                samples.dtype.itemsize
+            ).reshape(samples.shape)
+    elif module_available("soundfile"):
+        import soundfile
+        samples, sample_rate = soundfile.read(source, dtype="float32")
+    else:
+        import torchaudio
+        waveform, sample_rate = torchaudio.load(source)
+        samples = waveform.numpy().T
+
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return samples, int(sample_rate)
+
+
+def load_audio_file(path):
+    """Load a WAV or FLAC file as a 16 kHz mono float32 array"""
+    samples, sample_rate = decode_audio(path)
+    return resample(samples, sample_rate)
@@ -0,0 +1,294 @@
+"""Small performance benchmarks, run with `python -m speakswap bench ...`"""
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from speakswap.audio import WHISPER_SAMPLE_RATE
+
+# What the GUI imports at startup, followed by the stacks it should defer
+STARTUP_MODULES = ["main", "speakswap.engine"]
+DEFERRED_MODULES = ["torch", "transformers", "scipy.signal", "sounddevice", "speech_recognition", "PIL.Image"]
+
+
+def synthetic_speech(seconds=10.0, sample_rate=WHISPER_SAMPLE_RATE, seed=0):
+    """Speech-like test signal: voiced harmonics modulated at syllable rate
+
+    Used when no recording is given. It keeps the benchmark self-contained,
+    but real speech decodes into more tokens, so pass --audio for numbers
+    that match live use.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.3 * t) > -0.5)
+    signal = 0.3 * voiced * envelope + 0.005 * rng.standard_normal(len(t))
+    return signal.astype(np.float32)
+
+
+def benchmark_asr(tiers, audio=None, runs=3, threads=0, quantize=None):
+    """Measure load time and real-time factor of each Whisper tier
+
+    quantize None benchmarks both float32 and int8 on the CPU. Returns a
+    list of result dicts; RTF below 1.0 means faster than real time.
+    """
+    import torch
+
+    from speakswap.engine import SpeakSwapEngine
+
+    if audio is None:
+        audio = synthetic_speech()
+    duration = len(audio) / WHISPER_SAMPLE_RATE
+    if quantize is None:
+        variants = [False] if torch.cuda.is_available() else [False, True]
+    else:
+        variants = [quantize]
+
+    results = []
+    for tier in tiers:
+        for quantized in variants:
+            engine = SpeakSwapEngine({
+                "whisper_model": tier,
+                "quantize_whisper": quantized,
+                "torch_threads": threads,
+                "persist_translation_cache": False
+            })
+            try:
+                started = time.perf_counter()
+                if not engine.setup_whisper_model():
+                    results.append({"tier": tier, "int8": quantized, "error": "model failed to load"})
+                    continue
+                load_time = time.perf_counter() - started
+
+                # The first call pays for lazy initialisation; keep it out of the timing
+                engine.transcribe_long(audio, "en")
+                timings = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    engine.transcribe_long(audio, "en")
+                    timings.append(time.perf_counter() - started)
+                best = min(timings)
+                results.append({
+                    "tier": tier,
+                    "model": engine.whisper_model_id,
+                    "int8": quantized,
+                    "threads": torch.get_num_threads(),
+                    "load_s": load_time,
+                    "transcribe_s": best,
+                    "rtf": best / duration
+                })
+            finally:
+                engine.close()
+    return results
+
+
+def format_asr_results(results):
+    lines = [f"{'tier':<8} {'precision':<10} {'threads':>7} {'load s':>8} {'run s':>8} {'RTF':>7}"]
+    for result in results:
+        precision = "int8" if result["int8"] else "float"
+        if "error" in result:
+            lines.append(f"{result['tier']:<8} {precision:<10} {result['error']}")
+            continue
+        lines.append(
+            f"{result['tier']:<8} {precision:<10} {result['threads']:>7} {result['load_s']:>8.2f} "
+            f"{result['transcribe_s']:>8.2f} {result['rtf']:>7.3f}"
+        )
+    return "\n".join(lines)
+
+
+def benchmark_enhance(seconds=10.0, block_ms=30, sample_rate=WHISPER_SAMPLE_RATE, agc=True, gate=True):
+    """Per-block cost of the streaming enhancer against the block duration
+
+    Feeds synthetic speech through StreamingEnhancer block by block, as the
+    capture callback does, and times the whole-phrase steps once. Load
+    fractions far below 1.0 mean the capture thread keeps up easily.
+    """
+    from speakswap.enhance import StreamingEnhancer, normalize_peak, spectral_gate
+
+    audio = (synthetic_speech(seconds, sample_rate) * 32767).astype(np.int16)
+    block_length = int(sample_rate * block_ms / 1000)
+    enhancer = StreamingEnhancer(sample_rate, agc=agc)
+    # Design the filter and import scipy before timing
+    enhancer.process(audio[:block_length])
+
+    timings = []
+    for start in range(0, len(audio) - block_length + 1, block_length):
+        block = audio[start:start + block_length].reshape(-1, 1)
+        started = time.perf_counter()
+        enhancer.process(block)
+        timings.append(time.perf_counter() - started)
+    timings = np.array(timings)
+    block_seconds = block_length / sample_rate
+
+    phrase = audio.astype(np.float32) / 32768.0
+    started = time.perf_counter()
+    if gate:
+        phrase = spectral_gate(phrase, sample_rate)
+    normalize_peak(phrase)
+    phrase_time = time.perf_counter() - started
+
+    return {
+        "blocks": len(timings),
+        "block_ms": block_ms,
+        "mean_us": float(timings.mean() * 1e6),
+        "p99_us": float(np.percentile(timings, 99) * 1e6),
+        "block_load": float(timings.mean() / block_seconds),
+        "phrase_s": seconds,
+        "phrase_ms": phrase_time * 1000,
+        "phrase_load": phrase_time / seconds
+    }
+
+
+def format_enhance_results(result):
+    return "\n".join([
+        f"streaming: {result['blocks']} blocks of {result['block_ms']} ms, "
+        f"mean {result['mean_us']:.1f} us, p99 {result['p99_us']:.1f} us, "
+        f"load {result['block_load']:.4f} of real time",
+        f"phrase: {result['phrase_s']:.1f} s gated and normalized in {result['phrase_ms']:.1f} ms, "
+        f"load {result['phrase_load']:.4f} of real time"
+    ])
+
+
+def _sequential_translate(providers, text, source, target):
+    """The old strategy: try each provider in turn with no deadline"""
+    for provider in providers:
+        try:
+            result = provider.translate(text, source, target)
+            if result:
+                return result
+        except Exception:
+            continue
+    return None
+
+
+def benchmark_routing(requests=200, outage_at=0.5, seed=0):
+    """Latency of routed vs sequential translation under injected faults
+
+    The primary fake provider is fast but has a slow tail and 5% errors;
+    after `outage_at` of the requests it goes down entirely, failing only
+    after 1.5 s, as a hung connection would. The backup is slower but healthy.
+    """
+    from speakswap.providers import FakeProvider
+    from speakswap.routing import TranslationRouter
+
+    def make_providers():
+        return [
+            FakeProvider("primary", delay_s=0.02, jitter_s=0.03, error_rate=0.05, seed=seed),
+            FakeProvider("backup", delay_s=0.06, jitter_s=0.01, seed=seed + 1)
+        ]
+
+    def run(translate, providers):
+        timings = []
+        failures = 0
+        for index in range(requests):
+            if index == int(requests * outage_at):
+                providers[0].down = True
+                providers[0].delay_s = 1.5
+            started = time.perf_counter()
+            if not translate(f"phrase {index}", "en", "fr"):
+                failures += 1
+            timings.append(time.perf_counter() - started)
+        timings = np.array(timings) * 1000
+        return {
+            "p50_ms": float(np.percentile(timings, 50)),
+            "p95_ms": float(np.percentile(timings, 95)),
+            "p99_ms": float(np.percentile(timings, 99)),
+            "max_ms": float(timings.max()),
+            "failures": failures
+        }
+
+    providers = make_providers()
+    results = {"sequential": run(lambda *args: _sequential_translate(providers, *args), providers)}
+
+    providers = make_providers()
+    router = TranslationRouter(providers, deadline_s=2.0, hedge_min_s=0.05, reset_s=5.0)
+    try:
+        results["routed"] = run(router.translate, providers)
+        results["routed"]["providers"] = router.stats()
+    finally:
+        router.close()
+    return results
+
+
+def format_routing_results(results):
+    lines = [f"{'strategy':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'failed':>7}"]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<12} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+            f"{result['max_ms']:>8.1f} {result['failures']:>7}"
+        )
+    for provider, stats in results["routed"]["providers"].items():
+        lines.append(
+            f"  {provider}: {stats['calls']} calls, {stats['failures']} failed, {stats['timeouts']} timed out, "
+            f"{stats['hedges']} hedged, {stats['wins']} answered, breaker {stats['state']}"
+        )
+    return "\n".join(lines)
+
+
+def measure_import(module, python=None):
+    """Import a module in a fresh interpreter and return its import cost
+
+    Uses -X importtime. Returns a dict with total seconds and the modules
+    the target imports directly as (name, cumulative seconds), slowest first.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=project_root
+    )
+    children = []
+    imports = []
+    total = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        seconds = int(cumulative) / 1e6
+        # A module is printed after everything it imported, so the direct
+        # imports of a top-level module are the depth-1 lines before it
+        if depth == 1:
+            children.append((name.strip(), seconds))
+        elif depth == 0:
+            if name.strip() == module:
+                total = seconds
+                imports = children
+            children = []
+
+    result = {"module": module, "total_s": total, "imports": sorted(imports, key=lambda m: -m[1])}
+    if proc.returncode != 0:
+        result["error"] = (proc.stderr.strip().splitlines() or ["import failed"])[-1]
+    return result
+
+
+def benchmark_startup(modules=None, deferred=None, top=10):
+    """Import cost of the startup path and of the stacks loaded on demand"""
+    return {
+        "startup": [measure_import(module) for module in (modules or STARTUP_MODULES)],
+        "deferred": [measure_import(module) for module in (deferred or DEFERRED_MODULES)],
+        "top": top
+    }
+
+
+def format_startup_results(results):
+    lines = []
+    for result in results["startup"]:
+        total = f"{result['total_s'] * 1000:.0f} ms" if result["total_s"] is not None else "n/a"
+        lines.append(f"import {result['module']}: {total}")
+        if "error" in result:
+            lines.append(f"  failed: {result['error']}")
+        for name, seconds in result["imports"][:results["top"]]:
+            lines.append(f"  {seconds * 1000:8.1f} ms  {name}")
+    lines.append("Loaded on demand:")
+    for result in results["deferred"]:
+        if result["total_s"] is None:
+            lines.append(f"  {'n/a':>8}     {result['module']} ({result.get('error', 'not installed')})")
+        else:
+            lines.append(f"  {result['total_s'] * 1000:8.1f} ms  {result['module']}")
+    return "\n".join(lines)
@@ -0,0 +1,157 @@
+import threading
+
+import numpy as np
+
+from speakswap.lazy import lazy_import, module_available
+
+# Importing sounddevice loads PortAudio, so it waits until capture starts
+sd = lazy_import("sounddevice")
+SOUNDDEVICE_AVAILABLE = module_available("sounddevice")
+
+
+class RingBuffer:
+    """Preallocated int16 ring buffer addressed by absolute frame positions
+
+    A single writer (the audio callback) copies blocks in place; readers
+    track their own positions and get memoryview slices, so no sample data
+    is allocated or copied per block. Positions only ever grow; a position
+    older than write_pos - capacity has been overwritten.
+    """
+
+    def __init__(self, capacity, channels=1):
+        self.capacity = int(capacity)
+        self.channels = channels
+        self._data = np.zeros((self.capacity, channels), dtype=np.int16)
+        self.write_pos = 0
+
+    @property
+    def oldest_pos(self):
+        """Oldest absolute position that has not been overwritten yet"""
+        return max(0, self.write_pos - self.capacity)
+
+    def write(self, block):
+        """Copy a (frames, channels) or mono block into the ring"""
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block.reshape(-1, 1)
+        frames = len(block)
+        if frames > self.capacity:
+            block = block[-self.capacity:]
+            self.write_pos += frames - self.capacity
+            frames = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        self._data[start:start + first] = block[:first]
+        if first < frames:
+            self._data[:frames - first] = block[first:]
+        # Publish the new data only after it has been written
+        self.write_pos += frames
+
+    def views(self, start, stop, channel=0):
+        """Return one or two memoryviews covering [start, stop) of a channel"""
+        if start < self.oldest_pos:
+            raise IndexError("Ring buffer position has been overwritten")
+        if stop > self.write_pos:
+            raise IndexError("Ring buffer position has not been written yet")
+        begin = start % self.capacity
+        end = begin + (stop - start)
+        if end <= self.capacity:
+            return [memoryview(self._data[begin:end, channel])]
+        return [
+            memoryview(self._data[begin:, channel]),
+            memoryview(self._data[:end - self.capacity, channel])
+        ]
+
+    def frame(self, start, length, channel=0):
+        """Return a NumPy view of one frame that does not wrap around the ring"""
+        begin = start % self.capacity
+        if begin + length > self.capacity:
+            raise ValueError("Frame wraps around the ring; use a frame-aligned capacity")
+        return self._data[begin:begin + length, channel]
+
+    def copy(self, start, stop, channel=0):
+        """Copy [start, stop) of a channel into a new contiguous array"""
+        out = np.empty(stop - start, dtype=np.int16)
+        offset = 0
+        for view in self.views(start, stop, channel):
+            part = np.asarray(view)
+            out[offset:offset + len(part)] = part
+            offset += len(part)
+        return out
+
+
+def frame_aligned_capacity(sample_rate, seconds, frame_length):
+    """Ring capacity holding at least `seconds` of audio in whole frames"""
+    frames = -(-int(sample_rate * seconds) // frame_length)
+    return frames * frame_length
+
+
+class MicrophoneCapture:
+    """sounddevice input stream that records straight into a RingBuffer
+
+    process, if given, is called with each (frames, channels) int16 block on
+    the audio thread and returns the block to store; it must be causal and
+    cheap (see speakswap.enhance.StreamingEnhancer).
+    """
+
+    def __init__(self, sample_rate=16000, channels=1, device=None, seconds=30.0,
+                 frame_length=480, blocksize=None, process=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.device = device
+        self.blocksize = blocksize or frame_length
+        self.ring = RingBuffer(frame_aligned_capacity(sample_rate, seconds, frame_length), channels)
+        self.process = process
+        self.overflows = 0
+        self._data_ready = threading.Event()
+        self._stream = None
+
+    def _callback(self, indata, frame_count, time_info, status):
+        if status and status.input_overflow:
+            self.overflows += 1
+        if self.process is not None:
+            indata = self.process(indata)
+        self.ring.write(indata)
+        self._data_ready.set()
+
+    def start(self):
+        """Open and start the input stream"""
+        if not SOUNDDEVICE_AVAILABLE:
+            raise RuntimeError("sounddevice is not available")
+        try:
+            input_stream = sd.InputStream
+        except (ImportError, OSError) as e:
+            raise RuntimeError(f"sounddevice is not available: {str(e)}")
+        self._stream = input_stream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype="int16",
+            device=self.device,
+            blocksize=self.blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+        return self
+
+    def stop(self):
+        """Stop and close the input stream"""
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            finally:
+                self._stream = None
+        self._data_ready.set()
+
+    def wait(self, timeout=None):
+        """Wait until the callback has written new audio"""
+        ready = self._data_ready.wait(timeout)
+        self._data_ready.clear()
+        return ready
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,335 @@
+"""Headless batch translation of audio files and text corpora
+
+Usage:
+    python -m speakswap batch INPUT [INPUT ...] --target fr [options]
+    python main.py batch INPUT [INPUT ...] --target fr [options]
+    python -m speakswap bench asr [--tiers tiny,base,small,distil] [--audio FILE]
+    python -m speakswap bench startup [--modules main,speakswap.engine]
+    python -m speakswap bench enhance [--seconds 10] [--block-ms 30]
+    python -m speakswap bench routing [--requests 200]
+
+Inputs may be files or directories (searched recursively) of .wav/.flac
+recordings and .txt documents. Results are appended to results.jsonl in the
+output directory, one line per input, so an interrupted job resumes where it
+stopped when run again with the same output directory.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+AUDIO_EXTENSIONS = (".wav", ".flac")
+TEXT_EXTENSIONS = (".txt",)
+RESULTS_FILE = "results.jsonl"
+
+
+def collect_inputs(paths, exclude=None):
+    """Expand files and directories into a sorted list of supported files"""
+    exclude = os.path.abspath(exclude) if exclude else None
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                # Never pick up our own outputs when they live under an input
+                dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != exclude]
+                for name in files:
+                    if name.lower().endswith(AUDIO_EXTENSIONS + TEXT_EXTENSIONS):
+                        found.append(os.path.join(root, name))
+        elif os.path.isfile(path):
+            found.append(path)
+        else:
+            print(f"Skipping missing input: {path}")
+    return sorted(set(os.path.abspath(path) for path in found))
+
+
+def load_completed(results_path):
+    """Return the set of inputs already processed successfully"""
+    completed = set()
+    if not os.path.exists(results_path):
+        return completed
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["input"])
+    return completed
+
+
+def format_srt_time(seconds):
+    """Format seconds as an SRT timestamp (HH:MM:SS,mmm)"""
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def write_srt(path, segments):
+    """Write (start, end, text) segments as an SRT subtitle file"""
+    with open(path, "w", encoding="utf-8") as f:
+        for index, (start, end, text) in enumerate(segments, 1):
+            f.write(f"{index}\n{format_srt_time(start)} --> {format_srt_time(end)}\n{text}\n\n")
+
+
+class BatchJob:
+    """Run recognition, translation and optional TTS over many inputs"""
+
+    def __init__(self, engine, args):
+        self.engine = engine
+        self.args = args
+        self.results_path = os.path.join(args.output_dir, RESULTS_FILE)
+        self._write_lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.done = 0
+        self.failed = 0
+        self.audio_seconds = 0.0
+        self.characters = 0
+
+    def output_stem(self, input_path):
+        """Output path prefix for an input, unique even for equal file names"""
+        relative = os.path.relpath(input_path, os.path.commonpath([input_path, os.getcwd()]))
+        safe = relative.replace(os.sep, "__").replace(":", "")
+        return os.path.join(self.args.output_dir, os.path.splitext(safe)[0])
+
+    def process(self, input_path):
+        """Process a single input and return its result record"""
+        started = time.perf_counter()
+        record = {"input": input_path, "target_language": self.args.target}
+        try:
+            if input_path.lower().endswith(AUDIO_EXTENSIONS):
+                self.process_audio(input_path, record)
+            else:
+                self.process_text(input_path, record)
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+            if self.args.verbose:
+                traceback.print_exc()
+        record["elapsed"] = round(time.perf_counter() - started, 3)
+        return record
+
+    def process_audio(self, input_path, record):
+        from speakswap.audio import WHISPER_SAMPLE_RATE, load_audio_file
+        from speakswap.segmenter import join_translations
+
+        if not self.engine.asr_ready:
+            raise RuntimeError("Whisper is not available for audio inputs")
+        audio = load_audio_file(input_path)
+        duration = len(audio) / WHISPER_SAMPLE_RATE
+        result = self.engine.transcribe_long(audio, self.args.source)
+        source = result["language"] or self.args.source
+
+        segments = []
+        failed = 0
+        for start, end, text in result["segments"]:
+            translation = self.engine.translate_text(text, source, self.args.target)
+            if translation is None:
+                failed += 1
+            segments.append({"start": start, "end": end, "text": text, "translation": translation or ""})
+        # A partly translated file must not be recorded as done, or --resume would skip it
+        if failed:
+            raise RuntimeError(f"Translation failed for {failed} of {len(segments)} segments")
+        # The full translation is the segment translations joined, not a second request
+        translation = join_translations([s["translation"] for s in segments], self.args.target)
+
+        record.update({
+            "kind": "audio",
+            "duration": round(duration, 3),
+            "source_language": source,
+            "language_probability": round(result["language_probability"], 3),
+            "text": result["text"],
+            "translation": translation,
+            "segments": segments
+        })
+        if "srt" in self.args.formats and segments:
+            srt_path = f"{self.output_stem(input_path)}.{self.args.target}.srt"
+            write_srt(srt_path, [(s["start"], s["end"], s["translation"]) for s in segments])
+            record["srt"] = srt_path
+        self.add_speech(input_path, record)
+        with self._write_lock:
+            self.audio_seconds += duration
+
+    def process_text(self, input_path, record):
+        with open(input_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        source = self.args.source
+        if source == "auto":
+            source = self.engine.detect_language(text) or "auto"
+        translation = self.engine.translate_text(text, source, self.args.target) if text.strip() else ""
+        if translation is None:
+            raise RuntimeError("Translation failed")
+
+        record.update({
+            "kind": "text",
+            "source_language": source,
+            "characters": len(text),
+            "translation": translation
+        })
+        if "txt" in self.args.formats:
+            text_path = f"{self.output_stem(input_path)}.{self.args.target}.txt"
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write(translation)
+            record["translation_file"] = text_path
+        self.add_speech(input_path, record)
+        with self._write_lock:
+            self.characters += len(text)
+
+    def add_speech(self, input_path, record):
+        """Synthesize the translation when --tts is given"""
+        if not self.args.tts or not record.get("translation"):
+            return
+        record["speech"] = self.engine.synthesize_to_file(
+            record["translation"],
+            self.args.target,
+            f"{self.output_stem(input_path)}.{self.args.target}"
+        )
+
+    def write_record(self, record):
+        with self._write_lock:
+            with open(self.results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+            if record["status"] == "ok":
+                self.done += 1
+            else:
+                self.failed += 1
+
+    def report(self, total):
+        """Print progress and throughput"""
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        finished = self.done + self.failed
+        line = (f"[{finished}/{total}] {self.done} ok, {self.failed} failed | "
+                f"{finished / elapsed:.2f} files/s")
+        if self.audio_seconds:
+            line += f" | {self.audio_seconds / elapsed:.1f}x real time"
+        if self.characters:
+            line += f" | {self.characters / elapsed:.0f} chars/s"
+        print(line, flush=True)
+
+    def run(self, inputs):
+        os.makedirs(self.args.output_dir, exist_ok=True)
+        completed = load_completed(self.results_path) if self.args.resume else set()
+        pending = [path for path in inputs if path not in completed]
+        if completed:
+            print(f"Resuming: {len(inputs) - len(pending)} of {len(inputs)} inputs already done")
+        if not pending:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=self.args.workers) as executor:
+            futures = [executor.submit(self.process, path) for path in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                self.write_record(record)
+                if record["status"] != "ok":
+                    print(f"Failed: {record['input']}: {record['error']}")
+                self.report(len(pending))
+        return 1 if self.failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="speakswap", description="SpeakSwap headless tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Translate audio files and text documents")
+    batch.add_argument("inputs", nargs="+", help="Files or directories (.wav, .flac, .txt)")
+    batch.add_argument("-t", "--target", required=True, help="Target language code, e.g. fr")
+    batch.add_argument("-s", "--source", default="auto", help="Source language code (default: auto)")
+    batch.add_argument("-o", "--output-dir", default="speakswap_output", help="Directory for results")
+    batch.add_argument("-f", "--formats", default="jsonl,srt",
+                       help="Extra outputs besides results.jsonl: srt, txt (comma separated)")
+    batch.add_argument("-w", "--workers", type=int, default=4, help="Parallel workers (default: 4)")
+    batch.add_argument("--tts", action="store_true", help="Also synthesize the translations to audio files")
+    batch.add_argument("--no-resume", dest="resume", action="store_false",
+                       help="Reprocess inputs already recorded in results.jsonl")
+    batch.add_argument("--settings", help="Path to a voice_settings.json to use")
+    batch.add_argument("-v", "--verbose", action="store_true", help="Print tracebacks for failures")
+
+    bench = commands.add_parser("bench", help="Run performance benchmarks")
+    benchmarks = bench.add_subparsers(dest="benchmark", required=True)
+    asr = benchmarks.add_parser("asr", help="Real-time factor of each Whisper model tier")
+    asr.add_argument("--tiers", default="tiny,base,small,distil", help="Comma separated tiers")
+    asr.add_argument("--audio", help="Recording to transcribe (default: synthetic 10 s signal)")
+    asr.add_argument("--runs", type=int, default=3, help="Timed runs per tier (best is reported)")
+    asr.add_argument("--threads", type=int, default=0, help="CPU threads (default: PyTorch default)")
+    precision = asr.add_mutually_exclusive_group()
+    precision.add_argument("--int8", dest="quantize", action="store_const", const=True,
+                           help="Only benchmark int8 quantized models")
+    precision.add_argument("--float", dest="quantize", action="store_const", const=False,
+                           help="Only benchmark unquantized models")
+    startup = benchmarks.add_parser("startup", help="Import cost of the modules loaded at startup")
+    startup.add_argument("--modules", help="Comma separated modules to import (default: main, speakswap.engine)")
+    startup.add_argument("--top", type=int, default=10, help="Slowest imports to list per module")
+    enhance = benchmarks.add_parser("enhance", help="Per-block cost of the streaming audio enhancer")
+    enhance.add_argument("--seconds", type=float, default=10.0, help="Length of the synthetic test signal")
+    enhance.add_argument("--block-ms", type=int, default=30, help="Capture block length in milliseconds")
+    enhance.add_argument("--no-agc", dest="agc", action="store_false", help="Leave the streaming AGC off")
+    enhance.add_argument("--no-gate", dest="gate", action="store_false", help="Leave the spectral gate off")
+    routing = benchmarks.add_parser("routing", help="Translation latency with fake providers that fail")
+    routing.add_argument("--requests", type=int, default=200, help="Requests per strategy")
+    return parser
+
+
+def run_benchmark(args):
+    from speakswap import benchmarks
+
+    if args.benchmark == "asr":
+        audio = None
+        if args.audio:
+            from speakswap.audio import load_audio_file
+            audio = load_audio_file(args.audio)
+        tiers = [tier.strip() for tier in args.tiers.split(",") if tier.strip()]
+        results = benchmarks.benchmark_asr(tiers, audio, args.runs, args.threads, args.quantize)
+        print(benchmarks.format_asr_results(results))
+        return 1 if any("error" in result for result in results) else 0
+    if args.benchmark == "startup":
+        modules = [name.strip() for name in args.modules.split(",")] if args.modules else None
+        results = benchmarks.benchmark_startup(modules, top=args.top)
+        print(benchmarks.format_startup_results(results))
+        return 1 if any("error" in result for result in results["startup"]) else 0
+    if args.benchmark == "enhance":
+        result = benchmarks.benchmark_enhance(args.seconds, args.block_ms, agc=args.agc, gate=args.gate)
+        print(benchmarks.format_enhance_results(result))
+        return 0
+    if args.benchmark == "routing":
+        results = benchmarks.benchmark_routing(args.requests)
+        print(benchmarks.format_routing_results(results))
+        return 0
+    return 1
+
+
+def main(argv=None):
+    """Entry point for the headless command line"""
+    args = build_parser().parse_args(argv)
+    if args.command == "bench":
+        return run_benchmark(args)
+    args.formats = {name.strip() for name in args.formats.split(",") if name.strip()}
+
+    from speakswap.engine import SpeakSwapEngine, load_settings
+
+    settings = load_settings([args.settings] if args.settings else ["voice_settings.json"])
+    engine = SpeakSwapEngine(settings)
+
+    inputs = collect_inputs(args.inputs, exclude=args.output_dir)
+    if not inputs:
+        print("No .wav, .flac or .txt inputs found")
+        return 1
+    if any(path.lower().endswith(AUDIO_EXTENSIONS) for path in inputs):
+        engine.ensure_whisper_model()
+
+    try:
+        return BatchJob(engine, args).run(inputs)
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,642 @@
+"""UI-independent speech recognition, translation and speech synthesis
+
+SpeakSwapEngine holds everything the Tk app and the batch CLI share: the
+Whisper model, the translation cache and client pool, language detection
+and file-based speech synthesis. It never touches Tk; progress is reported
+through an optional status callback.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from speakswap.asr import MAX_SINGLE_PASS_SECONDS, configure_cpu_threads, detect_language_from_encoder, \
+    from_whisper_language, quantize_for_cpu, select_model_id, to_whisper_language, transcribe_batch
+from speakswap.audio import WHISPER_SAMPLE_RATE
+from speakswap.batching import MicroBatcher
+from speakswap.langid import identify as identify_language
+from speakswap.lazy import lazy_import, module_available
+from speakswap.models import WhisperModelManager
+from speakswap.providers import LOCAL_NMT_AVAILABLE, LocalNMTProvider, OnlineProvider, StubProvider
+from speakswap.routing import TranslationRouter
+from speakswap.speech_cache import SpeechCache, speech_key
+from speakswap.translation import TRANSLATOR_AVAILABLE, ChunkTranslator
+from speakswap.translation_cache import TranslationCache
+from speakswap.tts import Pyttsx3Renderer, UndecodableSpeech, render_gtts
+
+# torch and transformers take seconds to import; they are only loaded when
+# Whisper is first set up, so text-only use starts quickly
+torch = lazy_import("torch")
+WHISPER_AVAILABLE = module_available("torch") and module_available("transformers")
+GTTS_AVAILABLE = module_available("gtts")
+# gTTS returns MP3, which needs soundfile or torchaudio to decode in memory
+COMPRESSED_AUDIO_AVAILABLE = module_available("soundfile") or module_available("torchaudio")
+
+try:
+    import pyttsx3
+    PYTTSX3_AVAILABLE = True
+except ImportError:
+    PYTTSX3_AVAILABLE = False
+
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".speakswap")
+
+LANGUAGE_CODES = {
+    "English": "en",
+    "Hindi": "hi",
+    "Bengali": "bn",
+    "Spanish": "es",
+    "Chinese (Simplified)": "zh-CN",
+    "Russian": "ru",
+    "Japanese": "ja",
+    "Korean": "ko",
+    "German": "de",
+    "French": "fr",
+    "Tamil": "ta",
+    "Telugu": "te",
+    "Kannada": "kn",
+    "Gujarati": "gu",
+    "Punjabi": "pa",
+    "Malayalam": "ml",
+    "Italian": "it",
+    "Portuguese": "pt",
+    "Arabic": "ar",
+    "Dutch": "nl",
+    "Greek": "el",
+    "Hebrew": "he",
+    "Swedish": "sv",
+    "Turkish": "tr",
+    "Vietnamese": "vi",
+    "Thai": "th",
+    "Ukrainian": "uk",
+    "Polish": "pl",
+    "Auto Detect": "auto"
+}
+
+SUPPORTED_LANGUAGES = [code for code in LANGUAGE_CODES.values() if code != "auto"]
+
+DEFAULT_SETTINGS = {
+    "rate": 150,
+    "volume": 1.0,
+    "pitch": 1.0,
+    "voice_id": None,
+    "use_whisper": WHISPER_AVAILABLE,
+    "enhance_audio": True,
+    "highpass_hz": 100,
+    "capture_agc": False,
+    "spectral_gate": False,
+    "normalize_peak": 0.9,
+    "auto_scroll": True,
+    "use_gtts": GTTS_AVAILABLE,
+    "fallback_to_gtts": True,
+    "translation_cache_size": 2048,
+    "translation_cache_ttl": 7 * 24 * 3600,
+    "persist_translation_cache": True,
+    "translation_workers": 4,
+    # Tried in order: google, mymemory, local (transformers models) or stub
+    "translation_providers": ["google", "mymemory"],
+    "local_translation_model": "marian",
+    "local_translation_memory_mb": 1500,
+    "quantize_translation": True,
+    "translation_batch_size": 16,
+    "translation_deadline_s": 8.0,
+    "hedge_translations": True,
+    "breaker_failures": 3,
+    "breaker_reset_s": 30.0,
+    "langid_min_confidence": 0.6,
+    "whisper_language_min_probability": 0.5,
+    "use_vad": True,
+    "vad_hangover_ms": 300,
+    "vad_energy_threshold": 300,
+    "vad_adaptive_threshold": True,
+    "vad_noise_window_s": 3.0,
+    "vad_noise_percentile": 20,
+    "vad_noise_ratio": 3.0,
+    "capture_sources": [],
+    "session_max_pending": 4,
+    "vad_max_segment_s": 15.0,
+    "streaming_asr": True,
+    "partial_interval_ms": 400,
+    "asr_batch_size": 8,
+    "asr_batch_wait_ms": 20,
+    "whisper_model": "auto",
+    "quantize_whisper": True,
+    "torch_threads": 0,
+    "whisper_snapshots": True,
+    "warm_up_whisper": True,
+    "transcript_max_segments": 500,
+    "show_timestamps": False,
+    "save_transcript_history": True,
+    "tts_prefetch": 2,
+    "tts_max_pending": 4,
+    "speech_cache_memory_mb": 64,
+    "speech_cache_disk_mb": 256,
+    "persist_speech_cache": True
+}
+
+
+def load_settings(paths):
+    """Load settings from the first existing JSON file, on top of the defaults"""
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        for path in paths:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    settings.update(json.load(f))
+                break
+    except Exception as e:
+        print(f"Failed to load voice settings: {str(e)}")
+    return settings
+
+
+class SpeakSwapEngine:
+    """Speech recognition, translation and synthesis without any UI"""
+
+    def __init__(self, settings=None, status_callback=None):
+        self.settings = settings if settings is not None else dict(DEFAULT_SETTINGS)
+        self.status_callback = status_callback
+        self.whisper_model = None
+        self.whisper_processor = None
+        self.whisper_pipe = None
+        self.whisper_model_id = None
+        # idle -> loading -> warming -> ready (or failed)
+        self.asr_state = "idle"
+        self.model_manager = WhisperModelManager(
+            os.path.join(APP_DATA_DIR, "models"),
+            enabled=self.settings.get("whisper_snapshots", True)
+        )
+        self.asr_batcher = None
+        self._asr_lock = threading.Lock()
+        self._asr_attempted = False
+        self._tts_lock = threading.Lock()
+        self.tts_renderer = Pyttsx3Renderer(self._tts_lock)
+        # Cleared the first time an installed decoder fails on gTTS's MP3
+        self.mp3_decodable = COMPRESSED_AUDIO_AVAILABLE
+
+        self.translation_cache = self.create_translation_cache()
+        self.speech_cache = self.create_speech_cache()
+        self.chunk_translator = None
+        if TRANSLATOR_AVAILABLE:
+            # HTTP calls abandoned by the router at its deadline time out soon after
+            self.chunk_translator = ChunkTranslator(
+                self.settings.get("translation_workers", 4),
+                timeout=self.settings.get("translation_deadline_s", 8.0)
+            )
+        self.translation_providers = self.create_translation_providers()
+        self.translation_router = TranslationRouter(
+            self.translation_providers,
+            deadline_s=self.settings.get("translation_deadline_s", 8.0),
+            hedge=self.settings.get("hedge_translations", True),
+            failure_threshold=self.settings.get("breaker_failures", 3),
+            reset_s=self.settings.get("breaker_reset_s", 30.0),
+            batch_workers=self.settings.get("translation_workers", 4)
+        )
+
+    def report(self, message, is_error=False):
+        """Forward a status message to the UI (or print it when headless)"""
+        if self.status_callback:
+            self.status_callback(message, is_error=is_error)
+        elif is_error:
+            print(message)
+
+    def create_translation_cache(self):
+        """Create the translation cache described by the current settings"""
+        path = None
+        if self.settings.get("persist_translation_cache", True):
+            path = os.path.join(APP_DATA_DIR, "translation_cache.sqlite3")
+        return TranslationCache(
+            max_entries=self.settings.get("translation_cache_size", 2048),
+            ttl=self.settings.get("translation_cache_ttl", 7 * 24 * 3600),
+            path=path
+        )
+
+    def create_translation_providers(self):
+        """Build the providers named in translation_providers, skipping unavailable ones"""
+        providers = []
+        for name in self.settings.get("translation_providers", ["google", "mymemory"]):
+            if name in ("google", "mymemory"):
+                if self.chunk_translator:
+                    providers.append(OnlineProvider(self.chunk_translator, name))
+            elif name == "local":
+                if LOCAL_NMT_AVAILABLE:
+                    providers.append(LocalNMTProvider(
+                        family=self.settings.get("local_translation_model", "marian"),
+                        quantize=self.settings.get("quantize_translation", True),
+                        memory_budget_mb=self.settings.get("local_translation_memory_mb", 1500),
+                        batch_size=self.settings.get("translation_batch_size", 16)
+                    ))
+            elif name == "stub":
+                providers.append(StubProvider())
+            else:
+                print(f"Unknown translation provider: {name}")
+        return providers
+
+    @property
+    def translation_available(self):
+        return bool(self.translation_providers)
+
+    def create_speech_cache(self):
+        """Create the synthesized-speech cache described by the current settings"""
+        path = None
+        if self.settings.get("persist_speech_cache", True):
+            path = os.path.join(APP_DATA_DIR, "speech_cache")
+        return SpeechCache(
+            max_memory_bytes=int(self.settings.get("speech_cache_memory_mb", 64) * 2**20),
+            path=path,
+            max_disk_bytes=int(self.settings.get("speech_cache_disk_mb", 256) * 2**20)
+        )
+
+    @property
+    def asr_ready(self):
+        """True once Whisper is loaded and warmed up"""
+        return self.asr_state == "ready"
+
+    def ensure_whisper_model(self):
+        """Load Whisper the first time speech recognition is needed
+
+        Safe to call from several threads; the model is loaded (or the
+        attempt fails) only once. Returns True when Whisper is ready.
+        """
+        with self._asr_lock:
+            if not self.asr_ready and not self._asr_attempted:
+                self._asr_attempted = True
+                self.setup_whisper_model()
+        return self.asr_ready
+
+    def setup_whisper_model(self):
+        """Initialize the Whisper model for speech recognition"""
+        if not WHISPER_AVAILABLE:
+            return False
+        try:
+            self.asr_state = "loading"
+            self.report("Loading Whisper model...")
+            from transformers import pipeline
+
+            cuda = torch.cuda.is_available()
+            device = "cuda" if cuda else "cpu"
+            threads = configure_cpu_threads(self.settings.get("torch_threads", 0))
+
+            # Tier from the settings (tiny/base/small/distil); "auto" uses a
+            # larger model only if the GPU has 8+ GB memory
+            model_id = select_model_id(
+                self.settings.get("whisper_model", "auto"),
+                cuda=cuda,
+                cuda_memory=torch.cuda.get_device_properties(0).total_memory if cuda else 0
+            )
+
+            # Local safetensors snapshot after the first launch
+            self.whisper_model, self.whisper_processor = self.model_manager.load(
+                model_id,
+                torch.float16 if cuda else torch.float32,
+                device
+            )
+
+            quantized = False
+            if not cuda and self.settings.get("quantize_whisper", True):
+                try:
+                    self.whisper_model = quantize_for_cpu(self.whisper_model)
+                    quantized = True
+                except Exception as e:
+                    print(f"Whisper quantization failed, using float32: {str(e)}")
+            self.whisper_model_id = model_id
+
+            self.whisper_pipe = pipeline(
+                "automatic-speech-recognition",
+                model=self.whisper_model,
+                tokenizer=self.whisper_processor.tokenizer,
+                feature_extractor=self.whisper_processor.feature_extractor,
+                max_new_tokens=128,
+                chunk_length_s=30,
+                batch_size=16
+            )
+
+            # Utterances queued at the same time share one forward pass
+            if self.asr_batcher is None:
+                self.asr_batcher = MicroBatcher(
+                    self._run_asr_batch,
+                    max_batch_size=self.settings.get("asr_batch_size", 8),
+                    max_wait_ms=self.settings.get("asr_batch_wait_ms", 20),
+                    name="whisper-batcher"
+                )
+
+            if self.settings.get("warm_up_whisper", True):
+                self.asr_state = "warming"
+                self.report("Warming up Whisper...")
+                self.warm_up_whisper()
+
+            self.asr_state = "ready"
+            precision = "int8" if quantized else ("float16" if cuda else "float32")
+            self.report(f"Whisper ready ({model_id}, {precision}, {device}, {threads} threads)")
+            return True
+        except Exception as e:
+            error_msg = f"Failed to initialize Whisper model: {str(e)}"
+            print(error_msg)
+            self.report(error_msg, is_error=True)
+            self.whisper_pipe = None
+            self.asr_state = "failed"
+            return False
+
+    def warm_up_whisper(self):
+        """Run inference on silence so the first real phrase is not slower
+
+        The first forward passes allocate buffers and pick kernels; both the
+        language detection and the forced-language paths are exercised.
+        Returns the seconds spent.
+        """
+        started = time.perf_counter()
+        silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+        self.transcribe(silence, language=None, max_new_tokens=8)
+        self.transcribe(silence, language="en", max_new_tokens=8)
+        return time.perf_counter() - started
+
+    def transcribe(self, audio, language=None, max_new_tokens=128):
+        """Transcribe 16 kHz float32 audio with Whisper
+
+        language None (or "auto") lets Whisper predict it. Returns a dict with
+        text, language and language_probability.
+        """
+        if isinstance(audio, dict):
+            audio = audio["raw"]
+        if language == "auto":
+            language = None
+
+        if len(audio) > MAX_SINGLE_PASS_SECONDS * WHISPER_SAMPLE_RATE:
+            result = self.transcribe_long(audio, language)
+            return {
+                "text": result["text"],
+                "language": result["language"],
+                "language_probability": result["language_probability"]
+            }
+        return self._submit_asr(("short", audio, language, max_new_tokens))
+
+    def detect_spoken_language(self, audio):
+        """Predict the spoken language from the first 30 s of audio"""
+        features = self.whisper_processor.feature_extractor(
+            audio[:MAX_SINGLE_PASS_SECONDS * WHISPER_SAMPLE_RATE],
+            sampling_rate=WHISPER_SAMPLE_RATE,
+            return_tensors="pt"
+        ).input_features.to(self.whisper_model.device, dtype=self.whisper_model.dtype)
+        with torch.inference_mode():
+            encoder_outputs = self.whisper_model.get_encoder()(features)
+            language, probability = detect_language_from_encoder(
+                self.whisper_model,
+                encoder_outputs,
+                {to_whisper_language(code) for code in SUPPORTED_LANGUAGES}
+            )
+        return (from_whisper_language(language) if language else None), probability
+
+    def transcribe_long(self, audio, language=None):
+        """Transcribe audio of any length with timestamps
+
+        Returns text, language, language_probability and segments, a list of
+        (start seconds, end seconds, text) tuples.
+        """
+        if isinstance(audio, dict):
+            audio = audio["raw"]
+        if language == "auto":
+            language = None
+        return self._submit_asr(("long", np.asarray(audio, dtype=np.float32), language, None))
+
+    def asr_stats(self):
+        """Batching statistics of the Whisper scheduler"""
+        return self.asr_batcher.stats() if self.asr_batcher else {}
+
+    def _submit_asr(self, request):
+        if self.asr_batcher is None:
+            return self._run_asr_batch([request])[0]
+        return self.asr_batcher(request)
+
+    def _run_asr_batch(self, requests):
+        """Run queued recognition requests, batching the compatible ones
+
+        Short utterances go through one encoder and generate call with the
+        largest token budget among them, so partial and final decodes share a
+        pass; long recordings with the same language go through whisper_pipe
+        together so their 30 s chunks are batched.
+        """
+        results = [None] * len(requests)
+        groups = {}
+        for index, (kind, audio, language, max_new_tokens) in enumerate(requests):
+            if kind == "long" and not language:
+                language, probability = self.detect_spoken_language(audio)
+                requests[index] = (kind, audio, language, probability)
+                key = (kind, language)
+            else:
+                key = (kind, None if kind == "short" else language)
+            groups.setdefault(key, []).append(index)
+
+        for (kind, _), indices in groups.items():
+            if kind == "short":
+                batch = transcribe_batch(
+                    self.whisper_model,
+                    self.whisper_processor,
+                    [requests[i][1] for i in indices],
+                    [requests[i][2] for i in indices],
+                    supported_languages=SUPPORTED_LANGUAGES,
+                    max_new_tokens=max(requests[i][3] for i in indices)
+                )
+            else:
+                batch = self._transcribe_long_batch([requests[i] for i in indices])
+            for index, result in zip(indices, batch):
+                results[index] = result
+        return results
+
+    def _transcribe_long_batch(self, requests):
+        """Transcribe long recordings that share a language in one pipe call"""
+        language = requests[0][2]
+        generate_kwargs = {"task": "transcribe"}
+        if language:
+            generate_kwargs["language"] = to_whisper_language(language)
+        outputs = self.whisper_pipe(
+            [{"raw": audio, "sampling_rate": WHISPER_SAMPLE_RATE} for _, audio, _, _ in requests],
+            return_timestamps=True,
+            generate_kwargs=generate_kwargs
+        )
+
+        results = []
+        for (_, audio, _, probability), output in zip(requests, outputs):
+            duration = len(audio) / WHISPER_SAMPLE_RATE
+            segments = []
+            for chunk in output.get("chunks") or []:
+                start, end = chunk.get("timestamp") or (None, None)
+                start = start or 0.0
+                end = end if end is not None else duration
+                text = chunk.get("text", "").strip()
+                if text:
+                    segments.append((start, end, text))
+            results.append({
+                "text": output["text"].strip(),
+                "language": language,
+                "language_probability": probability if probability is not None else 1.0,
+                "segments": segments
+            })
+        return results
+
+    def detect_language(self, text):
+        """Detect language of the given text with the offline identifier
+
+        Returns None below langid_min_confidence: a short phrase like "ok"
+        gives a weak guess, and forcing it as the source would translate the
+        text from the wrong language. Callers then pass "auto" and let the
+        translation service detect it.
+        """
+        # Use the first few words for detection
+        sample = " ".join(text.split()[:20])
+        detected, confidence = identify_language(sample)
+        if detected and confidence < self.settings.get("langid_min_confidence", 0.6):
+            return None
+        return detected
+
+    def translate_text(self, text, source_lang, target_lang):
+        """Translate text from source language to target language"""
+        if not self.translation_providers:
+            return None
+
+        # Repeated phrases are answered from the cache without a network call
+        if self.translation_cache:
+            cached = self.translation_cache.get(text, source_lang, target_lang)
+            if cached is not None:
+                return cached
+
+        translated = self._translate_uncached(text, source_lang, target_lang)
+        if translated and self.translation_cache:
+            self.translation_cache.put(text, source_lang, target_lang, translated)
+        return translated
+
+    def _translate_uncached(self, text, source_lang, target_lang):
+        """Translate through the router: healthy providers first, each batch within the deadline"""
+        return self.translation_router.translate_document(text, source_lang, target_lang)
+
+    def tts_backend(self):
+        """Speech backend the current settings select: "gtts", "pyttsx3" or None"""
+        if GTTS_AVAILABLE and self.settings.get("use_gtts", False):
+            return "gtts"
+        if PYTTSX3_AVAILABLE:
+            return "pyttsx3"
+        if GTTS_AVAILABLE and self.settings.get("fallback_to_gtts", True):
+            return "gtts"
+        return None
+
+    def synthesize(self, text, language_code):
+        """Render speech for text into memory; returns a SpeechClip
+
+        Uses gTTS when enabled, otherwise the local pyttsx3 voice with the
+        current rate, volume and voice, falling back to gTTS if that fails.
+        Phrases spoken before with the same settings come from the cache.
+        """
+        backend = self.tts_backend()
+        if backend is None:
+            raise RuntimeError("No text-to-speech backend is available")
+
+        if backend == "pyttsx3":
+            try:
+                return self._synthesize_cached(text, language_code, "pyttsx3")
+            except Exception as e:
+                if not (GTTS_AVAILABLE and self.settings.get("fallback_to_gtts", True)):
+                    raise
+                print(f"Local TTS error: {str(e)}")
+        return self._synthesize_cached(text, language_code, "gtts")
+
+    def _synthesize_cached(self, text, language_code, backend):
+        if backend == "gtts":
+            # Voice settings do not change gTTS output, so they stay out of the key
+            key = speech_key(text, language_code, backend=backend)
+        else:
+            key = speech_key(
+                text,
+                language_code,
+                voice_id=self.settings.get("voice_id"),
+                rate=self.settings.get("rate", 150),
+                volume=self.settings.get("volume", 1.0),
+                pitch=self.settings.get("pitch", 1.0),
+                backend=backend
+            )
+        if self.speech_cache:
+            cached = self.speech_cache.get(key)
+            if cached is not None:
+                return cached
+
+        if backend == "gtts":
+            try:
+                clip = render_gtts(text, language_code)
+            except UndecodableSpeech:
+                self.mp3_decodable = False
+                raise
+        else:
+            clip = self.tts_renderer.render(
+                text,
+                rate=self.settings.get("rate", 150),
+                volume=self.settings.get("volume", 1.0),
+                voice_id=self.settings.get("voice_id")
+            )
+        if self.speech_cache:
+            self.speech_cache.put(key, clip)
+        return clip
+
+    def synthesize_to_file(self, text, language_code, path):
+        """Write speech for text to path; returns the path actually written
+
+        Uses gTTS (MP3) when enabled, otherwise the local pyttsx3 voice (WAV).
+        """
+        if GTTS_AVAILABLE and self.settings.get("use_gtts", False):
+            from gtts import gTTS
+
+            path = os.path.splitext(path)[0] + ".mp3"
+            gTTS(text=text, lang=language_code).save(path)
+            return path
+
+        if not PYTTSX3_AVAILABLE:
+            raise RuntimeError("No text-to-speech backend is available")
+
+        path = os.path.splitext(path)[0] + ".wav"
+        # pyttsx3 drives a single platform engine and is not thread-safe
+        with self._tts_lock:
+            engine = pyttsx3.init()
+            try:
+                engine.setProperty('rate', self.settings.get("rate", 150))
+                engine.setProperty('volume', self.settings.get("volume", 1.0))
+                if self.settings.get("voice_id"):
+                    engine.setProperty('voice', self.settings["voice_id"])
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            finally:
+                engine.stop()
+        return path
+
+    def close(self):
+        """Release models, pools and caches"""
+        if self.asr_batcher:
+            print(f"Whisper batching stats: {self.asr_stats()}")
+            self.asr_batcher.close()
+            self.asr_batcher = None
+
+        if self.whisper_model:
+            try:
+                # Force cleanup
+                import gc
+                self.whisper_model = None
+                self.whisper_processor = None
+                self.whisper_pipe = None
+                gc.collect()
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+            except:
+                pass
+
+        # Flush the translation cache
+        if self.translation_cache:
+            print(f"Translation cache stats: {self.translation_cache.stats()}")
+            self.translation_cache.close()
+
+        if self.speech_cache:
+            print(f"Speech cache stats: {self.speech_cache.stats()}")
+
+        if self.translation_providers:
+            print(f"Translation routing stats: {self.translation_router.stats()}")
+        self.translation_router.close()
+        for provider in self.translation_providers:
+            provider.close()
+
+        if self.chunk_translator:
+            self.chunk_translator.shutdown()
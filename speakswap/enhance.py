@@ -0,0 +1,122 @@
+"""Speech enhancement for the capture -> ASR path
+
+StreamingEnhancer runs inside the capture callback on every block: a
+causal high-pass filter whose state carries over between blocks (so block
+edges do not click) and an optional block-wise AGC. The whole-phrase steps,
+spectral_gate() and normalize_peak(), run on a finished phrase just before
+it is transcribed.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from speakswap.lazy import lazy_import
+
+signal = lazy_import("scipy.signal")
+
+# Levels below this (about -70 dBFS) are treated as silence and never amplified
+SILENCE_PEAK = 3e-4
+
+
+@lru_cache(maxsize=16)
+def highpass_sos(sample_rate, cutoff_hz=100.0, order=4):
+    """Butterworth high-pass as second-order sections, designed once per rate"""
+    return signal.butter(order, cutoff_hz, btype="highpass", fs=sample_rate, output="sos")
+
+
+def normalize_peak(samples, target_peak=0.9, max_gain=20.0):
+    """Scale a float32 signal so its peak reaches target_peak
+
+    Gain is capped at max_gain so near-silence is not blown up into noise,
+    and silent input is returned unchanged instead of dividing by zero.
+    """
+    if not samples.size:
+        return samples
+    peak = float(np.max(np.abs(samples)))
+    if peak < SILENCE_PEAK:
+        return samples
+    gain = min(target_peak / peak, max_gain)
+    return np.multiply(samples, gain, dtype=np.float32)
+
+
+def spectral_gate(samples, sample_rate, threshold_db=6.0, reduction_db=18.0, noise_percentile=10, n_fft=512):
+    """Attenuate time-frequency bins that do not rise above the noise floor
+
+    The noise floor of each frequency bin is a low percentile of its
+    magnitude over the whole phrase, so no separate noise recording is
+    needed. Bins less than threshold_db above it are reduced by
+    reduction_db; the mask is smoothed over neighbouring frames so the
+    gating does not produce musical noise.
+    """
+    if len(samples) < n_fft:
+        return samples
+    _, _, spectrum = signal.stft(samples, fs=sample_rate, nperseg=n_fft)
+    magnitude = np.abs(spectrum)
+    noise_floor = np.percentile(magnitude, noise_percentile, axis=1, keepdims=True)
+    keep = magnitude > noise_floor * 10 ** (threshold_db / 20)
+
+    floor_gain = 10 ** (-reduction_db / 20)
+    mask = np.where(keep, 1.0, floor_gain)
+    kernel = np.array([0.25, 0.5, 0.25])
+    mask = np.apply_along_axis(np.convolve, 1, mask, kernel, mode="same")
+
+    _, gated = signal.istft(spectrum * mask, fs=sample_rate, nperseg=n_fft)
+    return gated[:len(samples)].astype(np.float32, copy=False)
+
+
+class StreamingEnhancer:
+    """Causal per-block enhancement of a live int16 stream
+
+    process() takes a (frames, channels) or mono int16 block and returns an
+    enhanced int16 block of the same shape. The high-pass filter keeps its
+    sosfilt state between calls. With agc, the gain follows the block peak
+    towards target_peak (rising slowly, falling fast), is capped at
+    max_gain and held during silence; it is ramped across each block so
+    gain changes are inaudible.
+    """
+
+    def __init__(self, sample_rate, cutoff_hz=100.0, agc=False, target_peak=0.5, max_gain=8.0,
+                 attack=0.5, release=0.05):
+        self.sample_rate = sample_rate
+        self.sos = highpass_sos(sample_rate, cutoff_hz) if cutoff_hz else None
+        self.agc = agc
+        self.target_peak = target_peak
+        self.max_gain = max_gain
+        self.attack = attack
+        self.release = release
+        self.gain = 1.0
+        self._zi = None
+
+    def reset(self):
+        """Forget filter state and gain (e.g. after a gap in the stream)"""
+        self._zi = None
+        self.gain = 1.0
+
+    def process(self, block):
+        block = np.asarray(block)
+        mono = block.ndim == 1
+        samples = block.reshape(-1, 1) if mono else block
+        samples = samples.astype(np.float32) / 32768.0
+
+        if self.sos is not None:
+            if self._zi is None:
+                # Start from the steady state of the first sample to avoid a transient
+                self._zi = signal.sosfilt_zi(self.sos)[:, :, None] * samples[0]
+            samples, self._zi = signal.sosfilt(self.sos, samples, axis=0, zi=self._zi)
+
+        if self.agc:
+            samples = self._apply_gain(samples)
+
+        out = np.clip(samples * 32768.0, -32768, 32767).astype(np.int16)
+        return out[:, 0] if mono else out
+
+    def _apply_gain(self, samples):
+        peak = float(np.max(np.abs(samples))) if samples.size else 0.0
+        previous = self.gain
+        if peak >= SILENCE_PEAK:
+            wanted = min(self.target_peak / peak, self.max_gain)
+            # Fall quickly so peaks do not clip; rise slowly so noise is not pumped up
+            rate = self.attack if wanted < previous else self.release
+            self.gain = previous + rate * (wanted - previous)
+        ramp = np.linspace(previous, self.gain, len(samples), dtype=np.float32)
+        return samples * ramp[:, None]
@@ -0,0 +1,302 @@
+"""Offline language identification for the languages SpeakSwap supports
+
+Most supported languages are identified by their script alone. Languages
+that share a script (Latin, Cyrillic, Han/Kana) are told apart with marker
+characters, common words and character trigram profiles built from short
+built-in samples. Results are memoized per text.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+
+# (first code point, last code point, script)
+_SCRIPT_RANGES = sorted([
+    (0x0041, 0x005A, "Latin"),
+    (0x0061, 0x007A, "Latin"),
+    (0x00C0, 0x024F, "Latin"),
+    (0x1E00, 0x1EFF, "Latin"),
+    (0x0370, 0x03FF, "Greek"),
+    (0x1F00, 0x1FFF, "Greek"),
+    (0x0400, 0x04FF, "Cyrillic"),
+    (0x0590, 0x05FF, "Hebrew"),
+    (0x0600, 0x06FF, "Arabic"),
+    (0x0750, 0x077F, "Arabic"),
+    (0xFB50, 0xFDFF, "Arabic"),
+    (0xFE70, 0xFEFF, "Arabic"),
+    (0x0900, 0x097F, "Devanagari"),
+    (0x0980, 0x09FF, "Bengali"),
+    (0x0A00, 0x0A7F, "Gurmukhi"),
+    (0x0A80, 0x0AFF, "Gujarati"),
+    (0x0B80, 0x0BFF, "Tamil"),
+    (0x0C00, 0x0C7F, "Telugu"),
+    (0x0C80, 0x0CFF, "Kannada"),
+    (0x0D00, 0x0D7F, "Malayalam"),
+    (0x0E00, 0x0E7F, "Thai"),
+    (0x1100, 0x11FF, "Hangul"),
+    (0x3130, 0x318F, "Hangul"),
+    (0xAC00, 0xD7AF, "Hangul"),
+    (0x3040, 0x309F, "Kana"),
+    (0x30A0, 0x30FF, "Kana"),
+    (0x31F0, 0x31FF, "Kana"),
+    (0xFF66, 0xFF9F, "Kana"),
+    (0x3400, 0x4DBF, "Han"),
+    (0x4E00, 0x9FFF, "Han"),
+    (0xF900, 0xFAFF, "Han"),
+])
+_RANGE_STARTS = [start for start, _, _ in _SCRIPT_RANGES]
+
+# Scripts used by exactly one supported language
+_SCRIPT_LANGUAGES = {
+    "Greek": "el",
+    "Hebrew": "he",
+    "Arabic": "ar",
+    "Devanagari": "hi",
+    "Bengali": "bn",
+    "Gurmukhi": "pa",
+    "Gujarati": "gu",
+    "Tamil": "ta",
+    "Telugu": "te",
+    "Kannada": "kn",
+    "Malayalam": "ml",
+    "Thai": "th",
+    "Hangul": "ko",
+}
+
+# Letters that only (or almost only) occur in one of the Cyrillic languages
+_CYRILLIC_MARKERS = {
+    "uk": set("іїєґ"),
+    "ru": set("ыэъё"),
+}
+_CYRILLIC_WORDS = {
+    "uk": set("де що як це та але або так ні дякую будь ласка мене тебе вона воно "
+              "вони ми ви він його її нас вас був була було коли чому тут там".split()),
+    "ru": set("где что как это но или да нет спасибо пожалуйста меня тебя она оно "
+              "они мы вы он его её нас вас был была было когда почему здесь там".split()),
+}
+
+# Short samples of everyday speech used to build trigram profiles, together
+# with each language's most frequent words
+_LATIN_SAMPLES = {
+    "en": (
+        "the and you that was for are with his they this have from one had word "
+        "but not what all were when your can said there use each which she how "
+        "their will other about out many then them these would like into time "
+        "thank you very much how are you i am fine where is the station what is your name "
+        "please help me i would like to go home today it is a good day we are going together",
+        "the be to of and a in that have it for not on with he as you do at this but "
+        "his by from they we say her she or an will my one all would there their what"
+    ),
+    "es": (
+        "muchas gracias cómo estás estoy bien dónde está la estación cuál es tu nombre "
+        "por favor ayúdame me gustaría ir a casa hoy es un buen día vamos juntos "
+        "el niño tiene que comer ahora señor qué hora es mañana también hablamos español "
+        "los que las del una por para con sus pero más como este esta cuando muy",
+        "de la que el en y a los se del las un por con no una su para es al lo como "
+        "más pero sus le ya o este sí porque esta entre cuando muy sin sobre también"
+    ),
+    "pt": (
+        "muito obrigado como você está estou bem onde fica a estação qual é o seu nome "
+        "por favor me ajude eu gostaria de ir para casa hoje é um bom dia vamos juntos "
+        "não são então também coração informação ação irmão mãe pão até você ela está",
+        "de a o que e do da em um para é com não uma os no se na por mais as dos como "
+        "mas foi ao ele das tem à seu sua ou ser quando muito há nos já está também"
+    ),
+    "fr": (
+        "merci beaucoup comment allez vous je vais bien où est la gare quel est votre nom "
+        "s'il vous plaît aidez moi je voudrais rentrer à la maison aujourd'hui c'est une bonne "
+        "journée nous allons ensemble très être déjà garçon leçon français où là voilà",
+        "de la le et les des en un du une que est pour qui dans par plus pas au sur ne "
+        "se ce il sont avec ils nous vous je elle mais ou où être très aussi cette"
+    ),
+    "de": (
+        "vielen dank wie geht es ihnen mir geht es gut wo ist der bahnhof wie heißen sie "
+        "bitte helfen sie mir ich möchte heute nach hause gehen es ist ein schöner tag "
+        "wir gehen zusammen straße größe müssen können über schön für natürlich nicht",
+        "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine "
+        "als auch es an werden aus er hat dass sie nach wird bei einer um am sind noch wie"
+    ),
+    "it": (
+        "grazie mille come stai sto bene dov'è la stazione come ti chiami per favore "
+        "aiutami vorrei tornare a casa oggi è una bella giornata andiamo insieme "
+        "perché città così più già però gli sono della nella questo quello anche",
+        "di e il la che è per un in del non una sono mi si le da con ma ti lo ho "
+        "come io ci questo gli della più anche alla nel perché se quando tutto"
+    ),
+    "nl": (
+        "dank je wel hoe gaat het met je het gaat goed waar is het station hoe heet je "
+        "help me alsjeblieft ik wil vandaag naar huis gaan het is een mooie dag "
+        "we gaan samen misschien altijd geweest moeten zullen gezien ijs vrij blij",
+        "de en van ik te dat die in een hij het niet zijn is was op aan met als voor "
+        "had er maar om hem dan zou of wat mijn men dit zo door over ze zich bij ook"
+    ),
+    "sv": (
+        "tack så mycket hur mår du jag mår bra var är stationen vad heter du "
+        "snälla hjälp mig jag vill gå hem idag det är en fin dag vi går tillsammans "
+        "också här där många människor skulle kunna något själv året även",
+        "och i att det som en på är av för med till den har de inte om ett han men "
+        "var jag sig från vi så kan man när år säger hon under också efter eller"
+    ),
+    "tr": (
+        "çok teşekkür ederim nasılsınız iyiyim istasyon nerede adınız ne lütfen bana "
+        "yardım edin bugün eve gitmek istiyorum bugün güzel bir gün birlikte gidiyoruz "
+        "değil ığdır şimdi güzel çünkü için görüşürüz hoşça kal evet hayır",
+        "bir ve bu da de için ile çok ne ben sen o ama gibi daha var yok olarak en "
+        "mi değil kadar sonra şey her ki evet hayır nasıl neden şimdi"
+    ),
+    "vi": (
+        "cảm ơn bạn rất nhiều bạn có khỏe không tôi khỏe nhà ga ở đâu tên bạn là gì "
+        "làm ơn giúp tôi hôm nay tôi muốn về nhà hôm nay là một ngày đẹp chúng ta đi cùng "
+        "người việt nam được những không của và một các trong có là cho",
+        "và của là có không một những các được trong cho người này đã với khi ở tôi "
+        "bạn chúng ta làm gì đi về nhà rất"
+    ),
+    "pl": (
+        "dziękuję bardzo jak się masz dobrze gdzie jest dworzec jak masz na imię "
+        "proszę pomóż mi chciałbym dzisiaj wrócić do domu to jest piękny dzień idziemy razem "
+        "będzie może się już że też przez jeszcze człowiek źle żółć ćma łódź",
+        "i w nie na się z do to że jest jak o co ale po tak za od jego od przez "
+        "być jestem ten tylko już mnie dla czy który może bardzo"
+    ),
+}
+
+# Letters that strongly suggest a particular Latin-script language
+_LATIN_MARKERS = {
+    "es": set("ñ¿¡"),
+    "pt": set("ãõ"),
+    "fr": set("œëîûùâ"),
+    "de": set("ß"),
+    "tr": set("şğı"),
+    "pl": set("łąęśźżćń"),
+    "vi": set("ơưăđạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹ"),
+    "sv": set("å"),
+}
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?", re.UNICODE)
+_SMOOTHING = 0.5
+
+
+def _script_of(char):
+    """Return the script name for a single character, or None"""
+    code = ord(char)
+    index = bisect_right(_RANGE_STARTS, code) - 1
+    if index >= 0:
+        start, end, script = _SCRIPT_RANGES[index]
+        if start <= code <= end:
+            return script
+    return None
+
+
+def _trigrams(word):
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _build_profile(sample, common_words):
+    """Build trigram log-probabilities and a stop-word set for one language"""
+    counts = Counter()
+    for word in _TOKEN_RE.findall(f"{sample} {common_words}"):
+        counts.update(_trigrams(word))
+    total = sum(counts.values())
+    vocabulary = len(counts) + 1
+    log_probs = {gram: math.log((count + _SMOOTHING) / (total + _SMOOTHING * vocabulary))
+                 for gram, count in counts.items()}
+    unseen = math.log(_SMOOTHING / (total + _SMOOTHING * vocabulary))
+    return log_probs, unseen, set(common_words.split())
+
+
+_LATIN_PROFILES = {
+    code: _build_profile(sample, common_words)
+    for code, (sample, common_words) in _LATIN_SAMPLES.items()
+}
+
+
+def _softmax(scores):
+    best = max(scores.values())
+    exps = {code: math.exp(score - best) for code, score in scores.items()}
+    total = sum(exps.values())
+    return {code: value / total for code, value in exps.items()}
+
+
+def _identify_latin(words):
+    """Score Latin-script words against every Latin language profile"""
+    scores = {}
+    grams = [gram for word in words for gram in _trigrams(word)]
+    letters = set("".join(words))
+    for code, (log_probs, unseen, common_words) in _LATIN_PROFILES.items():
+        score = sum(log_probs.get(gram, unseen) for gram in grams)
+        # Frequent function words are the strongest signal on short phrases
+        score += 2.5 * sum(1 for word in words if word in common_words)
+        score += 4.0 * len(letters & _LATIN_MARKERS.get(code, set()))
+        scores[code] = score
+    return _softmax(scores)
+
+
+def _identify_cyrillic(text):
+    """Tell Ukrainian from Russian by their exclusive letters and common words"""
+    words = _TOKEN_RE.findall(text)
+    uk = sum(1 for char in text if char in _CYRILLIC_MARKERS["uk"])
+    ru = sum(1 for char in text if char in _CYRILLIC_MARKERS["ru"])
+    uk += sum(1 for word in words if word in _CYRILLIC_WORDS["uk"])
+    ru += sum(1 for word in words if word in _CYRILLIC_WORDS["ru"])
+    if uk == ru:
+        # No evidence either way: Russian is more common, but stay unsure
+        return {"ru": 0.55, "uk": 0.45}
+    total = uk + ru
+    return {"uk": (uk + 0.5) / (total + 1), "ru": (ru + 0.5) / (total + 1)}
+
+
+@lru_cache(maxsize=4096)
+def identify(text, max_chars=400):
+    """Return (language code, confidence) for text, or (None, 0.0)
+
+    Codes match SpeakSwapApp.get_language_codes(). Only the first max_chars
+    characters are examined, which keeps detection well under a millisecond.
+    """
+    sample = unicodedata.normalize("NFC", text[:max_chars]).lower()
+
+    script_counts = Counter()
+    for char in sample:
+        if char.isalpha():
+            script = _script_of(char)
+            if script:
+                script_counts[script] += 1
+    letters = sum(script_counts.values())
+    if not letters:
+        return None, 0.0
+
+    # Kana anywhere means Japanese, even when most characters are Han
+    if script_counts["Kana"]:
+        script_counts["Kana"] += script_counts.pop("Han", 0)
+
+    script, count = script_counts.most_common(1)[0]
+    purity = count / letters
+
+    if script in _SCRIPT_LANGUAGES:
+        return _SCRIPT_LANGUAGES[script], purity
+    if script == "Kana":
+        return "ja", purity
+    if script == "Han":
+        return "zh-CN", purity
+
+    if script == "Cyrillic":
+        probabilities = _identify_cyrillic(sample)
+    else:
+        words = [word for word in _TOKEN_RE.findall(sample)
+                 if all(_script_of(char) == "Latin" for char in word if char != "'")]
+        if not words:
+            return None, 0.0
+        probabilities = _identify_latin(words)
+
+    code = max(probabilities, key=probabilities.get)
+    return code, probabilities[code] * purity
+
+
+def detect_language(text, min_confidence=0.6):
+    """Return the detected language code, or None if confidence is too low"""
+    code, confidence = identify(text)
+    if code and confidence >= min_confidence:
+        return code
+    return None
@@ -0,0 +1,55 @@
+"""Deferred imports for heavy optional dependencies
+
+torch, transformers, scipy and sounddevice together take seconds to import,
+but text translation needs none of them. Modules bind them through
+lazy_import() so the import happens on first attribute access, and use
+module_available() for availability flags, which only locates the package.
+"""
+import importlib
+import importlib.util
+import sys
+
+
+def module_available(name):
+    """True if a module can be imported, checked without importing it"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access"""
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        """Import the module now (raises ImportError if it is missing)"""
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self.load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if it is already imported, otherwise a LazyModule"""
+    return sys.modules.get(name) or LazyModule(name)
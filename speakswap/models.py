@@ -0,0 +1,118 @@
+"""Local Whisper model snapshots
+
+from_pretrained on a hub id checks the hub for updates, may convert a
+PyTorch .bin checkpoint and casts every weight to the requested dtype on
+each launch. WhisperModelManager does that work once and keeps the result
+as a local safetensors snapshot in the target dtype, which later launches
+memory-map straight into the model without network access.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Bump when the snapshot layout changes so old snapshots are rebuilt
+SNAPSHOT_FORMAT = 1
+MANIFEST_FILE = "speakswap_snapshot.json"
+
+
+class WhisperModelManager:
+    """Load Whisper models and processors from local snapshots
+
+    Snapshots live in cache_dir, one directory per model id and dtype. A
+    missing or unreadable snapshot is rebuilt from the hub on the next
+    load. Loading the same model twice in one process is never needed, so
+    the manager only serialises concurrent loads.
+    """
+
+    def __init__(self, cache_dir, enabled=True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def snapshot_dir(self, model_id, dtype):
+        name = f"{model_id.replace('/', '--')}-{str(dtype).replace('torch.', '')}"
+        return os.path.join(self.cache_dir, name)
+
+    def has_snapshot(self, model_id, dtype):
+        """True if a complete snapshot of this model and dtype exists"""
+        manifest = os.path.join(self.snapshot_dir(model_id, dtype), MANIFEST_FILE)
+        try:
+            with open(manifest, "r", encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return info.get("format") == SNAPSHOT_FORMAT and info.get("model_id") == model_id
+
+    def load(self, model_id, dtype, device):
+        """Return (model, processor) on the given device
+
+        Snapshot weights are memory-mapped by safetensors, so only the pages
+        actually touched are read and the load does not double memory use.
+        """
+        from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor
+
+        with self._lock:
+            path = self.snapshot_dir(model_id, dtype)
+            if self.enabled and self.has_snapshot(model_id, dtype):
+                try:
+                    model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                        path,
+                        torch_dtype=dtype,
+                        low_cpu_mem_usage=True,
+                        use_safetensors=True,
+                        local_files_only=True
+                    )
+                    processor = AutoProcessor.from_pretrained(path, local_files_only=True)
+                    return model.to(device), processor
+                except Exception as e:
+                    print(f"Discarding unreadable Whisper snapshot {path}: {str(e)}")
+                    shutil.rmtree(path, ignore_errors=True)
+
+            model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                model_id,
+                torch_dtype=dtype,
+                low_cpu_mem_usage=True
+            )
+            processor = AutoProcessor.from_pretrained(model_id)
+            if self.enabled:
+                try:
+                    self.save_snapshot(model_id, dtype, model, processor)
+                except Exception as e:
+                    # The model still works; the next launch simply tries again
+                    print(f"Failed to save Whisper snapshot: {str(e)}")
+            return model.to(device), processor
+
+    def save_snapshot(self, model_id, dtype, model, processor):
+        """Write model and processor as a safetensors snapshot"""
+        import transformers
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        target = self.snapshot_dir(model_id, dtype)
+        # Build the snapshot next to its final place and swap it in, so a
+        # crash never leaves a half-written snapshot behind
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.cache_dir)
+        try:
+            model.save_pretrained(staging, safe_serialization=True)
+            processor.save_pretrained(staging)
+            with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump({
+                    "format": SNAPSHOT_FORMAT,
+                    "model_id": model_id,
+                    "dtype": str(dtype),
+                    "transformers": transformers.__version__,
+                    "created": time.time()
+                }, f)
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return target
+
+    def clear(self):
+        """Delete all snapshots"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+import traceback
+
+
+class Stage:
+    """A single pipeline step with its own bounded input queue and worker thread"""
+
+    def __init__(self, name, handler, maxsize=2):
+        self.name = name
+        self.handler = handler
+        self.inbox = queue.Queue(maxsize=maxsize)
+        self.processed = 0
+        self.dropped = 0
+        # Seconds items spent sitting in this stage's inbox
+        self.queue_wait = 0.0
+        # Seconds this stage spent blocked handing results to the next stage
+        self.backpressure_wait = 0.0
+        # Seconds spent inside the handler itself
+        self.busy_time = 0.0
+        self.last_queue_wait = 0.0
+        self.thread = None
+
+    def stats(self):
+        """Return a snapshot of the wait/busy counters for this stage"""
+        count = max(self.processed, 1)
+        return {
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "depth": self.inbox.qsize(),
+            "queue_wait_avg": self.queue_wait / count,
+            "queue_wait_last": self.last_queue_wait,
+            "backpressure_avg": self.backpressure_wait / count,
+            "busy_avg": self.busy_time / count,
+        }
+
+
+class StagedPipeline:
+    """Run a chain of stages concurrently, connected by bounded FIFO queues.
+
+    Every stage has exactly one worker, so items leave the pipeline in the
+    order they were submitted. When a stage falls behind its inbox fills up
+    and the previous stage (or the producer calling submit) blocks until
+    there is room again. A handler returning None drops the item.
+    """
+
+    def __init__(self, stages, on_error=None, on_output=None, poll_interval=0.2):
+        self.stages = list(stages)
+        self.on_error = on_error
+        self.on_output = on_output
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    def start(self):
+        """Start one worker thread per stage"""
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            stage.thread = threading.Thread(
+                target=self._run_stage,
+                args=(stage, next_stage),
+                name=f"pipeline-{stage.name}",
+                daemon=True
+            )
+            stage.thread.start()
+        return self
+
+    def submit(self, item):
+        """Feed an item into the first stage, blocking while it is full.
+
+        Returns False if the pipeline was stopped before the item was accepted.
+        """
+        return self._put(self.stages[0], item) is not None
+
+    def stop(self, timeout=2.0):
+        """Signal all stages to stop and wait for their threads"""
+        self.stop_event.set()
+        for stage in self.stages:
+            if stage.thread and stage.thread.is_alive():
+                stage.thread.join(timeout=timeout)
+
+    def stats(self):
+        """Return per-stage statistics keyed by stage name"""
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def format_stats(self):
+        """Return a one-line human readable summary of per-stage wait times"""
+        parts = []
+        for name, stats in self.stats().items():
+            parts.append(
+                f"{name}: queue {stats['queue_wait_avg'] * 1000:.0f} ms, "
+                f"blocked {stats['backpressure_avg'] * 1000:.0f} ms, "
+                f"busy {stats['busy_avg'] * 1000:.0f} ms"
+            )
+        return " | ".join(parts)
+
+    def _put(self, stage, item):
+        """Put an item into a stage inbox; returns seconds blocked or None if stopped"""
+        started = time.perf_counter()
+        envelope = (time.perf_counter(), item)
+        while not self.stop_event.is_set():
+            try:
+                stage.inbox.put(envelope, timeout=self.poll_interval)
+                return time.perf_counter() - started
+            except queue.Full:
+                continue
+        return None
+
+    def _run_stage(self, stage, next_stage):
+        """Worker loop for a single stage"""
+        while not self.stop_event.is_set():
+            try:
+                enqueued_at, item = stage.inbox.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+
+            stage.last_queue_wait = time.perf_counter() - enqueued_at
+            stage.queue_wait += stage.last_queue_wait
+
+            started = time.perf_counter()
+            try:
+                result = stage.handler(item)
+            except Exception as e:
+                result = None
+                if self.on_error:
+                    self.on_error(stage.name, e)
+                else:
+                    print(f"Pipeline stage '{stage.name}' error: {str(e)}")
+                    traceback.print_exc()
+            finally:
+                stage.busy_time += time.perf_counter() - started
+                stage.processed += 1
+
+            if result is None:
+                stage.dropped += 1
+                continue
+
+            if next_stage is None:
+                if self.on_output:
+                    self.on_output(result)
+                continue
+
+            blocked = self._put(next_stage, result)
+            if blocked is not None:
+                stage.backpressure_wait += blocked
@@ -0,0 +1,366 @@
+"""Translation providers
+
+Every translation backend implements TranslationProvider: the online
+services behind deep-translator (OnlineProvider), local transformers
+models that run without a network (LocalNMTProvider) and a stub for
+testing the pipeline offline (StubProvider, and FakeProvider, which
+injects delays and errors). The engine routes requests over its
+providers with speakswap.routing.TranslationRouter.
+"""
+import collections
+import random
+import threading
+import time
+
+from speakswap.lazy import lazy_import, module_available
+from speakswap.segmenter import DEFAULT_BATCH_CHARS, iter_batches, iter_sentences, join_translations
+
+torch = lazy_import("torch")
+LOCAL_NMT_AVAILABLE = module_available("torch") and module_available("transformers")
+
+# NLLB-200 names languages by ISO 639-3 code and script
+_NLLB_CODES = {
+    "en": "eng_Latn", "hi": "hin_Deva", "bn": "ben_Beng", "es": "spa_Latn", "zh-CN": "zho_Hans",
+    "ru": "rus_Cyrl", "ja": "jpn_Jpan", "ko": "kor_Hang", "de": "deu_Latn", "fr": "fra_Latn",
+    "ta": "tam_Taml", "te": "tel_Telu", "kn": "kan_Knda", "gu": "guj_Gujr", "pa": "pan_Guru",
+    "ml": "mal_Mlym", "it": "ita_Latn", "pt": "por_Latn", "ar": "arb_Arab", "nl": "nld_Latn",
+    "el": "ell_Grek", "he": "heb_Hebr", "sv": "swe_Latn", "tr": "tur_Latn", "vi": "vie_Latn",
+    "th": "tha_Thai", "uk": "ukr_Cyrl", "pl": "pol_Latn"
+}
+
+# Longest request each online service accepts, in characters
+ONLINE_MAX_CHARS = {"google": DEFAULT_BATCH_CHARS, "mymemory": 500}
+
+# Model families: per-pair Marian models or one multilingual model
+LOCAL_NMT_MODELS = {
+    "marian": "Helsinki-NLP/opus-mt-{source}-{target}",
+    "m2m100": "facebook/m2m100_418M",
+    "nllb": "facebook/nllb-200-distilled-600M"
+}
+
+
+def _iso_code(code):
+    """Marian and M2M100 use bare ISO 639-1 codes (zh rather than zh-CN)"""
+    return code.split("-")[0]
+
+
+class TranslationProvider:
+    """Interface of a translation backend
+
+    translate() returns the translated text or raises; it never returns a
+    partial result. translate_batch() translates several texts of one
+    language pair and may be overridden to do so in a single pass.
+    Providers that must load something before their first call for a pair
+    report it through is_ready() and do the loading in prepare(), so the
+    router can load it in the background instead of inside a request.
+    """
+
+    name = "provider"
+
+    def supports(self, source, target):
+        """True if the provider can translate this language pair"""
+        return True
+
+    def is_ready(self, source, target):
+        """False while the first call for this pair would have to load first"""
+        return True
+
+    def prepare(self, source, target):
+        """Load whatever the pair needs; translate() does this itself otherwise"""
+
+    def translate(self, text, source, target):
+        raise NotImplementedError
+
+    def translate_batch(self, texts, source, target):
+        return [self.translate(text, source, target) for text in texts]
+
+    def close(self):
+        pass
+
+
+class OnlineProvider(TranslationProvider):
+    """A deep-translator service reached through a shared ChunkTranslator"""
+
+    def __init__(self, chunk_translator, service="google", max_chars=None):
+        self.name = service
+        self.chunk_translator = chunk_translator
+        self.service = service
+        self.max_chars = max_chars or ONLINE_MAX_CHARS.get(service, DEFAULT_BATCH_CHARS)
+
+    def translate(self, text, source, target):
+        # Long texts are packed into sentence batches below the service limit
+        # and translated concurrently, then joined in their original order
+        chunks = self.chunk_translator.translate_chunks(
+            iter_batches(text, self.max_chars), source, target, provider=self.service
+        )
+        return join_translations(chunks, target)
+
+
+class StubProvider(TranslationProvider):
+    """Offline provider that tags text instead of translating it
+
+    Returns "[target] text" (or transform(text, source, target)), so the
+    recognition -> translation -> speech pipeline can run without a network
+    or model download.
+    """
+
+    name = "stub"
+
+    def __init__(self, transform=None):
+        self.transform = transform
+        self.calls = 0
+
+    def translate(self, text, source, target):
+        self.calls += 1
+        if self.transform:
+            return self.transform(text, source, target)
+        return f"[{target}] {text}"
+
+
+class FakeProvider(StubProvider):
+    """StubProvider with injected latency and failures, for routing tests
+
+    Each call sleeps delay_s plus an exponential tail with mean jitter_s
+    and fails with probability error_rate. While `down` is set every call
+    fails after the delay, like a service that has gone away.
+    """
+
+    def __init__(self, name="fake", delay_s=0.05, jitter_s=0.0, error_rate=0.0, seed=None, transform=None):
+        super().__init__(transform)
+        self.name = name
+        self.delay_s = delay_s
+        self.jitter_s = jitter_s
+        self.error_rate = error_rate
+        self.down = False
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate(self, text, source, target):
+        with self._lock:
+            delay = self.delay_s + (self._random.expovariate(1 / self.jitter_s) if self.jitter_s else 0.0)
+            fails = self.down or self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fails:
+            raise ConnectionError(f"{self.name} is unavailable")
+        return super().translate(text, source, target)
+
+
+def _model_missing(error):
+    """True if a load failed because the hub has no such model
+
+    transformers re-raises hub errors as OSError; the original is chained
+    as the cause. Network and offline errors are not "missing".
+    """
+    while error is not None:
+        if type(error).__name__ in ("RepositoryNotFoundError", "RevisionNotFoundError"):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class _LoadedModel:
+    __slots__ = ("model", "tokenizer", "nbytes", "lock")
+
+    def __init__(self, model, tokenizer, nbytes):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.nbytes = nbytes
+        self.lock = threading.Lock()
+
+
+def _model_bytes(model, quantized):
+    """Approximate memory held by a float model's weights once loaded
+
+    Called before quantization, which hides Linear weights from parameters().
+    """
+    total = sum(p.numel() * p.element_size() for p in model.parameters())
+    total += sum(b.numel() * b.element_size() for b in model.buffers())
+    if quantized:
+        # Dynamic quantization stores Linear weights as int8 instead of float32
+        linear = sum(
+            module.weight.numel() * module.weight.element_size()
+            for module in model.modules() if isinstance(module, torch.nn.Linear)
+        )
+        total -= linear * 3 // 4
+    return total
+
+
+class LocalNMTProvider(TranslationProvider):
+    """Translate on this machine with MarianMT, M2M100 or NLLB models
+
+    Models are loaded on first use of a language pair (Marian has one model
+    per pair; M2M100 and NLLB serve every pair from one model) and kept
+    until the memory budget is exceeded, when the least recently used ones
+    are dropped. Loading one model does not hold up requests for models that
+    are already in memory. Sentences of a request are decoded together in batches of
+    batch_size, sorted by length to keep padding small. On the CPU float32
+    models are int8 quantized like Whisper.
+    """
+
+    def __init__(self, family="marian", device=None, quantize=True, memory_budget_mb=1500,
+                 batch_size=16, num_beams=2, max_new_tokens=256):
+        if family not in LOCAL_NMT_MODELS:
+            raise ValueError(f"Unknown local translation model family: {family}")
+        self.family = family
+        self.name = f"local-{family}"
+        self.device = device
+        self.quantize = quantize
+        self.memory_budget = int(memory_budget_mb * 2**20)
+        self.batch_size = max(1, int(batch_size))
+        self.num_beams = num_beams
+        self.max_new_tokens = max_new_tokens
+        self.loads = 0
+        self.evictions = 0
+        self._models = collections.OrderedDict()
+        self._unavailable = set()
+        self._lock = threading.Lock()
+        # One lock per model id being loaded, so a model is only loaded once
+        self._load_locks = {}
+
+    def model_id(self, source, target):
+        return LOCAL_NMT_MODELS[self.family].format(source=_iso_code(source), target=_iso_code(target))
+
+    def supports(self, source, target):
+        if source == target or source == "auto":
+            return False
+        if self.family == "nllb" and (source not in _NLLB_CODES or target not in _NLLB_CODES):
+            return False
+        return self.model_id(source, target) not in self._unavailable
+
+    def loaded_models(self):
+        """Model ids currently in memory, least recently used first"""
+        with self._lock:
+            return list(self._models)
+
+    def memory_used(self):
+        with self._lock:
+            return sum(loaded.nbytes for loaded in self._models.values())
+
+    def is_ready(self, source, target):
+        with self._lock:
+            return self.model_id(source, target) in self._models
+
+    def prepare(self, source, target):
+        self._get_model(source, target)
+
+    def _get_model(self, source, target):
+        """Return the _LoadedModel for a pair, loading and evicting as needed"""
+        model_id = self.model_id(source, target)
+        with self._lock:
+            loaded = self._models.get(model_id)
+            if loaded is not None:
+                self._models.move_to_end(model_id)
+                return loaded
+            load_lock = self._load_locks.setdefault(model_id, threading.Lock())
+
+        # Loading takes seconds, so only callers of this model wait for it
+        with load_lock:
+            with self._lock:
+                loaded = self._models.get(model_id)
+                if loaded is not None:
+                    self._models.move_to_end(model_id)
+                    return loaded
+                if model_id in self._unavailable:
+                    raise OSError(f"No translation model {model_id}")
+
+            try:
+                loaded = self._load(model_id)
+            except OSError as e:
+                if _model_missing(e):
+                    # No such model on the hub (e.g. a Marian pair that was never
+                    # trained); other errors, like being offline, may go away
+                    with self._lock:
+                        self._unavailable.add(model_id)
+                raise
+
+            with self._lock:
+                self._models[model_id] = loaded
+                self._load_locks.pop(model_id, None)
+                self.loads += 1
+                # Keep the newest model even if it alone exceeds the budget
+                while len(self._models) > 1 and \
+                        sum(entry.nbytes for entry in self._models.values()) > self.memory_budget:
+                    self._models.popitem(last=False)
+                    self.evictions += 1
+            return loaded
+
+    def _load(self, model_id):
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+        from speakswap.asr import quantize_for_cpu
+
+        device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_id, low_cpu_mem_usage=True)
+        model.eval()
+        quantized = self.quantize and device == "cpu"
+        nbytes = _model_bytes(model, quantized)
+        if quantized:
+            model = quantize_for_cpu(model)
+        else:
+            model = model.to(device)
+        return _LoadedModel(model, tokenizer, nbytes)
+
+    def translate(self, text, source, target):
+        return self.translate_batch([text], source, target)[0]
+
+    def translate_batch(self, texts, source, target):
+        loaded = self._get_model(source, target)
+
+        # Decode every sentence of every text together, longest first
+        sentences = []
+        owners = []
+        for index, text in enumerate(texts):
+            for sentence in iter_sentences(text):
+                if sentence.strip():
+                    sentences.append(sentence.strip())
+                    owners.append(index)
+        order = sorted(range(len(sentences)), key=lambda i: -len(sentences[i]))
+        outputs = [None] * len(sentences)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            decoded = self._generate(loaded, [sentences[i] for i in batch], source, target)
+            for i, translation in zip(batch, decoded):
+                outputs[i] = translation
+
+        parts = [[] for _ in texts]
+        for index, translation in zip(owners, outputs):
+            parts[index].append(translation)
+        return [join_translations(part, target) for part in parts]
+
+    def _generate(self, loaded, sentences, source, target):
+        tokenizer = loaded.tokenizer
+        # src_lang is tokenizer state shared by every pair of a multilingual
+        # model, so it is set and used under the model lock. One generate call
+        # at a time per model; concurrent callers would only compete for the
+        # same cores
+        with loaded.lock:
+            kwargs = {}
+            if self.family == "m2m100":
+                tokenizer.src_lang = _iso_code(source)
+                kwargs["forced_bos_token_id"] = tokenizer.get_lang_id(_iso_code(target))
+            elif self.family == "nllb":
+                tokenizer.src_lang = _NLLB_CODES[source]
+                kwargs["forced_bos_token_id"] = tokenizer.convert_tokens_to_ids(_NLLB_CODES[target])
+            device = next(loaded.model.parameters()).device
+            inputs = tokenizer(sentences, return_tensors="pt", padding=True, truncation=True).to(device)
+            with torch.inference_mode():
+                generated = loaded.model.generate(
+                    **inputs,
+                    num_beams=self.num_beams,
+                    max_new_tokens=self.max_new_tokens,
+                    **kwargs
+                )
+        return tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+    def stats(self):
+        return {
+            "loaded": self.loaded_models(),
+            "memory_mb": self.memory_used() / 2**20,
+            "loads": self.loads,
+            "evictions": self.evictions
+        }
+
+    def close(self):
+        with self._lock:
+            self._models.clear()
@@ -0,0 +1,309 @@
+"""Health-aware routing of translation requests across providers
+
+TranslationRouter sends each request to the healthiest provider and gives
+it a deadline. A circuit breaker per provider skips providers that keep
+failing, so a service that is down costs one probe every reset_s instead
+of a timeout on every phrase. When hedging is on, a request that is
+slower than the primary's usual p95 latency is duplicated to the next
+provider, and whichever answers first wins.
+"""
+import collections
+import itertools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from speakswap.segmenter import DEFAULT_BATCH_CHARS, iter_batches, join_translations
+
+
+class CircuitBreaker:
+    """closed -> open after failure_threshold consecutive failures
+
+    While open, calls are refused until reset_s has passed; then a single
+    probe is let through (half-open). Its success closes the breaker, its
+    failure opens it again for another reset_s.
+    """
+
+    def __init__(self, failure_threshold=3, reset_s=30.0, clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_s = reset_s
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go to the provider now"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_s:
+                self.state = "half_open"
+                return True
+            # Only one probe at a time while half-open
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = self.clock()
+
+
+class LatencyTracker:
+    """Latencies of recent successful calls, for percentile estimates"""
+
+    def __init__(self, window=200):
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q, default=None):
+        with self._lock:
+            if len(self._samples) < 5:
+                return default
+            return float(np.percentile(self._samples, q))
+
+
+class _ProviderState:
+    def __init__(self, provider, breaker):
+        self.provider = provider
+        self.breaker = breaker
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.wins = 0
+
+
+class TranslationRouter:
+    """Route translations over providers with deadlines, breakers and hedging
+
+    Providers are tried in the given order of preference, skipping those
+    whose breaker is open. Whenever a call fails, the next provider is
+    tried straight away. If the only call in flight has not answered after
+    its hedge delay (the p95 of the provider's recent latencies, clamped to
+    [hedge_min_s, hedge_max_s]), one duplicate request goes to the next
+    provider; texts longer than hedge_max_chars are never hedged.
+    translate() returns the first answer, or None once deadline_s has
+    passed, so a request never takes longer than the deadline and no call
+    is started after it. Calls still running at that point count as
+    timeouts and finish in the background, where their own outcome
+    updates the breaker. A provider that is not ready for a pair (a local
+    model not loaded yet) is skipped while prepare() runs in the
+    background, so a model download never sits on the request path; a
+    failed prepare is retried after reset_s.
+
+    translate() is meant for one request-sized text; translate_document()
+    splits longer texts into batches and routes each one separately.
+    """
+
+    def __init__(self, providers, deadline_s=8.0, hedge=True, hedge_min_s=0.2, hedge_max_s=2.0,
+                 hedge_max_chars=1000, failure_threshold=3, reset_s=30.0, workers=8, batch_workers=4):
+        self.deadline_s = deadline_s
+        self.hedge = hedge
+        self.hedge_max_chars = hedge_max_chars
+        self.hedge_min_s = hedge_min_s
+        self.hedge_max_s = hedge_max_s
+        self.reset_s = reset_s
+        self._states = [
+            _ProviderState(provider, CircuitBreaker(failure_threshold, reset_s))
+            for provider in providers
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="route")
+        self._batch_executor = ThreadPoolExecutor(max_workers=max(1, batch_workers), thread_name_prefix="route-batch")
+        # Model loads run one at a time, away from requests
+        self._prepare_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="route-prepare")
+        self._preparing = set()
+        self._prepare_failed = {}
+        self._prepare_lock = threading.Lock()
+
+    @property
+    def providers(self):
+        return [state.provider for state in self._states]
+
+    def hedge_delay(self, state):
+        p95 = state.latency.percentile(95, default=self.hedge_max_s)
+        return min(max(p95, self.hedge_min_s), self.hedge_max_s)
+
+    def translate(self, text, source, target):
+        """Return the first successful translation, or None"""
+        started = time.monotonic()
+        deadline = started + self.deadline_s
+        candidates = iter([state for state in self._states if state.provider.supports(source, target)])
+        running = {}
+        # Latencies are learned on phrases; a long document would always look
+        # slow against them, so it is never duplicated
+        hedged = not self.hedge or len(text) > self.hedge_max_chars
+
+        def launch(as_hedge=False):
+            if time.monotonic() >= deadline:
+                return None
+            for state in candidates:
+                if not state.provider.is_ready(source, target):
+                    self._prepare(state, source, target)
+                    continue
+                if state.breaker.allow():
+                    state.calls += 1
+                    if as_hedge:
+                        state.hedges += 1
+                    future = self._executor.submit(self._call, state, text, source, target)
+                    running[future] = (state, time.monotonic())
+                    return state
+            return None
+
+        launch()
+        while running:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            timeout = deadline - now
+            hedge_at = None
+            if not hedged and len(running) == 1:
+                # Wait no longer than the hedge point before duplicating the request
+                state, launched = next(iter(running.values()))
+                hedge_at = launched + self.hedge_delay(state)
+                timeout = min(timeout, max(hedge_at - now, 0.0))
+
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if hedge_at is not None and time.monotonic() >= hedge_at:
+                    # Hedge at most once per request
+                    hedged = True
+                    launch(as_hedge=True)
+                continue
+
+            failed = False
+            for future in done:
+                state, _ = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Translation error ({state.provider.name}): {str(e)}")
+                    result = None
+                if result:
+                    state.wins += 1
+                    return result
+                failed = True
+            if failed:
+                # Fail over at once, even while a slower call is still in flight;
+                # a second call in flight uses up the hedge
+                if running:
+                    hedged = True
+                launch()
+
+        # Calls still running finish in the background and update their
+        # breaker themselves; the request simply stops waiting for them
+        for state, _ in running.values():
+            state.timeouts += 1
+        return None
+
+    def translate_document(self, text, source, target, max_chars=DEFAULT_BATCH_CHARS):
+        """Translate text of any length, routing each batch on its own
+
+        The text is packed into sentence batches of at most max_chars, and
+        every batch gets its own deadline, failover and hedge, so deadline_s
+        bounds one provider request rather than the whole document. Batches
+        run batch_workers at a time and are joined in order; the result is
+        None if any batch fails.
+        """
+        batches = iter_batches(text, max_chars)
+        first = next(batches, None)
+        second = next(batches, None)
+        if second is None:
+            return self.translate(text, source, target)
+
+        failed = threading.Event()
+
+        def route(batch):
+            # Once one batch has failed the document cannot be completed
+            if failed.is_set():
+                return None
+            result = self.translate(batch, source, target)
+            if result is None:
+                failed.set()
+            return result
+
+        results = list(self._batch_executor.map(route, itertools.chain((first, second), batches)))
+        if failed.is_set():
+            return None
+        return join_translations(results, target)
+
+    def _prepare(self, state, source, target):
+        """Start loading a cold provider's pair in the background, once"""
+        key = (state.provider.name, source, target)
+        with self._prepare_lock:
+            if key in self._preparing or \
+                    time.monotonic() - self._prepare_failed.get(key, -self.reset_s) < self.reset_s:
+                return
+            self._preparing.add(key)
+        self._prepare_executor.submit(self._run_prepare, state, source, target, key)
+
+    def _run_prepare(self, state, source, target, key):
+        failed = False
+        try:
+            print(f"Preparing {state.provider.name} for {source} -> {target}")
+            state.provider.prepare(source, target)
+        except Exception as e:
+            # Not a breaker failure: the provider may be fine for other pairs,
+            # and a missing model is reported through supports() instead
+            print(f"Could not prepare {state.provider.name} for {source} -> {target}: {str(e)}")
+            failed = True
+        with self._prepare_lock:
+            self._preparing.discard(key)
+            if failed:
+                self._prepare_failed[key] = time.monotonic()
+            else:
+                self._prepare_failed.pop(key, None)
+
+    def _call(self, state, text, source, target):
+        started = time.monotonic()
+        try:
+            result = state.provider.translate(text, source, target)
+        except Exception:
+            state.failures += 1
+            state.breaker.record_failure()
+            raise
+        elapsed = time.monotonic() - started
+        if result:
+            state.latency.add(elapsed)
+            state.breaker.record_success()
+        else:
+            state.failures += 1
+            state.breaker.record_failure()
+        return result
+
+    def stats(self):
+        """Per-provider call counters, breaker state and latency percentiles"""
+        return {
+            state.provider.name: {
+                "state": state.breaker.state,
+                "calls": state.calls,
+                "failures": state.failures,
+                "timeouts": state.timeouts,
+                "hedges": state.hedges,
+                "wins": state.wins,
+                "p50_s": state.latency.percentile(50),
+                "p95_s": state.latency.percentile(95)
+            }
+            for state in self._states
+        }
+
+    def close(self):
+        self._prepare_executor.shutdown(wait=False, cancel_futures=True)
+        self._batch_executor.shutdown(wait=False, cancel_futures=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
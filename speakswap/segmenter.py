@@ -0,0 +1,88 @@
+import re
+
+# Google Translate rejects requests above ~5000 characters
+DEFAULT_BATCH_CHARS = 4000
+
+# Sentence terminators that need trailing whitespace to count (Latin, Cyrillic,
+# Greek question mark, ellipsis) so "3.14" or "example.com" are not split
+_SPACED_TERMINATORS = ".!?\u037e…"
+# Terminators that end a sentence on their own: Devanagari danda and double
+# danda, CJK and half-width full stops / marks, Arabic and Urdu marks
+_UNSPACED_TERMINATORS = "।॥。！？｡؟۔"
+_CLOSERS = "\"'»”’)]」』）"
+
+_BOUNDARY_RE = re.compile(
+    f"[{re.escape(_SPACED_TERMINATORS)}]+[{re.escape(_CLOSERS)}]*(?=\\s)"
+    f"|[{re.escape(_UNSPACED_TERMINATORS)}]+[{re.escape(_CLOSERS)}]*"
+    "|\\n\\s*"
+)
+
+# Languages whose sentences are written without separating spaces
+_UNSPACED_LANGUAGES = {"zh-CN", "zh-TW", "zh", "ja"}
+
+
+def _as_pieces(source):
+    """Accept either a whole string or an iterable of text pieces"""
+    if isinstance(source, str):
+        return (source,)
+    return source
+
+
+def iter_sentences(source):
+    """Lazily split text into sentences, keeping each terminator attached
+
+    source may be a string or any iterable of string pieces (e.g. lines read
+    from a file); sentences are yielded as soon as their end is seen.
+    """
+    pending = ""
+    for piece in _as_pieces(source):
+        pending += piece
+        start = 0
+        for match in _BOUNDARY_RE.finditer(pending):
+            # A boundary touching the end of the buffer may still grow
+            if match.end() == len(pending):
+                break
+            sentence = pending[start:match.end()]
+            # Blank lines are carried over as leading whitespace of the next sentence
+            if not sentence.strip():
+                continue
+            start = match.end()
+            yield sentence
+        pending = pending[start:]
+    if pending.strip():
+        yield pending
+
+
+def _split_long_sentence(sentence, max_chars):
+    """Split a sentence longer than max_chars at whitespace, or hard if needed"""
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        yield sentence[:cut]
+        sentence = sentence[cut:]
+    if sentence.strip():
+        yield sentence
+
+
+def iter_batches(source, max_chars=DEFAULT_BATCH_CHARS):
+    """Pack whole sentences into batches of at most max_chars characters
+
+    Batches are yielded lazily, so callers can start translating the first
+    batch while the rest of the text is still being segmented.
+    """
+    batch = ""
+    for sentence in iter_sentences(source):
+        for part in _split_long_sentence(sentence, max_chars):
+            if batch and len(batch) + len(part) > max_chars:
+                yield batch.strip()
+                batch = ""
+            batch += part
+    if batch.strip():
+        yield batch.strip()
+
+
+def join_translations(parts, target_lang):
+    """Join translated batches with the separator the target script uses"""
+    separator = "" if target_lang in _UNSPACED_LANGUAGES else " "
+    return separator.join(part for part in parts if part)
@@ -0,0 +1,238 @@
+"""Translate several speakers at once
+
+A CaptureSession runs one capture and recognition path per source, where
+a source is a microphone or one channel of a multichannel interface. All
+sources share one worker pool and the engine's single Whisper model.
+Phrases from different speakers that finish at the same time are
+transcribed in one batched forward pass by the engine's MicroBatcher, so
+adding a speaker costs far less than a second model would.
+"""
+import collections
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from speakswap.audio import int16_to_whisper_array
+from speakswap.capture import MicrophoneCapture
+from speakswap.enhance import StreamingEnhancer, normalize_peak
+from speakswap.vad import VAD_FRAME_MS, VoiceActivitySegmenter
+
+
+class CaptureSource:
+    """One speaker: an input device and the channel they are on"""
+
+    def __init__(self, label, device=None, channel=0, language="auto"):
+        self.label = label
+        self.device = device
+        self.channel = channel
+        self.language = language
+
+    @classmethod
+    def from_dict(cls, data, index=0):
+        """Build a source from a capture_sources settings entry"""
+        return cls(
+            data.get("label") or f"Speaker {index + 1}",
+            device=data.get("device"),
+            channel=data.get("channel", 0),
+            language=data.get("language", "auto")
+        )
+
+
+class SourceResult:
+    """A recognized and translated phrase, labelled with its source"""
+
+    def __init__(self, source, text, language, translation, started_at, finished_at):
+        self.source = source
+        self.text = text
+        self.language = language
+        self.translation = translation
+        self.started_at = started_at
+        self.finished_at = finished_at
+
+    @property
+    def label(self):
+        return self.source.label
+
+
+class _SourceWorker:
+    """Per-source phrase queue drained on the shared pool
+
+    Phrases of one source are handled strictly in order, one at a time,
+    while different sources run concurrently. A full queue drops the oldest
+    phrase rather than stalling the device's capture thread.
+    """
+
+    def __init__(self, source, max_pending):
+        self.source = source
+        self.phrases = collections.deque(maxlen=max_pending)
+        self.scheduled = False
+        self.processed = 0
+        self.dropped = 0
+
+
+class CaptureSession:
+    """Capture, recognize and translate several sources concurrently
+
+    Sources on the same device share one MicrophoneCapture (and its ring
+    buffer); each source has its own VoiceActivitySegmenter reading its
+    channel. One capture thread per device runs the segmenters, and
+    finished phrases go to a ThreadPoolExecutor of `workers` threads for
+    recognition and translation. on_result(SourceResult) is called from a
+    pool thread for every translated phrase.
+    """
+
+    def __init__(self, engine, sources, target_lang, on_result, on_error=None, settings=None, workers=None):
+        self.engine = engine
+        self.sources = list(sources)
+        self.target_lang = target_lang
+        self.on_result = on_result
+        self.on_error = on_error
+        self.settings = settings if settings is not None else engine.settings
+        self.workers = workers or min(8, 2 * len(self.sources))
+        self.stop_event = threading.Event()
+        self._pool = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._workers = {id(source): _SourceWorker(source, self.settings.get("session_max_pending", 4))
+                         for source in self.sources}
+
+    def start(self):
+        if not self.engine.asr_ready:
+            raise RuntimeError("Multi-source capture needs the Whisper model")
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="session")
+
+        devices = collections.OrderedDict()
+        for source in self.sources:
+            devices.setdefault(source.device, []).append(source)
+        for device, sources in devices.items():
+            thread = threading.Thread(
+                target=self._capture_device,
+                args=(device, sources),
+                name=f"capture-{device if device is not None else 'default'}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=2.0):
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        """Phrases processed and dropped per source label"""
+        with self._lock:
+            return {
+                worker.source.label: {"processed": worker.processed, "dropped": worker.dropped}
+                for worker in self._workers.values()
+            }
+
+    def _report_error(self, source, error):
+        print(f"Capture error for {source.label}: {str(error)}")
+        traceback.print_exc()
+        if self.on_error:
+            self.on_error(source, error)
+
+    def _capture_device(self, device, sources):
+        sample_rate = self.settings.get("capture_sample_rate", 16000)
+        max_segment_s = self.settings.get("vad_max_segment_s", 15.0)
+        frame_length = int(sample_rate * VAD_FRAME_MS / 1000)
+        enhancer = None
+        if self.settings.get("enhance_audio", True):
+            enhancer = StreamingEnhancer(sample_rate, cutoff_hz=self.settings.get("highpass_hz", 100))
+        capture = MicrophoneCapture(
+            sample_rate=sample_rate,
+            channels=max(source.channel for source in sources) + 1,
+            device=device,
+            seconds=max_segment_s + 15.0,
+            frame_length=frame_length,
+            process=enhancer.process if enhancer else None
+        )
+        segmenters = [
+            (source, VoiceActivitySegmenter(
+                sample_rate=sample_rate,
+                energy_threshold=self.settings.get("vad_energy_threshold", 300),
+                hangover_ms=self.settings.get("vad_hangover_ms", 300),
+                max_segment_s=max_segment_s,
+                ring=capture.ring,
+                channel=source.channel,
+                adaptive=self.settings.get("vad_adaptive_threshold", True),
+                noise_window_s=self.settings.get("vad_noise_window_s", 3.0),
+                noise_percentile=self.settings.get("vad_noise_percentile", 20),
+                noise_ratio=self.settings.get("vad_noise_ratio", 3.0)
+            ))
+            for source in sources
+        ]
+
+        try:
+            with capture:
+                while not self.stop_event.is_set():
+                    if not capture.wait(timeout=0.2):
+                        continue
+                    for source, segmenter in segmenters:
+                        for segment in segmenter.process():
+                            self._enqueue(source, segment)
+        except Exception as e:
+            for source in sources:
+                self._report_error(source, e)
+
+    def _enqueue(self, source, segment):
+        worker = self._workers[id(source)]
+        with self._lock:
+            if len(worker.phrases) == worker.phrases.maxlen:
+                worker.dropped += 1
+            worker.phrases.append(segment)
+            if worker.scheduled or self._pool is None:
+                return
+            worker.scheduled = True
+        self._pool.submit(self._drain, worker)
+
+    def _drain(self, worker):
+        while not self.stop_event.is_set():
+            with self._lock:
+                if not worker.phrases:
+                    worker.scheduled = False
+                    return
+                segment = worker.phrases.popleft()
+            try:
+                result = self._process(worker.source, segment)
+                if result is not None:
+                    self.on_result(result)
+            except Exception as e:
+                self._report_error(worker.source, e)
+            with self._lock:
+                worker.processed += 1
+        with self._lock:
+            worker.scheduled = False
+
+    def _process(self, source, segment):
+        """Recognize and translate one phrase of a source"""
+        audio = int16_to_whisper_array(segment.samples, segment.sample_rate)
+        target_peak = self.settings.get("normalize_peak", 0.9)
+        if self.settings.get("enhance_audio", True) and target_peak:
+            audio = normalize_peak(audio, target_peak)
+
+        # Concurrent calls from other sources are batched by the engine
+        recognized = self.engine.transcribe(audio, language=source.language)
+        text = recognized["text"].strip()
+        if not text:
+            return None
+
+        source_lang = source.language
+        if source_lang == "auto":
+            # Reuse Whisper's language prediction when it is confident enough
+            if recognized["language"] and recognized["language_probability"] >= \
+                    self.settings.get("whisper_language_min_probability", 0.5):
+                source_lang = recognized["language"]
+            else:
+                source_lang = self.engine.detect_language(text) or "auto"
+        translation = text
+        if source_lang != self.target_lang:
+            translation = self.engine.translate_text(text, source_lang, self.target_lang)
+        return SourceResult(source, text, source_lang, translation, segment.started_at, time.time())
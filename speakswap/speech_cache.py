@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from speakswap.translation_cache import normalize_text
+from speakswap.tts import SpeechClip
+
+
+def speech_key(text, language, voice_id=None, rate=None, volume=None, pitch=None, backend=None):
+    """Content address of a synthesized phrase
+
+    Everything that changes the rendered audio is part of the key, so a
+    new voice or speaking rate never plays a stale recording.
+    """
+    fields = [normalize_text(text), language, voice_id, rate, volume, pitch, backend]
+    digest = hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SpeechCache:
+    """Two-tier cache of synthesized speech keyed by speech_key()
+
+    The first tier is an in-memory LRU of decoded PCM clips, bounded by
+    max_memory_bytes. The optional second tier keeps one .npz file per key
+    in `path`, trimmed to max_disk_bytes by least recent use (a hit touches
+    the file), so repeated phrases skip both synthesis and decoding even
+    after a restart.
+    """
+
+    def __init__(self, max_memory_bytes=64 * 2**20, path=None, max_disk_bytes=256 * 2**20):
+        self.max_memory_bytes = max_memory_bytes
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        if path:
+            try:
+                os.makedirs(path, exist_ok=True)
+                self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+            except OSError as e:
+                print(f"Speech cache disabled on disk: {str(e)}")
+                self.path = None
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def _disk_entries(self):
+        """(path, last use, size) of every stored clip"""
+        entries = []
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.endswith(".npz"):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def get(self, key):
+        """Return a cached SpeechClip or None"""
+        with self._lock:
+            clip = self._memory.get(key)
+            if clip is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return clip
+
+        clip = self._read(key) if self.path else None
+        with self._lock:
+            if clip is None:
+                self.misses += 1
+                return None
+            self._remember(key, clip)
+            self.hits += 1
+            self.disk_hits += 1
+            return clip
+
+    def put(self, key, clip):
+        """Store a clip in both tiers"""
+        if clip is None or not len(clip.samples):
+            return
+        clip.samples = np.ascontiguousarray(clip.samples, dtype=np.float32)
+        with self._lock:
+            self._remember(key, clip)
+        if self.path:
+            self._write(key, clip)
+
+    def _remember(self, key, clip):
+        """Insert into the memory tier, evicting least recently used clips"""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.samples.nbytes
+        self._memory[key] = clip
+        self._memory_bytes += clip.samples.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.samples.nbytes
+
+    def _read(self, key):
+        path = self._file(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                clip = SpeechClip(data["samples"], int(data["sample_rate"]), str(data["text"]))
+            os.utime(path)
+            return clip
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Discarding unreadable speech cache entry: {str(e)}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write(self, key, clip):
+        # Write under a private name and rename, so concurrent writers of the
+        # same phrase and readers never see a partial file
+        try:
+            fd, staging = tempfile.mkstemp(prefix=".staging-", suffix=".npz", dir=self.path)
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, samples=clip.samples, sample_rate=np.int32(clip.sample_rate), text=np.str_(clip.text))
+            size = os.path.getsize(staging)
+            os.replace(staging, self._file(key))
+        except OSError as e:
+            print(f"Speech cache write error: {str(e)}")
+            return
+
+        with self._lock:
+            self._disk_bytes += size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._trim_disk()
+
+    def _trim_disk(self):
+        """Delete least recently used clips until under max_disk_bytes"""
+        try:
+            entries = sorted(self._disk_entries(), key=lambda entry: entry[1])
+        except OSError:
+            return
+        total = sum(size for _, _, size in entries)
+        # Trim to 90% so the next few writes do not each trigger a scan
+        target = self.max_disk_bytes * 0.9
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def clear(self):
+        """Remove every cached clip"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self.path:
+                for path, _, _ in self._disk_entries():
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._disk_bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and current sizes"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes
+            }
@@ -0,0 +1,129 @@
+import threading
+import time
+import traceback
+
+
+def common_prefix_length(first, second):
+    """Return how many leading words two hypotheses share"""
+    count = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        count += 1
+    return count
+
+
+class LocalAgreement:
+    """Commit the words that two consecutive hypotheses agree on
+
+    Whisper tends to revise the last few words of a growing window, but a
+    prefix it produces twice in a row is very likely final. Committed words
+    never change; the rest is shown as a tentative partial.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.committed = []
+        self._previous = []
+
+    def update(self, hypothesis):
+        """Feed a new hypothesis; returns (committed text, tentative text)"""
+        words = hypothesis.split()
+        agreed = common_prefix_length(self._previous, words)
+        if agreed > len(self.committed) and words[:len(self.committed)] == self.committed:
+            self.committed = words[:agreed]
+        self._previous = words
+        # Committed words stay on screen even if this hypothesis revised them
+        return " ".join(self.committed), " ".join(words[len(self.committed):])
+
+
+class StreamingTranscriber:
+    """Re-decode the utterance in progress and publish partial hypotheses
+
+    The capture thread hands over the audio of the current utterance with
+    submit(); a single background thread decodes only the most recent
+    submission (older ones are skipped) at most once per interval_s, so
+    partial decoding never queues up behind the final transcription.
+    """
+
+    def __init__(self, decode, on_partial, interval_s=0.4, window_s=15.0, sample_rate=16000):
+        self.decode = decode
+        self.on_partial = on_partial
+        self.interval_s = interval_s
+        self.window_samples = int(window_s * sample_rate)
+        self.agreement = LocalAgreement()
+        self._pending = None
+        self._utterance = None
+        self._finished = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._last_submit = 0.0
+        self._thread = threading.Thread(target=self._run, name="streaming-asr", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def due(self):
+        """True when enough time has passed to decode a new partial"""
+        return time.monotonic() - self._last_submit >= self.interval_s
+
+    def submit(self, utterance_id, audio):
+        """Offer the audio of the current utterance (16 kHz float32)"""
+        self._last_submit = time.monotonic()
+        # Sliding window: only the most recent window_s seconds are decoded
+        audio = audio[-self.window_samples:]
+        with self._lock:
+            if utterance_id in self._finished:
+                return
+            self._pending = (utterance_id, audio)
+        self._wake.set()
+
+    def finish(self, utterance_id):
+        """Mark an utterance as final so late partials are discarded"""
+        with self._lock:
+            self._finished.add(utterance_id)
+            if self._pending and self._pending[0] == utterance_id:
+                self._pending = None
+            if self._utterance == utterance_id:
+                self._utterance = None
+                self.agreement.reset()
+            # Only the most recent ids can still arrive
+            if len(self._finished) > 32:
+                self._finished = {utterance_id}
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=0.5)
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+
+            utterance_id, audio = pending
+            try:
+                hypothesis = self.decode(audio)
+            except Exception as e:
+                print(f"Partial transcription error: {str(e)}")
+                traceback.print_exc()
+                continue
+
+            with self._lock:
+                if utterance_id in self._finished:
+                    continue
+                if utterance_id != self._utterance:
+                    self._utterance = utterance_id
+                    self.agreement.reset()
+                committed, tentative = self.agreement.update(hypothesis)
+                # Published under the lock so it cannot race past finish()
+                self.on_partial(utterance_id, committed, tentative)
@@ -0,0 +1,183 @@
+import collections
+import json
+import os
+import threading
+import time
+
+import tkinter as tk
+
+
+class TranscriptSegment:
+    """One recognized or translated phrase"""
+
+    __slots__ = ("segment_id", "text", "timestamp", "language")
+
+    def __init__(self, segment_id, text, timestamp, language=None):
+        self.segment_id = segment_id
+        self.text = text
+        self.timestamp = timestamp
+        self.language = language
+
+    @property
+    def tag(self):
+        """Text widget tag covering exactly this segment"""
+        return f"seg-{self.segment_id}"
+
+    def to_dict(self):
+        return {
+            "id": self.segment_id,
+            "time": self.timestamp,
+            "text": self.text,
+            "language": self.language
+        }
+
+
+class Transcript:
+    """Append-only transcript shown in a Tk Text widget
+
+    New segments are appended at the end of the widget through the UI bus,
+    so adding a phrase costs the same after an hour as after a minute. Only
+    the newest max_segments stay in memory and on screen; older ones are
+    removed from the widget and written to a JSONL file in spill_dir, from
+    which history() can still read them. Every segment carries its own tag
+    (seg-<id>) plus "final", and an optional "timestamp" prefix; the phrase
+    still being spoken is shown with the "partial" tags until it is final.
+
+    add(), show_partial(), clear_partial() and reset() may be called from
+    any thread; widget changes always happen on the Tk thread.
+    """
+
+    def __init__(self, widget, bus, name, max_segments=500, spill_dir=None, show_timestamps=False):
+        self.widget = widget
+        self.bus = bus
+        self.name = name
+        self.max_segments = max(1, int(max_segments))
+        self.spill_dir = spill_dir
+        self.show_timestamps = show_timestamps
+        self.spilled = 0
+        self._segments = collections.deque()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._spill_file = None
+        self._spill_path = None
+        self._partial_utterance = None
+
+    def add(self, text, timestamp=None, language=None, see_end=True):
+        """Append a final segment; returns the TranscriptSegment"""
+        with self._lock:
+            segment = TranscriptSegment(self._next_id, text, timestamp or time.time(), language)
+            self._next_id += 1
+            self._segments.append(segment)
+            evicted = []
+            while len(self._segments) > self.max_segments:
+                evicted.append(self._segments.popleft())
+            self._spill(evicted)
+
+        tags = ("final", segment.tag)
+        if self.show_timestamps:
+            stamp = time.strftime("[%H:%M:%S] ", time.localtime(segment.timestamp))
+            self.bus.append(self.widget, stamp, ("timestamp",) + tags, separator="\n")
+            self.bus.append(self.widget, text, tags, see_end)
+        else:
+            self.bus.append(self.widget, text, tags, see_end, separator="\n")
+
+        if evicted:
+            self.bus.post(self._trim, evicted[-1].tag, [old.tag for old in evicted])
+        return segment
+
+    def show_partial(self, utterance_id, committed, tentative, see_end=True):
+        """Show the live hypothesis for the phrase being spoken"""
+        self.bus.post(self._show_partial, utterance_id, committed, tentative, see_end)
+
+    def clear_partial(self, utterance_id=None):
+        """Remove the partial hypothesis (optionally only for one utterance)"""
+        self.bus.post(self._clear_partial, utterance_id)
+
+    def reset(self, clear_widget=True):
+        """Forget the segments on screen (they are kept in the spill file)"""
+        with self._lock:
+            segments = list(self._segments)
+            self._segments.clear()
+            self._spill(segments)
+        self.bus.post(self._forget, [segment.tag for segment in segments], clear_widget)
+
+    def segments(self):
+        """Segments currently held in memory, oldest first"""
+        with self._lock:
+            return list(self._segments)
+
+    def history(self):
+        """Yield every segment of the session as a dict, oldest first"""
+        with self._lock:
+            if self._spill_file:
+                self._spill_file.flush()
+            path = self._spill_path
+            in_memory = [segment.to_dict() for segment in self._segments]
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+        yield from in_memory
+
+    def close(self):
+        with self._lock:
+            if self._spill_file:
+                self._spill_file.close()
+                self._spill_file = None
+
+    def _spill(self, segments):
+        """Write evicted segments to disk (called with the lock held)"""
+        self.spilled += len(segments)
+        if not segments or not self.spill_dir:
+            return
+        try:
+            if self._spill_file is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                session = time.strftime("%Y%m%d-%H%M%S")
+                self._spill_path = os.path.join(self.spill_dir, f"{session}-{self.name}.jsonl")
+                self._spill_file = open(self._spill_path, "a", encoding="utf-8")
+            for segment in segments:
+                self._spill_file.write(json.dumps(segment.to_dict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Failed to save transcript history: {str(e)}")
+
+    # The methods below run on the Tk thread
+
+    def _trim(self, last_tag, tags):
+        ranges = self.widget.tag_ranges(last_tag)
+        if ranges:
+            # Also drop the line break that separated it from the next segment
+            self.widget.delete("1.0", f"{ranges[-1]} +1c")
+        for tag in tags:
+            self.widget.tag_delete(tag)
+
+    def _forget(self, tags, clear_widget):
+        if clear_widget:
+            self.widget.delete("1.0", tk.END)
+            self._partial_utterance = None
+        for tag in tags:
+            self.widget.tag_delete(tag)
+
+    def _show_partial(self, utterance_id, committed, tentative, see_end):
+        self._clear_partial()
+        if not committed and not tentative:
+            return
+
+        self._partial_utterance = utterance_id
+        separator = "\n" if self.widget.compare("end-1c", "!=", "1.0") else ""
+        self.widget.insert(
+            tk.END,
+            separator, ("partial",),
+            f"{committed} " if committed else "", ("partial",),
+            tentative, ("partial", "partial_tentative")
+        )
+        if see_end:
+            self.widget.see(tk.END)
+
+    def _clear_partial(self, utterance_id=None):
+        if utterance_id is not None and utterance_id != self._partial_utterance:
+            return
+        ranges = self.widget.tag_ranges("partial")
+        if ranges:
+            self.widget.delete(ranges[0], ranges[-1])
+        self._partial_utterance = None
@@ -0,0 +1,138 @@
+import itertools
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import deep_translator.google
+    import deep_translator.mymemory
+    from deep_translator import GoogleTranslator, MyMemoryTranslator
+    TRANSLATOR_AVAILABLE = True
+except ImportError:
+    TRANSLATOR_AVAILABLE = False
+
+
+class _SessionRequests:
+    """Stand-in for the requests module that sends calls through one Session
+
+    deep-translator calls requests.get() at module level, which opens a new
+    connection for every phrase. Swapping the module reference for this
+    object lets all translator clients share a keep-alive connection pool.
+    deep-translator sets no timeout, so calls get `timeout` unless they pass
+    one; a hung request then frees its worker instead of holding it forever.
+    """
+
+    def __init__(self, session, timeout=None):
+        self._session = session
+        self._timeout = timeout
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self._timeout)
+        return self._session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault("timeout", self._timeout)
+        return self._session.post(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def create_http_session(pool_size=8):
+    """Create a requests Session with a connection pool sized for the workers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def use_shared_session(session, timeout=None):
+    """Route deep-translator's HTTP requests through the given session"""
+    if not TRANSLATOR_AVAILABLE:
+        return
+    shim = _SessionRequests(session, timeout)
+    deep_translator.google.requests = shim
+    deep_translator.mymemory.requests = shim
+
+
+class TranslatorPool:
+    """Reuse translator clients instead of creating one per chunk
+
+    deep-translator clients keep per-request state on the instance, so a
+    client is only ever lent to one thread at a time and returned afterwards.
+    """
+
+    def __init__(self, max_idle=8):
+        self.max_idle = max_idle
+        self._idle = defaultdict(list)
+        self._lock = threading.Lock()
+        self._factories = {}
+        if TRANSLATOR_AVAILABLE:
+            self._factories = {
+                "google": GoogleTranslator,
+                "mymemory": MyMemoryTranslator
+            }
+
+    @contextmanager
+    def client(self, provider, source, target):
+        """Borrow a client for the given provider and language pair"""
+        key = (provider, source, target)
+        with self._lock:
+            idle = self._idle[key]
+            translator = idle.pop() if idle else None
+        if translator is None:
+            translator = self._factories[provider](source=source, target=target)
+        try:
+            yield translator
+        finally:
+            with self._lock:
+                if len(self._idle[key]) < self.max_idle:
+                    self._idle[key].append(translator)
+
+
+class ChunkTranslator:
+    """Translate the chunks of a long text concurrently and keep their order"""
+
+    def __init__(self, max_workers=4, timeout=None):
+        self.max_workers = max(1, int(max_workers))
+        self.pool = TranslatorPool(max_idle=self.max_workers)
+        self.session = create_http_session(self.max_workers)
+        use_shared_session(self.session, timeout)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="translate"
+        )
+
+    def translate_chunk(self, chunk, source, target, provider="google"):
+        """Translate a single chunk with a pooled client"""
+        with self.pool.client(provider, source, target) as translator:
+            return translator.translate(chunk)
+
+    def translate_chunks(self, chunks, source, target, provider="google"):
+        """Translate chunks on the worker pool; results are in input order
+
+        chunks may be a lazy iterator: each chunk is submitted as soon as it
+        is produced, so translation overlaps with segmenting the rest.
+        """
+        iterator = iter(chunks)
+        first = next(iterator, None)
+        if first is None:
+            return []
+        second = next(iterator, None)
+        if second is None:
+            # Short phrases skip the thread hop entirely
+            return [self.translate_chunk(first, source, target, provider)]
+        return list(self._executor.map(
+            lambda chunk: self.translate_chunk(chunk, source, target, provider),
+            itertools.chain((first, second), iterator)
+        ))
+
+    def shutdown(self):
+        """Stop the worker pool and close pooled connections"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,180 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Normalize text so trivially different phrases share a cache entry"""
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class TranslationCache:
+    """Two-tier translation cache keyed by (normalized text, source, target)
+
+    The first tier is an in-memory LRU. The optional second tier is a SQLite
+    file that survives restarts. Both tiers honour the same TTL; the disk tier
+    is trimmed to max_disk_entries by least recent access.
+    """
+
+    def __init__(self, max_entries=2048, ttl=7 * 24 * 3600, path=None, max_disk_entries=50000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes_since_trim = 0
+
+        if path:
+            try:
+                self._open_db(path)
+            except Exception as e:
+                print(f"Translation cache disabled on disk: {str(e)}")
+                self._db = None
+
+    def _open_db(self, path):
+        """Open (and create if needed) the on-disk cache"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "text TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+            "translation TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, "
+            "PRIMARY KEY (text, source, target))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)")
+        if self.ttl:
+            self._db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+        self._db.commit()
+
+    def _expired(self, created, now):
+        return bool(self.ttl) and now - created > self.ttl
+
+    def get(self, text, source, target):
+        """Return a cached translation or None"""
+        key = (normalize_text(text), source, target)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                translation, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return translation
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT translation, created FROM translations "
+                        "WHERE text = ? AND source = ? AND target = ?",
+                        key
+                    ).fetchone()
+                    if row and not self._expired(row[1], now):
+                        self._db.execute(
+                            "UPDATE translations SET accessed = ? "
+                            "WHERE text = ? AND source = ? AND target = ?",
+                            (now,) + key
+                        )
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return row[0]
+                except sqlite3.Error as e:
+                    print(f"Translation cache read error: {str(e)}")
+
+            self.misses += 1
+            return None
+
+    def put(self, text, source, target, translation):
+        """Store a translation in both tiers"""
+        if not translation:
+            return
+        key = (normalize_text(text), source, target)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, translation, now)
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translations "
+                        "(text, source, target, translation, created, accessed) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        key + (translation, now, now)
+                    )
+                    self._writes_since_trim += 1
+                    if self._writes_since_trim >= 256:
+                        self._trim_disk()
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Translation cache write error: {str(e)}")
+
+    def _remember(self, key, translation, created):
+        """Insert into the memory tier, evicting the least recently used entry"""
+        self._memory[key] = (translation, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _trim_disk(self):
+        """Drop expired and least recently used rows beyond max_disk_entries"""
+        self._writes_since_trim = 0
+        if self.ttl:
+            self._db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM translations WHERE rowid IN ("
+            "SELECT rowid FROM translations ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    def clear(self):
+        """Remove every cached translation"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters and current sizes"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+    def close(self):
+        """Flush and close the on-disk tier"""
+        with self._lock:
+            if self._db is not None:
+                try:
+                    self._trim_disk()
+                    self._db.commit()
+                    self._db.close()
+                except sqlite3.Error:
+                    pass
+                self._db = None
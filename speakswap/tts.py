@@ -0,0 +1,277 @@
+import collections
+import io
+import os
+import queue
+import tempfile
+import threading
+import traceback
+
+import numpy as np
+
+from speakswap.audio import decode_audio, resample
+from speakswap.lazy import lazy_import
+
+sd = lazy_import("sounddevice")
+
+# Output stream rate; clips are resampled to it once, off the audio thread
+PLAYBACK_SAMPLE_RATE = 24000
+
+
+class SpeechClip:
+    """Synthesized speech as mono float32 samples"""
+
+    def __init__(self, samples, sample_rate, text=""):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.text = text
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+
+class Pyttsx3Renderer:
+    """Render speech with the local pyttsx3 voice into memory
+
+    pyttsx3 has no in-memory output, so each phrase is saved to its own
+    temporary file, read back and deleted straight away. The platform
+    engine is not thread-safe, so rendering is serialised on `lock`, which
+    callers driving pyttsx3 elsewhere should share.
+    """
+
+    def __init__(self, lock=None):
+        self._engine = None
+        self._lock = lock or threading.Lock()
+
+    def render(self, text, rate=150, volume=1.0, voice_id=None):
+        import pyttsx3
+
+        with self._lock:
+            if self._engine is None:
+                self._engine = pyttsx3.init()
+            self._engine.setProperty('rate', rate)
+            self._engine.setProperty('volume', volume)
+            if voice_id:
+                self._engine.setProperty('voice', voice_id)
+
+            fd, path = tempfile.mkstemp(prefix="speakswap-tts-", suffix=".wav")
+            os.close(fd)
+            try:
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+                samples, sample_rate = decode_audio(path)
+            finally:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return SpeechClip(samples, sample_rate, text)
+
+
+class UndecodableSpeech(RuntimeError):
+    """Speech was fetched but cannot be decoded here; `mp3` holds the bytes"""
+
+    def __init__(self, mp3, error):
+        super().__init__(f"Cannot decode MP3 speech: {error}")
+        self.mp3 = mp3
+
+
+def gtts_mp3(text, language_code):
+    """Fetch gTTS speech as MP3 bytes without touching the disk"""
+    from gtts import gTTS
+
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=language_code).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def render_gtts(text, language_code):
+    """Fetch gTTS speech and decode it once into a SpeechClip
+
+    Raises UndecodableSpeech, carrying the MP3, when no installed decoder
+    can read it (e.g. torchaudio without a working backend).
+    """
+    mp3 = gtts_mp3(text, language_code)
+    try:
+        samples, sample_rate = decode_audio(io.BytesIO(mp3))
+    except Exception as e:
+        raise UndecodableSpeech(mp3, e) from e
+    return SpeechClip(samples, sample_rate, text)
+
+
+class SpeechPlayer:
+    """Gapless playback of queued clips through one sounddevice stream
+
+    The output stream stays open, and its callback moves straight from the
+    end of one clip to the start of the next, so consecutive phrases play
+    without the pause of opening a new device per phrase.
+    """
+
+    def __init__(self, sample_rate=PLAYBACK_SAMPLE_RATE, device=None):
+        self.sample_rate = sample_rate
+        self.device = device
+        self._clips = collections.deque()
+        self._current = None
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._stream = None
+
+    def start(self):
+        """Open the output stream (raises if no audio output is available)"""
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="float32",
+            device=self.device,
+            callback=self._callback
+        )
+        self._stream.start()
+        return self
+
+    def play(self, clip):
+        """Queue a clip; returns an Event set once it has been played"""
+        samples = resample(clip.samples, clip.sample_rate, self.sample_rate)
+        done = threading.Event()
+        with self._lock:
+            self._clips.append((np.ascontiguousarray(samples, dtype=np.float32), done))
+        return done
+
+    def pending(self):
+        """Number of clips queued or playing"""
+        with self._lock:
+            return len(self._clips) + (self._current is not None)
+
+    def cancel(self):
+        """Stop the current clip and drop the queued ones"""
+        with self._lock:
+            if self._current is not None:
+                self._current[1].set()
+            for _, done in self._clips:
+                done.set()
+            self._clips.clear()
+            self._current = None
+
+    def close(self):
+        self.cancel()
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            finally:
+                self._stream = None
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+        with self._lock:
+            while filled < frames:
+                if self._current is None:
+                    if not self._clips:
+                        break
+                    self._current = self._clips.popleft()
+                    self._offset = 0
+                samples, done = self._current
+                count = min(frames - filled, len(samples) - self._offset)
+                out[filled:filled + count] = samples[self._offset:self._offset + count]
+                filled += count
+                self._offset += count
+                if self._offset >= len(samples):
+                    done.set()
+                    self._current = None
+        out[filled:] = 0.0
+
+
+class SpeechQueue:
+    """Synthesize phrase N+1 while phrase N plays
+
+    speak() hands a phrase to a synthesis thread and returns at once (it
+    blocks only while max_pending phrases are already waiting, which keeps
+    backpressure on the translation pipeline). Rendered clips go to the
+    SpeechPlayer, at most `prefetch` ahead of playback. cancel() drops
+    everything not yet played, including the clip currently playing.
+    """
+
+    def __init__(self, synthesize, player, prefetch=2, max_pending=4, on_status=None):
+        self.synthesize = synthesize
+        self.player = player
+        self.prefetch = max(1, prefetch)
+        self.on_status = on_status
+        self._requests = queue.Queue()
+        self._slots = threading.Semaphore(max(1, max_pending))
+        self._generation = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="speech-synthesis", daemon=True)
+        self._thread.start()
+
+    def speak(self, text, language_code, block=True):
+        """Queue a phrase; returns an Event set once it was played or dropped"""
+        done = threading.Event()
+        if not text:
+            done.set()
+            return done
+        if not self._slots.acquire(blocking=block):
+            done.set()
+            return done
+        self._requests.put((self._generation, text, language_code, done))
+        return done
+
+    def cancel(self):
+        """Drop queued phrases and stop playback (e.g. when Stop is pressed)"""
+        self._generation += 1
+        while True:
+            try:
+                _, _, _, done = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            self._release(done)
+        self.player.cancel()
+
+    def close(self):
+        self._stop.set()
+        self.cancel()
+        self._requests.put(None)
+        self._thread.join(timeout=2.0)
+        self.player.close()
+
+    def _release(self, done):
+        done.set()
+        self._slots.release()
+
+    def _report(self, message, is_error=False):
+        if self.on_status:
+            self.on_status(message, is_error=is_error)
+
+    def _run(self):
+        while not self._stop.is_set():
+            request = self._requests.get()
+            if request is None:
+                break
+            generation, text, language_code, done = request
+            if generation != self._generation:
+                self._release(done)
+                continue
+
+            try:
+                clip = self.synthesize(text, language_code)
+            except Exception as e:
+                print(f"Speech synthesis error: {str(e)}")
+                traceback.print_exc()
+                self._report("Text-to-speech failed", is_error=True)
+                self._release(done)
+                continue
+
+            # Stay at most `prefetch` clips ahead of what is being heard
+            while self.player.pending() >= self.prefetch and generation == self._generation \
+                    and not self._stop.is_set():
+                self._stop.wait(0.01)
+            if generation != self._generation or clip is None:
+                self._release(done)
+                continue
+
+            played = self.player.play(clip)
+            self._report("Speaking...")
+            threading.Thread(target=self._await_playback, args=(played, done), daemon=True).start()
+
+    def _await_playback(self, played, done):
+        played.wait()
+        self._release(done)
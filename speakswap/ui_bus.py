@@ -0,0 +1,125 @@
+import collections
+import threading
+import traceback
+
+import tkinter as tk
+
+
+class UIEventBus:
+    """Hand UI updates from worker threads to the Tk main loop
+
+    Tk widgets may only be touched from the thread running mainloop().
+    Workers call post(), append() or status(), which only put an event on a
+    queue and return immediately; the main loop drains the queue every
+    interval_ms with after(). Events run in the order they were posted.
+    Consecutive appends to the same widget become a single insert call, and
+    status messages are coalesced so only the latest one is drawn per tick.
+    """
+
+    def __init__(self, root, interval_ms=50, status_handler=None):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.status_handler = status_handler
+        self._events = collections.deque()
+        self._status = None
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._running = False
+
+    def start(self):
+        """Begin draining events on the Tk main loop"""
+        self._running = True
+        self._schedule()
+        return self
+
+    def stop(self):
+        """Stop draining; events posted afterwards are ignored"""
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def post(self, callback, *args, **kwargs):
+        """Run callback(*args, **kwargs) on the Tk thread"""
+        self._events.append(("call", callback, args, kwargs))
+
+    def append(self, widget, text, tags=(), see_end=False, separator=""):
+        """Insert text at the end of a Text widget on the Tk thread
+
+        separator is inserted before the text unless the widget is empty.
+        """
+        self._events.append(("append", widget, (separator, text, tuple(tags)), see_end))
+
+    def status(self, message, is_error=False):
+        """Show a status message; only the latest one per tick is drawn"""
+        with self._lock:
+            self._status = (message, is_error)
+
+    def _schedule(self):
+        if self._running:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def _drain(self):
+        """Apply everything posted since the last tick (runs on the Tk thread)"""
+        try:
+            # Only handle what is queued now, so a busy worker cannot starve Tk
+            budget = len(self._events)
+            while budget > 0:
+                event = self._events.popleft()
+                if event[0] == "append":
+                    budget -= self._flush_appends(event, budget - 1)
+                else:
+                    _, callback, args, kwargs = event
+                    self._run(callback, *args, **kwargs)
+                budget -= 1
+
+            with self._lock:
+                status, self._status = self._status, None
+            if status is not None and self.status_handler:
+                self._run(self.status_handler, *status)
+        finally:
+            self._schedule()
+
+    def _flush_appends(self, first, limit):
+        """Merge the run of appends to one widget starting at `first`
+
+        Takes at most `limit` further events; returns how many it took.
+        """
+        _, widget, chunk, see_end = first
+        chunks = [chunk]
+        while len(chunks) <= limit and self._events[0][0] == "append" and self._events[0][1] is widget:
+            _, _, chunk, scroll = self._events.popleft()
+            chunks.append(chunk)
+            see_end = see_end or scroll
+
+        args = []
+        empty = self._is_empty(widget)
+        for separator, text, tags in chunks:
+            if separator and not empty:
+                text = separator + text
+            empty = empty and not text
+            args.extend((text, tags))
+        self._run(widget.insert, tk.END, *args)
+        if see_end:
+            self._run(widget.see, tk.END)
+        return len(chunks) - 1
+
+    @staticmethod
+    def _is_empty(widget):
+        try:
+            return widget.compare("end-1c", "==", "1.0")
+        except tk.TclError:
+            return True
+
+    def _run(self, callback, *args, **kwargs):
+        try:
+            callback(*args, **kwargs)
+        except tk.TclError:
+            # The widget was destroyed while the event was queued
+            pass
+        except Exception as e:
+            print(f"UI update error: {str(e)}")
+            traceback.print_exc()
@@ -0,0 +1,322 @@
+import time
+
+import numpy as np
+
+from speakswap.capture import RingBuffer, frame_aligned_capacity
+
+# Analysis frame length; capture rings shared with a segmenter must hold a
+# whole number of these frames
+VAD_FRAME_MS = 30
+
+
+class SpeechSegment:
+    """A finished utterance produced by the voice-activity segmenter"""
+
+    sample_width = 2
+
+    def __init__(self, samples, sample_rate, started_at, ended_at, utterance_id=None):
+        self.utterance_id = utterance_id
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.started_at = started_at
+        self.ended_at = ended_at
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    def get_raw_data(self):
+        """Return the samples as 16-bit PCM bytes (AudioData compatible)"""
+        return self.samples.tobytes()
+
+
+def frame_features(frame, scratch=None):
+    """Return (RMS energy, zero-crossing rate) of an int16 frame"""
+    if not len(frame):
+        return 0.0, 0.0
+    if scratch is None or len(scratch) != len(frame):
+        scratch = np.empty(len(frame), dtype=np.float32)
+    np.multiply(frame, frame, out=scratch, dtype=np.float32)
+    rms = float(np.sqrt(scratch.mean()))
+    crossings = np.count_nonzero((frame[1:] >= 0) != (frame[:-1] >= 0))
+    return rms, crossings / max(len(frame) - 1, 1)
+
+
+class NoiseFloorTracker:
+    """Running estimate of the background level from recent frame energies
+
+    Frame RMS values go into a fixed NumPy window of the last window_s
+    seconds. The noise floor is a low percentile of that window, which
+    ignores speech as long as the room is not talked over more than
+    (100 - percentile)% of the time. It is recomputed every update_ms and
+    follows the room up or down within one window. The speech threshold is
+    the floor times `ratio`, clamped to [min_threshold, max_threshold].
+    """
+
+    def __init__(self, frame_ms=VAD_FRAME_MS, window_s=3.0, percentile=20, ratio=3.0,
+                 min_threshold=100.0, max_threshold=8000.0, update_ms=250):
+        self.percentile = percentile
+        self.ratio = ratio
+        self.min_threshold = float(min_threshold)
+        self.max_threshold = float(max_threshold)
+        self.update_frames = max(1, int(update_ms / frame_ms))
+        self._history = np.zeros(max(1, int(window_s * 1000 / frame_ms)), dtype=np.float32)
+        self._count = 0
+        self._since_update = 0
+        self.noise_floor = 0.0
+        self.threshold = self.min_threshold
+
+    @property
+    def frames(self):
+        """Number of frames currently in the window"""
+        return min(self._count, len(self._history))
+
+    def update(self, rms):
+        """Add one frame's RMS; returns the current speech threshold"""
+        self._history[self._count % len(self._history)] = rms
+        self._count += 1
+        self._since_update += 1
+        if self._since_update >= self.update_frames or self._count == 1:
+            self.recompute()
+        return self.threshold
+
+    def reseed(self, level):
+        """Replace the window with a single level (e.g. after the room got louder)"""
+        self._history[:] = level
+        self._count = len(self._history)
+        self.recompute()
+
+    def recompute(self):
+        self._since_update = 0
+        if not self._count:
+            return
+        self.noise_floor = float(np.percentile(self._history[:self.frames], self.percentile))
+        self.threshold = min(max(self.noise_floor * self.ratio, self.min_threshold), self.max_threshold)
+
+
+class VoiceActivitySegmenter:
+    """Split a live int16 stream into utterances using frame energy and ZCR
+
+    The segmenter reads fixed frames straight out of a RingBuffer (its own,
+    or the capture ring shared with the microphone) and only remembers
+    positions, so nothing is copied until an utterance is complete.
+    Speech starts after start_ms of speech-like frames and ends once
+    hangover_ms of silence has followed it, at which point the segment (with
+    pre_roll_ms of leading audio) is copied out once and emitted. Segments
+    longer than max_segment_s are flushed so a noisy room cannot hold a
+    phrase forever.
+
+    The speech threshold follows the room: a NoiseFloorTracker sees every
+    frame judged not to be speech, and energy_threshold is only the lowest
+    threshold it may use. Speech frames are kept out of the tracker, so
+    fluent speech cannot pass itself off as the noise floor, and the
+    threshold is frozen for the length of an utterance. Speech energy
+    swings from syllable to syllable, while a fan or traffic that starts up
+    stays flat: once the last stationary_ms of "speech" varies by less than
+    stationary_cv (standard deviation over mean), the tracker is reseeded
+    at that level, and an utterance made only of that noise is dropped
+    (one that began with real speech ends where the noise took over). If
+    an utterance still only ends at max_segment_s, the tracker is reseeded
+    from its quietest frames. Pass adaptive=False for a fixed threshold.
+    The first calibration_ms of audio only feeds the tracker.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=VAD_FRAME_MS, energy_threshold=300,
+                 hangover_ms=300, pre_roll_ms=200, start_ms=60, min_speech_ms=200,
+                 max_segment_s=15.0, calibration_ms=500, ring=None, channel=0,
+                 adaptive=True, noise_window_s=3.0, noise_percentile=20, noise_ratio=3.0,
+                 stationary_ms=1000, stationary_cv=0.15):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.energy_threshold = float(energy_threshold)
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        self.start_frames = max(1, int(start_ms / frame_ms))
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.max_segment_frames = int(max_segment_s * 1000 / frame_ms)
+        self.pre_roll_frames = int(pre_roll_ms / frame_ms)
+        self.calibration_frames = int(calibration_ms / frame_ms)
+
+        if ring is None:
+            ring = RingBuffer(frame_aligned_capacity(sample_rate, max_segment_s + 5, self.frame_length))
+        if ring.capacity % self.frame_length:
+            raise ValueError("Ring capacity must be a whole number of frames")
+        self.ring = ring
+        self.channel = channel
+        self.overruns = 0
+        # Incremented whenever a new utterance starts
+        self.utterance_id = 0
+
+        self._cursor = ring.write_pos - ring.write_pos % self.frame_length
+        self._scratch = np.empty(self.frame_length, dtype=np.float32)
+        self.noise = None
+        self.stationary_cv = stationary_cv
+        self._recent = np.zeros(max(2, int(stationary_ms / frame_ms)), dtype=np.float32)
+        self._recent_count = 0
+        if adaptive:
+            self.noise = NoiseFloorTracker(
+                frame_ms,
+                window_s=noise_window_s,
+                percentile=noise_percentile,
+                ratio=noise_ratio,
+                min_threshold=energy_threshold
+            )
+        self.frames_seen = 0
+        self.segments_emitted = 0
+        self.last_rms = 0.0
+        self._reset()
+
+    @property
+    def in_speech(self):
+        return self._in_speech
+
+    def metrics(self):
+        """Current thresholds and counters, for display and logging"""
+        return {
+            "energy_threshold": self.energy_threshold,
+            "noise_floor": self.noise.noise_floor if self.noise else None,
+            "last_rms": self.last_rms,
+            "in_speech": self._in_speech,
+            "segments": self.segments_emitted,
+            "overruns": self.overruns
+        }
+
+    def is_speech_frame(self, rms, zcr):
+        """Decide whether a single frame contains speech"""
+        if rms >= self.energy_threshold:
+            return True
+        # Quiet but noisy-sounding frames are usually unvoiced consonants
+        return rms >= 0.5 * self.energy_threshold and zcr >= 0.3
+
+    def process(self, block=None):
+        """Analyse new audio; returns a list of finished SpeechSegments
+
+        Pass a block to append it to the segmenter's own ring, or call with
+        no argument when the ring is filled by a MicrophoneCapture callback.
+        """
+        if block is not None:
+            self.ring.write(block)
+
+        # Skip audio that was overwritten before we got to it
+        if self._cursor < self.ring.oldest_pos:
+            self.overruns += 1
+            self._cursor = self.ring.oldest_pos + (-self.ring.oldest_pos) % self.frame_length
+            self._reset()
+
+        segments = []
+        while self._cursor + self.frame_length <= self.ring.write_pos:
+            frame = self.ring.frame(self._cursor, self.frame_length, self.channel)
+            segment = self._process_frame(frame, self._cursor)
+            self._cursor += self.frame_length
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def current_audio(self):
+        """Copy of the utterance in progress so far, or None when silent"""
+        if not self._in_speech or self._cursor <= self._start_pos:
+            return None
+        return self.ring.copy(max(self._start_pos, self.ring.oldest_pos), self._cursor, self.channel)
+
+    def flush(self):
+        """Emit whatever speech is in progress (e.g. when capture stops)"""
+        if self._in_speech and self._voiced_frames >= self.min_speech_frames:
+            return self._finish(self._cursor)
+        self._reset()
+        return None
+
+    def _process_frame(self, frame, position):
+        rms, zcr = frame_features(frame, self._scratch)
+        self.last_rms = rms
+        self.frames_seen += 1
+        if self.frames_seen <= self.calibration_frames:
+            if self.noise:
+                self.energy_threshold = self.noise.update(rms)
+            return None
+
+        speech = self.is_speech_frame(rms, zcr)
+        frame_end = position + self.frame_length
+        if self.noise:
+            self._recent[self._recent_count % len(self._recent)] = rms
+            self._recent_count += 1
+            if speech and self._is_stationary():
+                # Loud but steady: the room got louder, nobody started talking
+                self.noise.reseed(float(self._recent.mean()))
+                self.energy_threshold = self.noise.threshold
+                if self._in_speech:
+                    return self._end_at_noise(frame_end)
+                self._speech_run = 0
+                return None
+            if not speech:
+                self.noise.update(rms)
+            if self._in_speech:
+                self._utterance_rms.append(rms)
+            else:
+                # A threshold raised mid-utterance never ends that utterance
+                self.energy_threshold = self.noise.threshold
+
+        if not self._in_speech:
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run >= self.start_frames:
+                self._in_speech = True
+                self.utterance_id += 1
+                onset = frame_end - self._speech_run * self.frame_length
+                self._start_pos = max(
+                    onset - self.pre_roll_frames * self.frame_length,
+                    self.ring.oldest_pos
+                )
+                self._voiced_frames = self._speech_run
+                self._silence_run = 0
+                self._started_at = time.time() - (frame_end - self._start_pos) / self.sample_rate
+            return None
+
+        if speech:
+            self._voiced_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run >= self.hangover_frames:
+            # Keep a little of the trailing silence so the last word is not clipped
+            trailing = self._silence_run - min(self._silence_run, 3)
+            if self._voiced_frames >= self.min_speech_frames:
+                return self._finish(frame_end - trailing * self.frame_length)
+            self._reset()
+        elif frame_end - self._start_pos >= self.max_segment_frames * self.frame_length:
+            if self.noise and self._utterance_rms:
+                # Never went quiet: the floor is stale, so learn it from the quietest frames
+                self.noise.reseed(float(np.percentile(self._utterance_rms, 5)))
+            return self._finish(frame_end)
+        return None
+
+    def _is_stationary(self):
+        """True if the last stationary_ms of frame energy is nearly constant"""
+        if self._recent_count < len(self._recent):
+            return False
+        mean = float(self._recent.mean())
+        return mean > 0 and float(self._recent.std()) < self.stationary_cv * mean
+
+    def _end_at_noise(self, frame_end):
+        """Close the utterance where steady noise began, or drop it if it is all noise"""
+        noise_start = frame_end - len(self._recent) * self.frame_length
+        speech_frames = (noise_start - self._start_pos) // self.frame_length - self.pre_roll_frames
+        if speech_frames >= self.min_speech_frames:
+            return self._finish(noise_start)
+        self._reset()
+        return None
+
+    def _finish(self, end_pos):
+        start_pos = max(self._start_pos, self.ring.oldest_pos)
+        samples = self.ring.copy(start_pos, end_pos, self.channel)
+        segment = SpeechSegment(samples, self.sample_rate, self._started_at, time.time(), self.utterance_id)
+        self.segments_emitted += 1
+        self._reset()
+        return segment
+
+    def _reset(self):
+        self._utterance_rms = []
+        self._in_speech = False
+        self._start_pos = None
+        self._speech_run = 0
+        self._silence_run = 0
+        self._voiced_frames = 0
+        self._started_at = None
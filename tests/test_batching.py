@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from speakswap.batching import MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=200)
+    try:
+        results = [None] * 6
+        barrier = threading.Barrier(6)
+
+        def call(index):
+            barrier.wait()
+            results[index] = batcher(index, timeout=5)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [0, 2, 4, 6, 8, 10]
+        assert len(batches) < 6
+        assert batcher.stats()["items"] == 6
+    finally:
+        batcher.close()
+
+
+def test_batch_size_is_capped():
+    release = threading.Event()
+    sizes = []
+
+    def process(items):
+        release.wait(5)
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(i) for i in range(7)]
+        release.set()
+        assert [future.result(5) for future in futures] == list(range(7))
+        assert max(sizes) <= 3
+        assert batcher.stats()["largest_batch"] <= 3
+    finally:
+        batcher.close()
+
+
+def test_errors_reach_every_caller_of_the_batch():
+    batcher = MicroBatcher(lambda items: items[:-1], max_wait_ms=50)
+    try:
+        futures = [batcher.submit(i) for i in range(2)]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(5)
+    finally:
+        batcher.close()
+
+
+def test_closed_batcher_refuses_work():
+    batcher = MicroBatcher(lambda items: items)
+    assert batcher(1, timeout=5) == 1
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(2)
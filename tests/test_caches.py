@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+
+from speakswap.speech_cache import SpeechCache, speech_key
+from speakswap.translation_cache import TranslationCache, normalize_text
+from speakswap.tts import SpeechClip
+
+
+def clip(seconds, text="hello", sample_rate=1000):
+    return SpeechClip(np.ones(int(seconds * sample_rate), dtype=np.float32), sample_rate, text)
+
+
+def test_normalized_text_shares_an_entry():
+    assert normalize_text("  Hello \n world ") == "Hello world"
+    cache = TranslationCache()
+    cache.put("Hello  world", "en", "fr", "Bonjour le monde")
+    assert cache.get(" Hello world ", "en", "fr") == "Bonjour le monde"
+    assert cache.get("Hello world", "en", "de") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_translation_memory_tier_is_lru():
+    cache = TranslationCache(max_entries=2)
+    cache.put("a", "en", "fr", "A")
+    cache.put("b", "en", "fr", "B")
+    cache.get("a", "en", "fr")
+    cache.put("c", "en", "fr", "C")
+    assert cache.get("b", "en", "fr") is None
+    assert cache.get("a", "en", "fr") == "A"
+
+
+def test_translation_ttl(monkeypatch):
+    import speakswap.translation_cache as module
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    cache = TranslationCache(ttl=10)
+    cache.put("a", "en", "fr", "A")
+    now[0] += 11
+    assert cache.get("a", "en", "fr") is None
+
+
+def test_translation_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "translations.sqlite3")
+    cache = TranslationCache(path=path)
+    cache.put("Good night", "en", "fr", "Bonne nuit")
+    cache.close()
+
+    reopened = TranslationCache(path=path)
+    try:
+        assert reopened.get("Good night", "en", "fr") == "Bonne nuit"
+        assert reopened.stats()["disk_hits"] == 1
+    finally:
+        reopened.close()
+
+
+def test_speech_key_covers_voice_settings():
+    base = speech_key("Hello", "en", voice_id="v1", rate=150)
+    assert base == speech_key(" Hello ", "en", voice_id="v1", rate=150)
+    assert base != speech_key("Hello", "en", voice_id="v1", rate=160)
+    assert base != speech_key("Hello", "en", voice_id="v2", rate=150)
+    assert base != speech_key("Hello", "fr", voice_id="v1", rate=150)
+
+
+def test_speech_memory_tier_is_bounded_by_bytes():
+    cache = SpeechCache(max_memory_bytes=3 * 4000)
+    for name in "abcd":
+        cache.put(name, clip(1.0, name))
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 3 * 4000
+    assert cache.get("a") is None
+    assert cache.get("d").text == "d"
+
+
+def test_speech_disk_tier_round_trip_and_trim(tmp_path):
+    cache = SpeechCache(path=str(tmp_path))
+    cache.put("key", clip(0.5, "bonjour"))
+
+    fresh = SpeechCache(path=str(tmp_path))
+    restored = fresh.get("key")
+    assert restored.text == "bonjour" and restored.sample_rate == 1000
+    assert np.array_equal(restored.samples, np.ones(500, dtype=np.float32))
+    assert fresh.stats()["disk_hits"] == 1
+
+    small = SpeechCache(path=str(tmp_path), max_disk_bytes=1)
+    small.put("other", clip(0.5))
+    assert small.stats()["disk_bytes"] <= 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".npz")]
+
+
+def test_corrupt_speech_entry_is_discarded(tmp_path):
+    cache = SpeechCache(path=str(tmp_path))
+    with open(tmp_path / "broken.npz", "wb") as f:
+        f.write(b"not a numpy archive")
+    assert cache.get("broken") is None
+    assert not (tmp_path / "broken.npz").exists()
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from speakswap.capture import RingBuffer, frame_aligned_capacity
+
+
+def test_ring_wraps_and_copies_across_the_end():
+    ring = RingBuffer(8)
+    ring.write(np.arange(6, dtype=np.int16))
+    ring.write(np.arange(6, 11, dtype=np.int16))
+    assert ring.write_pos == 11
+    assert ring.oldest_pos == 3
+    assert ring.copy(3, 11).tolist() == list(range(3, 11))
+    assert len(ring.views(5, 11)) == 2
+
+
+def test_ring_refuses_overwritten_and_unwritten_positions():
+    ring = RingBuffer(4)
+    ring.write(np.arange(10, dtype=np.int16))
+    with pytest.raises(IndexError):
+        ring.copy(2, 8)
+    with pytest.raises(IndexError):
+        ring.copy(8, 11)
+    # A block larger than the ring keeps only its newest samples
+    assert ring.copy(6, 10).tolist() == [6, 7, 8, 9]
+
+
+def test_ring_channels_and_frames():
+    ring = RingBuffer(6, channels=2)
+    ring.write(np.stack([np.arange(6), -np.arange(6)], axis=1).astype(np.int16))
+    assert ring.copy(0, 6, channel=1).tolist() == [0, -1, -2, -3, -4, -5]
+    assert ring.frame(3, 3, channel=0).tolist() == [3, 4, 5]
+    with pytest.raises(ValueError):
+        ring.frame(4, 3)
+
+
+def test_frame_aligned_capacity():
+    assert frame_aligned_capacity(16000, 1.0, 480) == 16320
+    assert frame_aligned_capacity(16000, 1.0, 480) % 480 == 0
@@ -0,0 +1,32 @@
+import pytest
+
+from speakswap.langid import detect_language, identify
+
+
+@pytest.mark.parametrize("text, code", [
+    ("The weather is very nice today and we are going to the park", "en"),
+    ("Je suis très content de vous voir aujourd'hui avec vos amis", "fr"),
+    ("Ich habe heute keine Zeit, weil ich arbeiten muss", "de"),
+    ("Hoy vamos a la playa con mis amigos y la familia", "es"),
+    ("Я очень рад тебя видеть сегодня", "ru"),
+    ("Я дуже радий тебе бачити сьогодні", "uk"),
+    ("आज मौसम बहुत अच्छा है", "hi"),
+    ("今日はとても良い天気です", "ja"),
+    ("今天天气很好", "zh-CN"),
+    ("오늘 날씨가 좋아요", "ko"),
+    ("Καλημέρα, τι κάνεις", "el"),
+])
+def test_identifies_common_languages(text, code):
+    detected, confidence = identify(text)
+    assert detected == code
+    assert confidence >= 0.6
+
+
+def test_short_ambiguous_text_is_not_confident():
+    for text in ["ok", "yes"]:
+        assert identify(text)[1] < 0.6
+        assert detect_language(text) is None
+
+
+def test_no_letters():
+    assert identify("12345 !!!") == (None, 0.0)
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from speakswap.pipeline import Stage, StagedPipeline
+
+
+def test_items_leave_in_submission_order():
+    outputs = []
+    done = threading.Event()
+
+    def slow_for_odd(item):
+        time.sleep(0.02 if item % 2 else 0.0)
+        return item
+
+    def collect(item):
+        outputs.append(item)
+        if len(outputs) == 10:
+            done.set()
+
+    pipeline = StagedPipeline(
+        [Stage("first", slow_for_odd), Stage("second", lambda item: item * 10)],
+        on_output=collect,
+        poll_interval=0.02
+    ).start()
+    try:
+        for item in range(10):
+            assert pipeline.submit(item)
+        assert done.wait(5)
+        assert outputs == [item * 10 for item in range(10)]
+    finally:
+        pipeline.stop()
+
+
+def test_full_stage_blocks_the_producer():
+    release = threading.Event()
+    pipeline = StagedPipeline([Stage("stuck", lambda item: release.wait(5) and item, maxsize=1)],
+                              poll_interval=0.02).start()
+    try:
+        assert pipeline.submit(1)  # picked up by the worker
+        assert pipeline.submit(2)  # fills the inbox
+        blocked = threading.Thread(target=pipeline.submit, args=(3,))
+        blocked.start()
+        blocked.join(0.2)
+        assert blocked.is_alive()
+        release.set()
+        blocked.join(2)
+        assert not blocked.is_alive()
+    finally:
+        pipeline.stop()
+
+
+def test_stopped_pipeline_refuses_items():
+    pipeline = StagedPipeline([Stage("only", lambda item: item, maxsize=1)], poll_interval=0.02)
+    pipeline.stop()
+    assert not pipeline.submit(1)
+
+
+def test_none_and_errors_drop_the_item():
+    outputs = []
+    errors = []
+    finished = threading.Event()
+
+    def handler(item):
+        if item == "bad":
+            raise ValueError(item)
+        return None if item == "skip" else item
+
+    def collect(item):
+        outputs.append(item)
+        if item == "last":
+            finished.set()
+
+    pipeline = StagedPipeline([Stage("only", handler)], on_output=collect,
+                              on_error=lambda name, error: errors.append(name), poll_interval=0.02).start()
+    try:
+        for item in ["keep", "skip", "bad", "last"]:
+            pipeline.submit(item)
+        assert finished.wait(5)
+        assert outputs == ["keep", "last"]
+        assert errors == ["only"]
+        assert pipeline.stats()["only"]["dropped"] == 2
+    finally:
+        pipeline.stop()
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from speakswap.providers import ONLINE_MAX_CHARS, FakeProvider, LocalNMTProvider, OnlineProvider, StubProvider, \
+    _LoadedModel
+
+
+class RepositoryNotFoundError(Exception):
+    """Stands in for huggingface_hub's error, which transformers chains under an OSError"""
+
+
+def hub_error(missing):
+    try:
+        if missing:
+            raise RepositoryNotFoundError("404")
+        raise ConnectionError("offline")
+    except Exception as cause:
+        try:
+            raise OSError("could not load") from cause
+        except OSError as error:
+            return error
+
+
+@pytest.fixture
+def local():
+    provider = LocalNMTProvider("marian", memory_budget_mb=25 / 2**20)
+    provider.loaded = []
+
+    def load(model_id):
+        provider.loaded.append(model_id)
+        time.sleep(0.2)
+        if "-xx-" in model_id or model_id.endswith("-xx"):
+            raise hub_error(missing=True)
+        if "-yy-" in model_id or model_id.endswith("-yy"):
+            raise hub_error(missing=False)
+        return _LoadedModel(None, None, 10)
+
+    provider._load = load
+    return provider
+
+
+def test_stub_and_fake_providers():
+    assert StubProvider().translate("hi", "en", "fr") == "[fr] hi"
+    assert StubProvider(lambda text, source, target: text.upper()).translate("hi", "en", "fr") == "HI"
+
+    fake = FakeProvider(delay_s=0.0)
+    assert fake.translate("hi", "en", "de") == "[de] hi"
+    fake.down = True
+    with pytest.raises(ConnectionError):
+        fake.translate("hi", "en", "de")
+
+
+def test_online_batch_limit_per_service():
+    assert OnlineProvider(None, "mymemory").max_chars == ONLINE_MAX_CHARS["mymemory"] == 500
+    assert OnlineProvider(None, "google").max_chars == ONLINE_MAX_CHARS["google"]
+    assert OnlineProvider(None, "google", max_chars=100).max_chars == 100
+
+
+def test_local_model_loads_once_and_does_not_block_loaded_pairs(local):
+    local.prepare("en", "fr")
+    assert local.is_ready("en", "fr") and not local.is_ready("en", "de")
+
+    threads = [threading.Thread(target=local.prepare, args=("en", "de")) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    local._get_model("en", "fr")
+    assert time.monotonic() - started < 0.1
+    for thread in threads:
+        thread.join()
+    assert local.loaded == ["Helsinki-NLP/opus-mt-en-fr", "Helsinki-NLP/opus-mt-en-de"]
+
+
+def test_memory_budget_evicts_least_recently_used(local):
+    local.prepare("en", "fr")
+    local.prepare("en", "de")
+    local._get_model("en", "fr")
+    local.prepare("en", "es")
+    assert local.loaded_models() == ["Helsinki-NLP/opus-mt-en-fr", "Helsinki-NLP/opus-mt-en-es"]
+    assert local.evictions == 1
+
+
+def test_missing_model_is_unsupported_but_network_errors_are_not_cached(local):
+    with pytest.raises(OSError):
+        local.prepare("xx", "fr")
+    assert not local.supports("xx", "fr")
+
+    with pytest.raises(OSError):
+        local.prepare("yy", "fr")
+    assert local.supports("yy", "fr")
+
+
+def test_local_supports():
+    provider = LocalNMTProvider("nllb")
+    assert provider.supports("en", "hi")
+    assert not provider.supports("en", "en")
+    assert not provider.supports("auto", "hi")
+    assert not provider.supports("en", "xx")
@@ -0,0 +1,206 @@
+import threading
+import time
+
+import pytest
+
+from speakswap.providers import FakeProvider
+from speakswap.routing import CircuitBreaker, LatencyTracker, TranslationRouter
+
+
+@pytest.fixture
+def make_router():
+    routers = []
+
+    def make(providers, **kwargs):
+        router = TranslationRouter(providers, **kwargs)
+        routers.append(router)
+        return router
+
+    yield make
+    for router in routers:
+        router.close()
+
+
+def test_long_document_gets_a_deadline_per_batch(make_router):
+    provider = FakeProvider("slow", delay_s=0.1)
+    router = make_router([provider], deadline_s=0.5, batch_workers=4)
+    sentences = [f"Sentence number {i} of the document." for i in range(400)]
+    text = " ".join(sentences)
+
+    started = time.monotonic()
+    result = router.translate_document(text, "en", "fr", max_chars=500)
+    elapsed = time.monotonic() - started
+
+    # Far more batches than fit in one deadline, yet every one is translated
+    assert provider.calls > 20
+    assert elapsed > router.deadline_s
+    assert result is not None
+    assert result.count("[fr]") == provider.calls
+    assert result.index("number 0 ") < result.index("number 200 ") < result.index("number 399 ")
+
+
+def test_document_fails_if_a_batch_fails(make_router):
+    provider = FakeProvider("down", delay_s=0.01)
+    provider.down = True
+    router = make_router([provider], deadline_s=0.5, failure_threshold=100)
+    text = " ".join(f"Sentence {i}." for i in range(200))
+    assert router.translate_document(text, "en", "fr", max_chars=100) is None
+    # Batches still queued after the first failure are not sent
+    batches = len(text) // 100 + 1
+    assert router.stats()["down"]["calls"] < batches
+
+
+def test_short_document_is_one_request(make_router):
+    provider = FakeProvider("fast", delay_s=0.0)
+    router = make_router([provider])
+    assert router.translate_document("Hello there.", "en", "de") == "[de] Hello there."
+    assert provider.calls == 1
+
+
+class ColdProvider(FakeProvider):
+    """FakeProvider that needs prepare() (like a model load) before its first call"""
+
+    def __init__(self, name, prepare_s, error=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.prepare_s = prepare_s
+        self.error = error
+        self.prepared = threading.Event()
+        self.prepares = 0
+
+    def is_ready(self, source, target):
+        return self.prepared.is_set()
+
+    def prepare(self, source, target):
+        self.prepares += 1
+        time.sleep(self.prepare_s)
+        if self.error:
+            raise self.error
+        self.prepared.set()
+
+
+def test_cold_provider_is_prepared_in_the_background(make_router):
+    slow = FakeProvider("slow", delay_s=5.0)
+    cold = ColdProvider("cold", prepare_s=0.5, delay_s=0.01)
+    router = make_router([slow, cold], deadline_s=0.3, hedge_min_s=0.05, hedge_max_s=0.1)
+
+    started = time.monotonic()
+    assert router.translate("hi", "en", "fr") is None
+    assert time.monotonic() - started < 0.4
+    assert router.stats()["cold"]["calls"] == 0
+
+    assert cold.prepared.wait(2.0)
+    assert router.translate("hi", "en", "fr") == "[fr] hi"
+    assert cold.prepares == 1
+
+
+def test_failed_prepare_is_not_a_breaker_failure(make_router):
+    cold = ColdProvider("cold", prepare_s=0.0, error=OSError("no such model"))
+    router = make_router([cold, FakeProvider("backup", delay_s=0.0)], failure_threshold=1, reset_s=60)
+    for _ in range(3):
+        assert router.translate("hi", "en", "fr") == "[fr] hi"
+    time.sleep(0.1)
+    assert router.stats()["cold"]["state"] == "closed"
+    # Retried only after reset_s
+    assert cold.prepares == 1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_s=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now = 10.0
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    clock.now = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0 and breaker.allow()
+
+
+def test_latency_percentiles_need_a_few_samples():
+    tracker = LatencyTracker()
+    for seconds in [0.1, 0.2, 0.3, 0.4]:
+        tracker.add(seconds)
+    assert tracker.percentile(95, default=-1) == -1
+    tracker.add(0.5)
+    assert tracker.percentile(50) == pytest.approx(0.3)
+
+
+def test_open_breaker_skips_the_provider(make_router):
+    broken = FakeProvider("broken", delay_s=0.0)
+    broken.down = True
+    backup = FakeProvider("backup", delay_s=0.0)
+    router = make_router([broken, backup], failure_threshold=2, reset_s=60)
+    for _ in range(4):
+        assert router.translate("hi", "en", "fr") == "[fr] hi"
+    stats = router.stats()["broken"]
+    assert stats["state"] == "open"
+    assert stats["calls"] == 2
+
+
+def test_failover_while_another_call_is_in_flight(make_router):
+    slow = FakeProvider("slow", delay_s=5.0)
+    failing = FakeProvider("failing", delay_s=0.01)
+    failing.down = True
+    healthy = FakeProvider("healthy", delay_s=0.01)
+    router = make_router([slow, failing, healthy], deadline_s=2.0, hedge_min_s=0.05, hedge_max_s=0.1)
+
+    started = time.monotonic()
+    assert router.translate("hi", "en", "fr") == "[fr] hi"
+    # slow is hedged to failing, whose failure starts healthy at once
+    assert time.monotonic() - started < 0.5
+    stats = router.stats()
+    assert stats["failing"]["hedges"] == 1
+    assert stats["healthy"]["wins"] == 1
+
+
+def test_hedges_at_most_once(make_router):
+    providers = [FakeProvider(name, delay_s=5.0) for name in ("a", "b", "c")]
+    router = make_router(providers, deadline_s=0.5, hedge_min_s=0.05, hedge_max_s=0.05)
+    started = time.monotonic()
+    assert router.translate("hi", "en", "fr") is None
+    # The deadline bounds the request, and no call starts after it
+    assert time.monotonic() - started < 0.6
+    stats = router.stats()
+    assert [stats[name]["calls"] for name in "abc"] == [1, 1, 0]
+    assert stats["a"]["timeouts"] == stats["b"]["timeouts"] == 1
+    # Abandoned calls are not charged to the breaker at the deadline
+    assert stats["a"]["failures"] == 0
+
+
+def test_long_texts_are_not_hedged(make_router):
+    slow = FakeProvider("slow", delay_s=0.3)
+    backup = FakeProvider("backup", delay_s=0.0)
+    router = make_router([slow, backup], hedge_min_s=0.05, hedge_max_s=0.05, hedge_max_chars=10)
+    assert router.translate("a" * 50, "en", "fr") == "[fr] " + "a" * 50
+    assert router.stats()["backup"]["calls"] == 0
+
+
+def test_unsupported_pairs_are_skipped(make_router):
+    class EnglishOnly(FakeProvider):
+        def supports(self, source, target):
+            return source == "en"
+
+    english = EnglishOnly("english", delay_s=0.0)
+    other = FakeProvider("other", delay_s=0.0)
+    router = make_router([english, other])
+    router.translate("hola", "es", "fr")
+    assert router.stats()["english"]["calls"] == 0
+    assert router.stats()["other"]["wins"] == 1
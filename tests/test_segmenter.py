@@ -0,0 +1,45 @@
+from speakswap.segmenter import iter_batches, iter_sentences, join_translations
+
+
+def test_sentences_keep_their_terminators():
+    text = "Hello there. How are you? Fine!"
+    assert [s.strip() for s in iter_sentences(text)] == ["Hello there.", "How are you?", "Fine!"]
+
+
+def test_numbers_and_domains_do_not_end_sentences():
+    text = "Pi is 3.14 and example.com is a domain. Next."
+    assert [s.strip() for s in iter_sentences(text)] == ["Pi is 3.14 and example.com is a domain.", "Next."]
+
+
+def test_greek_question_mark_ends_a_sentence_but_semicolon_does_not():
+    assert len(list(iter_sentences("Τι κάνεις; Καλά."))) == 2
+    assert len(list(iter_sentences("First clause; second clause."))) == 1
+
+
+def test_unspaced_terminators():
+    assert list(iter_sentences("你好。再见。")) == ["你好。", "再见。"]
+    assert len(list(iter_sentences("नमस्ते। आप कैसे हैं।"))) == 2
+
+
+def test_sentences_from_streamed_pieces():
+    pieces = ["Hello th", "ere. How a", "re you? Fi", "ne"]
+    assert [s.strip() for s in iter_sentences(pieces)] == ["Hello there.", "How are you?", "Fine"]
+
+
+def test_batches_stay_under_the_limit_and_keep_all_text():
+    text = " ".join(f"Sentence number {i}." for i in range(100))
+    batches = list(iter_batches(text, max_chars=120))
+    assert all(len(batch) <= 120 for batch in batches)
+    assert " ".join(batches) == text
+
+
+def test_overlong_sentence_is_split_at_whitespace():
+    text = "word " * 100
+    batches = list(iter_batches(text, max_chars=50))
+    assert all(len(batch) <= 50 for batch in batches)
+    assert all(set(batch.split()) == {"word"} for batch in batches)
+
+
+def test_join_translations():
+    assert join_translations(["Bonjour.", "", "Salut."], "fr") == "Bonjour. Salut."
+    assert join_translations(["你好。", "再见。"], "zh-CN") == "你好。再见。"
@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+import pytest
+
+from speakswap import tts
+from speakswap.tts import SpeechClip, SpeechQueue, UndecodableSpeech
+
+
+class FakePlayer:
+    """Records clips and finishes them at once"""
+
+    def __init__(self):
+        self.clips = []
+
+    def play(self, clip):
+        self.clips.append(clip)
+        done = threading.Event()
+        done.set()
+        return done
+
+    def pending(self):
+        return 0
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_undecodable_gtts_speech_keeps_the_mp3(monkeypatch):
+    monkeypatch.setattr(tts, "gtts_mp3", lambda text, language_code: b"not an mp3")
+    with pytest.raises(UndecodableSpeech) as info:
+        tts.render_gtts("hello", "en")
+    assert info.value.mp3 == b"not an mp3"
+
+
+def test_queue_plays_in_order_and_skips_clips_rendered_elsewhere():
+    player = FakePlayer()
+
+    def synthesize(text, language_code):
+        if text == "played elsewhere":
+            return None
+        return SpeechClip(np.zeros(10, dtype=np.float32), 24000, text)
+
+    speech = SpeechQueue(synthesize, player)
+    try:
+        events = [speech.speak(text, "en") for text in ["one", "played elsewhere", "two"]]
+        for event in events:
+            assert event.wait(2.0)
+        assert [clip.text for clip in player.clips] == ["one", "two"]
+    finally:
+        speech.close()
+
+
+def test_failed_synthesis_releases_the_phrase():
+    errors = []
+
+    def synthesize(text, language_code):
+        raise RuntimeError("no voice")
+
+    speech = SpeechQueue(synthesize, FakePlayer(), on_status=lambda message, is_error=False: errors.append(message))
+    try:
+        assert speech.speak("hello", "en").wait(2.0)
+        assert errors == ["Text-to-speech failed"]
+    finally:
+        speech.close()
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from speakswap.capture import RingBuffer
+from speakswap.vad import VAD_FRAME_MS, NoiseFloorTracker, VoiceActivitySegmenter
+
+RATE = 16000
+FRAME = RATE * VAD_FRAME_MS // 1000
+
+
+def noise(rng, seconds, rms):
+    return (rng.standard_normal(int(seconds * RATE)) * rms).astype(np.int16)
+
+
+def speech(rng, seconds, rms=3000.0, syllable_hz=4.0):
+    """Noise modulated like syllables: energy swings between near-silence and rms"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    envelope = np.abs(np.sin(np.pi * syllable_hz * t)) ** 2
+    return (rng.standard_normal(len(t)) * rms * 1.4 * envelope).astype(np.int16)
+
+
+def run(segmenter, audio, block_s=0.1):
+    block = int(block_s * RATE)
+    segments = []
+    for start in range(0, len(audio), block):
+        segments.extend(segmenter.process(audio[start:start + block]))
+    return segments
+
+
+def test_tracker_follows_percentile_of_window():
+    tracker = NoiseFloorTracker(window_s=0.3, percentile=50, ratio=2.0, min_threshold=10)
+    for rms in [100.0] * 10:
+        tracker.update(rms)
+    tracker.recompute()
+    assert tracker.noise_floor == pytest.approx(100.0)
+    assert tracker.threshold == pytest.approx(200.0)
+
+    tracker.reseed(1000.0)
+    assert tracker.frames == 10
+    assert tracker.threshold == pytest.approx(2000.0)
+
+
+def test_tracker_threshold_is_clamped():
+    tracker = NoiseFloorTracker(min_threshold=300, max_threshold=500)
+    tracker.update(10.0)
+    assert tracker.threshold == 300
+    tracker.reseed(10000.0)
+    assert tracker.threshold == 500
+
+
+def test_utterance_between_silences(rng):
+    segmenter = VoiceActivitySegmenter(RATE)
+    audio = np.concatenate([noise(rng, 1.0, 50), speech(rng, 2.0), noise(rng, 1.0, 50)])
+    segments = run(segmenter, audio)
+    assert len(segments) == 1
+    assert 1.9 < segments[0].duration < 2.6
+    assert segments[0].utterance_id == 1
+
+
+def test_fluent_speech_is_not_cut_by_the_adaptive_floor(rng):
+    audio = np.concatenate([noise(rng, 1.0, 50), speech(rng, 9.0), noise(rng, 1.0, 50)])
+    adaptive = run(VoiceActivitySegmenter(RATE), audio)
+    fixed = run(VoiceActivitySegmenter(RATE, adaptive=False), audio)
+    assert len(adaptive) == len(fixed) == 1
+    assert adaptive[0].duration == pytest.approx(fixed[0].duration, abs=0.1)
+
+
+def test_jump_in_noise_level_is_learned_without_a_long_segment(rng):
+    segmenter = VoiceActivitySegmenter(RATE, max_segment_s=15.0)
+    audio = np.concatenate([noise(rng, 4.0, 50), noise(rng, 20.0, 1500)])
+    segments = run(segmenter, audio)
+    assert segments == []
+    assert segmenter.metrics()["noise_floor"] > 1000
+    assert not segmenter.in_speech
+
+    # Speech over the louder room is still picked up
+    segments = run(segmenter, np.concatenate([
+        speech(rng, 2.0, rms=12000) + noise(rng, 2.0, 1500),
+        noise(rng, 2.0, 1500)
+    ]))
+    assert len(segments) == 1
+    assert 1.5 < segments[0].duration < 3.0
+
+
+def test_speech_followed_by_steady_noise_ends_where_the_noise_starts(rng):
+    segmenter = VoiceActivitySegmenter(RATE)
+    audio = np.concatenate([noise(rng, 1.0, 50), speech(rng, 2.0), noise(rng, 10.0, 1500)])
+    segments = run(segmenter, audio)
+    assert len(segments) == 1
+    assert segments[0].duration < 3.0
+
+
+def test_max_segment_flush():
+    segmenter = VoiceActivitySegmenter(RATE, max_segment_s=2.0, adaptive=False)
+    rng = np.random.default_rng(7)
+    segments = run(segmenter, speech(rng, 5.0))
+    assert [round(s.duration) for s in segments[:2]] == [2, 2]
+
+
+def test_reads_one_channel_of_a_shared_ring(rng):
+    ring = RingBuffer(FRAME * 1000, channels=2)
+    segmenter = VoiceActivitySegmenter(RATE, ring=ring, channel=1)
+    quiet = noise(rng, 1.0, 50)
+    talk = np.concatenate([quiet, speech(rng, 2.0), quiet])
+    ring.write(np.stack([noise(rng, 4.0, 50), talk], axis=1))
+    segments = segmenter.process()
+    assert len(segments) == 1
+    assert segments[0].samples.ndim == 1